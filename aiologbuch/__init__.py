@@ -1 +1,2 @@
-from .main import get_logger  # noqa
+from .main import configure_logger, create_load_shedder, get_logger  # noqa
+from .lifecycle import ashutdown, shutdown  # noqa
@@ -0,0 +1 @@
+from .shared.filters import ExclusiveFilter, Filter  # noqa
@@ -1,2 +1,4 @@
+from .binary import BinaryFormatter  # noqa
 from .json import JsonFormatter  # noqa
 from .line import LineFormatter  # noqa
+from .syslog import SyslogFormatter  # noqa
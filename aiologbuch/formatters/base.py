@@ -2,6 +2,8 @@ from datetime import datetime, timezone
 from time import strftime
 from typing import TYPE_CHECKING
 
+from aiologbuch.shared.tracebacks import traceback_renderer
+
 if TYPE_CHECKING:
     from aiologbuch.shared.types import LogRecordProtocol
 
@@ -22,6 +24,11 @@ class BaseFormatter:
         timestamp = strftime(self.DEFAULT_DATE_FORMAT, self.converter(record.created))
         return self.DEFAULT_MSEC_FORMAT % (timestamp, record.msecs)
 
+    def format_exception(self, record: "LogRecordProtocol"):
+        if record.exc_text is None and record.exc_info:
+            record.exc_text = traceback_renderer.render(record.exc_info[1])
+        return record.exc_text
+
     def prepare_record(self, record: "LogRecordProtocol"):
         return {
             "timestamp": self.format_time(record),
@@ -34,6 +41,6 @@ class BaseFormatter:
             "filename": record.pathname,
             "function_name": record.funcName,
             "line_number": record.lineno,
-            "traceback": record.exc_text,
+            "traceback": self.format_exception(record),
             "message": record.msg,
         }
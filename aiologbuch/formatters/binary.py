@@ -0,0 +1,207 @@
+import os
+from struct import Struct
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+from weakref import WeakSet
+
+from .base import BaseFormatter
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import LogRecordProtocol
+
+
+MAGIC = b"ALB\x01"
+
+FRAME_HEADER = 0x00
+FRAME_DEFINE = 0x01
+FRAME_RECORD = 0x02
+
+TAG_NONE = 0x00
+TAG_FALSE = 0x01
+TAG_TRUE = 0x02
+TAG_INT = 0x03
+TAG_FLOAT = 0x04
+TAG_STR = 0x05
+TAG_LIST = 0x06
+TAG_DICT = 0x07
+TAG_TIMESTAMP = 0x08
+
+# NOTE: Key id 0 means that the key is written inline instead of being interned. The
+# record fields are interned up front, so that they never need a definition frame.
+INLINE_KEY = 0
+STATIC_FIELDS = (
+    "timestamp",
+    "level",
+    "process_id",
+    "process_name",
+    "thread_id",
+    "thread_name",
+    "logger_name",
+    "filename",
+    "function_name",
+    "line_number",
+    "traceback",
+    "message",
+)
+
+FLOAT = Struct("<d")
+
+
+def encode_varint(value: int, out: bytearray):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_zigzag(value: int, out: bytearray):
+    encode_varint(value << 1 if value >= 0 else ((-value) << 1) - 1, out)
+
+
+class BinaryFormatter(BaseFormatter):
+    """
+    Writes length-prefixed binary frames instead of text. Every key is interned into
+    a per-stream dictionary, so a 'BinaryFormatter' instance must only ever write to a
+    single stream. A forked child writes its keys inline instead. Use
+    'aiologbuch.readers.binary' to decode the files.
+    """
+
+    def __init__(self, max_interned_keys: int = 4096):
+        self.max_interned_keys = max_interned_keys
+        self._reset()
+        _formatters.add(self)
+
+    def __getstate__(self):
+        return {"max_interned_keys": self.max_interned_keys}
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.max_interned_keys = state["max_interned_keys"]
+        self._reset()
+        _formatters.add(self)
+
+    def format(self, record: "LogRecordProtocol"):
+        body = bytearray((FRAME_RECORD,))
+        fields = (
+            (1, TAG_TIMESTAMP, int(record.created * 1_000_000)),
+            (2, TAG_STR, record.levelname),
+            (3, None, record.process),
+            (4, None, record.processName),
+            (5, None, record.thread),
+            (6, None, record.threadName),
+            (7, TAG_STR, record.name),
+            (8, TAG_STR, record.pathname),
+            (9, TAG_STR, record.funcName),
+            (10, TAG_INT, record.lineno),
+            (11, None, self.format_exception(record)),
+            (12, None, record.msg),
+        )
+
+        with self._lock:
+            out = bytearray()
+            if not self._started:
+                self._write_frame(bytes((FRAME_HEADER,)) + MAGIC, out)
+
+            # NOTE: The keys that are defined by this record are only interned once
+            # it's fully encoded, so a value that fails to encode never leaves behind
+            # a key whose definition frame was never written
+            staged: dict[str, int] = {}
+            encode_varint(len(fields), body)
+            for key_id, tag, value in fields:
+                encode_varint(key_id, body)
+                if tag == TAG_TIMESTAMP:
+                    body.append(TAG_TIMESTAMP)
+                    encode_varint(value, body)
+                else:
+                    self._encode_value(value, body, out, staged)
+
+            self._write_frame(body, out)
+            self._keys.update(staged)
+            self._started = True
+
+        return bytes(out)
+
+    def _reset(self):
+        self._lock = Lock()
+        self._started = False
+        self._inline_keys = False
+        self._keys = {name: idx for idx, name in enumerate(STATIC_FIELDS, start=1)}
+
+    def _after_fork(self):
+        # NOTE: The parent keeps interning keys into the same stream, so the ids a
+        # child would pick could clash with the parent's, and its definitions could be
+        # read before the parent's ones. The child writes its keys inline instead.
+        self._lock = Lock()
+        self._inline_keys = True
+        self._keys = {name: idx for idx, name in enumerate(STATIC_FIELDS, start=1)}
+
+    def _write_frame(self, body: bytes | bytearray, out: bytearray):
+        encode_varint(len(body), out)
+        out += body
+
+    def _encode_key(
+        self, key: str, body: bytearray, out: bytearray, staged: dict[str, int]
+    ):
+        if (key_id := self._keys.get(key) or staged.get(key)) is None:
+            interned = len(self._keys) + len(staged)
+            if self._inline_keys or interned >= self.max_interned_keys:
+                encode_varint(INLINE_KEY, body)
+                self._encode_str(key, body)
+                return
+
+            key_id = staged[key] = interned + 1
+
+            definition = bytearray((FRAME_DEFINE,))
+            encode_varint(key_id, definition)
+            self._encode_str(key, definition)
+            self._write_frame(definition, out)
+
+        encode_varint(key_id, body)
+
+    def _encode_str(self, value: str, body: bytearray):
+        data = value.encode("utf-8", "surrogatepass")
+        encode_varint(len(data), body)
+        body += data
+
+    def _encode_value(
+        self, value: Any, body: bytearray, out: bytearray, staged: dict[str, int]
+    ):
+        if value is None:
+            body.append(TAG_NONE)
+        elif value is True:
+            body.append(TAG_TRUE)
+        elif value is False:
+            body.append(TAG_FALSE)
+        elif isinstance(value, int):
+            body.append(TAG_INT)
+            encode_zigzag(value, body)
+        elif isinstance(value, float):
+            body.append(TAG_FLOAT)
+            body += FLOAT.pack(value)
+        elif isinstance(value, str):
+            body.append(TAG_STR)
+            self._encode_str(value, body)
+        elif isinstance(value, dict):
+            body.append(TAG_DICT)
+            encode_varint(len(value), body)
+            for key, item in value.items():
+                self._encode_key(str(key), body, out, staged)
+                self._encode_value(item, body, out, staged)
+        elif isinstance(value, (list, tuple)):
+            body.append(TAG_LIST)
+            encode_varint(len(value), body)
+            for item in value:
+                self._encode_value(item, body, out, staged)
+        else:
+            body.append(TAG_STR)
+            self._encode_str(str(value), body)
+
+
+_formatters: WeakSet[BinaryFormatter] = WeakSet()
+
+
+def _reset_formatters():
+    for formatter in list(_formatters):
+        formatter._after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_formatters)
@@ -1,6 +1,7 @@
 import json
-import re
-from typing import TYPE_CHECKING
+from collections import Counter
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
 from .base import BaseFormatter
 
@@ -8,10 +9,252 @@ if TYPE_CHECKING:
     from aiologbuch.shared.types import LogRecordProtocol
 
 
+# NOTE: Where the records were truncated, in the entries of dicts and lists. They are
+# plain JSON values, so the output is still valid JSON.
+TRUNCATED_KEY = "..."
+TRUNCATED_MESSAGE = "[message truncated]"
+
+
 class JsonFormatter(BaseFormatter):
-    def _ensure_safe(self, text: str):
-        return re.sub(r"\\", r"\\\\", text)
+    """
+    Formats the records as JSON lines. The message can be bounded, in case a huge
+    payload is logged by accident: its strings, the items of its collections, its
+    nesting depth, and its encoded size. The limits are enforced while the message is
+    encoded, which stops as soon as it ran out of room, and every truncation is marked
+    in the output and counted in 'truncations'.
+    """
+
+    _truncations: Counter[str]
+
+    def __init__(
+        self,
+        max_message_size: Optional[int] = None,
+        max_string_length: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        max_items: Optional[int] = None,
+    ):
+        self.max_message_size = max_message_size
+        self.max_string_length = max_string_length
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self._reset()
+
+    def __getstate__(self):
+        # NOTE: The counts of the formatters of a process pool stay in its workers
+        return {
+            "max_message_size": self.max_message_size,
+            "max_string_length": self.max_string_length,
+            "max_depth": self.max_depth,
+            "max_items": self.max_items,
+        }
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._reset()
+
+    @property
+    def bounded(self):
+        return any(
+            limit is not None
+            for limit in (
+                self.max_message_size,
+                self.max_string_length,
+                self.max_depth,
+                self.max_items,
+            )
+        )
+
+    @property
+    def truncations(self):
+        """How many times each limit truncated a message"""
+        with self._lock:
+            return Counter(self._truncations)
 
     def format(self, record: "LogRecordProtocol"):
         data = self.prepare_record(record=record)
-        return self._ensure_safe(json.dumps(data)).encode() + self.TERMINATOR
+        if not self._bounded:
+            return json.dumps(data).encode() + self.TERMINATOR
+
+        # NOTE: The message is the last field, so it's encoded on its own and then
+        # appended to the other ones, which keeps the order of the fields
+        encoder = _BoundedEncoder(self)
+        message = encoder.encode(data.pop("message"))
+        if encoder.truncations:
+            with self._lock:
+                self._truncations.update(encoder.truncations)
+
+        text = json.dumps(data)[:-1] + ', "message": ' + message + "}"
+        return text.encode() + self.TERMINATOR
+
+    def _reset(self):
+        self._bounded = self.bounded
+        self._truncations = Counter()
+        self._lock = Lock()
+
+
+class _Exhausted(Exception):
+    """Raised once the encoded message reached its maximum size"""
+
+
+class _Frame:
+    __slots__ = ("mapping", "closer", "count", "pending")
+
+    def __init__(self, mapping: bool, closer: str):
+        self.mapping = mapping
+        self.closer = closer
+        self.count = 0
+        # NOTE: Whether a key or a separator was written, but not its value yet
+        self.pending = False
+
+
+class _BoundedEncoder:
+    """
+    Encodes a single message within the limits of a formatter, in pieces, so nothing
+    past them is ever encoded. It's created per message, so it's never shared.
+    """
+
+    def __init__(self, formatter: JsonFormatter):
+        self.max_size = formatter.max_message_size
+        self.max_string_length = formatter.max_string_length
+        self.max_depth = formatter.max_depth
+        self.max_items = formatter.max_items
+        self.truncations: Counter[str] = Counter()
+        self._parts: list[str] = []
+        self._size = 0
+        self._frames: list[_Frame] = []
+
+    def encode(self, value: Any):
+        try:
+            self._encode(value, 0)
+        except _Exhausted:
+            self._close()
+        return "".join(self._parts)
+
+    def _encode(self, value: Any, depth: int):
+        if isinstance(value, str):
+            self._write_string(value)
+        elif value is None or isinstance(value, (bool, int, float)):
+            self._write(json.dumps(value))
+        elif isinstance(value, dict):
+            self._encode_items(value.items(), len(value), depth, mapping=True)
+        elif isinstance(value, (list, tuple)):
+            self._encode_items(value, len(value), depth, mapping=False)
+        else:
+            raise TypeError(
+                f"Object of type {type(value).__name__} is not JSON serializable"
+            )
+
+    def _encode_items(self, items: Iterable[Any], size: int, depth: int, mapping: bool):
+        kind = "dict" if mapping else "list"
+        if self.max_depth is not None and depth >= self.max_depth:
+            self.truncations["depth"] += 1
+            return self._write(json.dumps(f"[{kind} of {size} items]"))
+
+        frame = _Frame(mapping=mapping, closer="}" if mapping else "]")
+        self._write("{" if mapping else "[")
+        self._frames.append(frame)
+
+        for item in items:
+            if self.max_items is not None and frame.count >= self.max_items:
+                self.truncations["items"] += 1
+                self._write_marker(frame, f"[{size - frame.count} more items]")
+                break
+
+            separator = ", " if frame.count else ""
+            if mapping:
+                key, item = item
+                self._write(separator + json.dumps(_key(key)) + ": ")
+            elif separator:
+                self._write(separator)
+
+            frame.pending = True
+            self._encode(item, depth + 1)
+            frame.pending = False
+            frame.count += 1
+
+        # NOTE: Always written, since the items before it already were
+        self._write(frame.closer, force=True)
+        self._frames.pop()
+
+    def _write_string(self, value: str):
+        length = self.max_string_length
+        if length is not None and len(value) > length:
+            self.truncations["string"] += 1
+            value = f"{value[:length]}...[{len(value) - length} more chars]"
+
+        if self.max_size is None:
+            return self._write(json.dumps(value))
+
+        # NOTE: The encoded string is at least as long as the string and its quotes, so
+        # a huge one is never encoded in full
+        room = max(self.max_size - self._size, 0)
+        if len(value) + 2 <= room and len(text := json.dumps(value)) <= room:
+            return self._write(text)
+
+        # NOTE: A string that doesn't fit is cut to what's left, so the start of a huge
+        # message is still there
+        text = _encode_prefix(value, room)
+        self._write(text + "..." + TRUNCATED_MESSAGE + '"', force=True)
+        if self._frames:
+            self._frames[-1].pending = False
+            self._frames[-1].count += 1
+        self.truncations["size"] += 1
+        raise _Exhausted()
+
+    def _write_marker(self, frame: _Frame, marker: str):
+        separator = ", " if frame.count else ""
+        if frame.mapping:
+            self._write(separator + json.dumps(TRUNCATED_KEY) + ": ", force=True)
+        else:
+            self._write(separator, force=True)
+        self._write(json.dumps(marker), force=True)
+
+    def _write(self, text: str, force: bool = False):
+        if not force and self.max_size is not None:
+            if self._size + len(text) > self.max_size:
+                raise _Exhausted()
+        self._parts.append(text)
+        self._size += len(text)
+
+    def _close(self):
+        # NOTE: The marker and the closing brackets are written past the maximum size,
+        # so the output stays valid JSON
+        if not self._frames:
+            if not self._parts:
+                self.truncations["size"] += 1
+                self._write(json.dumps(TRUNCATED_MESSAGE), force=True)
+            return
+
+        if "size" not in self.truncations:
+            self.truncations["size"] += 1
+            frame = self._frames[-1]
+            if frame.pending:
+                self._write(json.dumps(TRUNCATED_MESSAGE), force=True)
+            else:
+                self._write_marker(frame, TRUNCATED_MESSAGE)
+
+        for frame in reversed(self._frames):
+            self._write(frame.closer, force=True)
+
+
+def _encode_prefix(value: str, room: int):
+    """Encodes the longest start of 'value' that fits in 'room', without an end quote"""
+    # NOTE: The escapes make the encoded text longer than the string, by a varying
+    # amount, so the length is searched for
+    low, high = 0, min(len(value), room)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if len(json.dumps(value[:middle])) - 1 <= room:
+            low = middle
+        else:
+            high = middle - 1
+    return json.dumps(value[:low])[:-1]
+
+
+def _key(key: Any):
+    # NOTE: The same keys that 'json.dumps' takes, converted the same way
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key)}")
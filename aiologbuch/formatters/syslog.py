@@ -0,0 +1,109 @@
+import os
+import socket
+import sys
+from time import gmtime, strftime
+from typing import TYPE_CHECKING, Optional
+
+from aiologbuch.shared.levels import LogLevel
+
+from .base import BaseFormatter
+from .json import JsonFormatter
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import FormatterProtocol, LogRecordProtocol
+
+
+# NOTE: RFC 5424 severities, indexed by the library's levels
+SEVERITIES = {
+    LogLevel.DEBUG: 7,
+    LogLevel.INFO: 6,
+    LogLevel.WARNING: 4,
+    LogLevel.ERROR: 3,
+    LogLevel.CRITICAL: 2,
+}
+
+FACILITY_USER = 1
+FACILITY_LOCAL0 = 16
+
+_NIL = "-"
+
+
+def _header_field(value: str, max_length: int):
+    # NOTE: Header fields are printable US-ASCII without spaces, or the NIL value
+    value = "".join(char for char in value if "!" <= char <= "~")[:max_length]
+    return value or _NIL
+
+
+class SyslogFormatter(BaseFormatter):
+    """
+    Wraps another formatter, prefixing its output with an RFC 5424 header. The
+    constant part of the header is rendered once per process id.
+    """
+
+    def __init__(
+        self,
+        formatter: Optional["FormatterProtocol"] = None,
+        app_name: str = "",
+        facility: int = FACILITY_USER,
+        hostname: Optional[str] = None,
+        max_message_size: int = 2048,
+    ):
+        if not 0 <= facility <= 23:
+            raise ValueError(f"Unknown syslog facility: {facility}")
+
+        self.formatter = formatter or JsonFormatter()
+        self.facility = facility
+        self.max_message_size = max_message_size
+
+        self._hostname = _header_field(hostname or socket.gethostname(), 255)
+        self._app_name = _header_field(
+            app_name or os.path.basename(sys.argv[0] or "python"), 48
+        )
+        self._priorities = {
+            level: b"<%d>1 " % (facility * 8 + severity)
+            for level, severity in SEVERITIES.items()
+        }
+        self._default_priority = b"<%d>1 " % (facility * 8 + 5)
+        self._suffixes: dict[Optional[int], bytes] = {}
+        self._timestamps: tuple[int, str] = (-1, "")
+
+    def format(self, record: "LogRecordProtocol"):
+        body = self.formatter.format(record)
+        if body.endswith(self.TERMINATOR):
+            body = body[: -len(self.TERMINATOR)]
+
+        header = (
+            self._priorities.get(record.levelno, self._default_priority)
+            + self._format_timestamp(record)
+            + self._suffix(record.process)
+        )
+
+        if len(header) + len(body) > self.max_message_size:
+            body = self._truncate(body, max(self.max_message_size - len(header), 0))
+
+        return header + body
+
+    def _suffix(self, process_id: Optional[int]):
+        if (suffix := self._suffixes.get(process_id)) is None:
+            procid = _NIL if process_id is None else str(process_id)
+            suffix = f" {self._hostname} {self._app_name} {procid} - - ".encode()
+            # NOTE: Only a handful of process ids are ever seen (one per fork)
+            if len(self._suffixes) > 16:
+                self._suffixes.clear()
+            self._suffixes[process_id] = suffix
+        return suffix
+
+    def _format_timestamp(self, record: "LogRecordProtocol"):
+        seconds = int(record.created)
+        cached_seconds, prefix = self._timestamps
+        if cached_seconds != seconds:
+            prefix = strftime("%Y-%m-%dT%H:%M:%S", gmtime(seconds))
+            self._timestamps = (seconds, prefix)
+        return b"%s.%03dZ" % (prefix.encode(), record.msecs)
+
+    def _truncate(self, body: bytes, size: int):
+        # NOTE: Steps back over UTF-8 continuation bytes, so that a multi-byte
+        # character is never split in half.
+        while 0 < size < len(body) and (body[size] & 0xC0) == 0x80:
+            size -= 1
+        return body[:size]
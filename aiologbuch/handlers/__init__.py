@@ -1,14 +1,30 @@
 from typing import TYPE_CHECKING as _TypeChecking
+from typing import Optional as _Optional
+
+from aiologbuch.formatters.syslog import FACILITY_USER as _FACILITY_USER
+from aiologbuch.formatters.syslog import SyslogFormatter as _SyslogFormatter
 
 from .base import BaseAsyncHandler as _BaseAsync
 from .base import BaseSyncHandler as _BaseSync
 from .file import AsyncFileMixin as _AsyncFileMixin
+from .file import Durability, TimeIndex  # noqa
 from .file import SyncFileMixin as _SyncFileMixin
+from .memory import AsyncMemoryHandler, SyncMemoryHandler  # noqa
+from .pool import FormattingPool  # noqa
+from .socket import AsyncSocketMixin as _AsyncSocketMixin
+from .socket import SyncSocketMixin as _SyncSocketMixin
 from .stderr import AsyncStderrMixin as _AsyncStderrMixin
 from .stderr import SyncStderrMixin as _SyncStderrMixin
+from .syslog import AsyncSyslogMixin as _AsyncSyslogMixin
+from .syslog import SyncSyslogMixin as _SyncSyslogMixin
 
 if _TypeChecking:
-    from aiologbuch.shared.types import FormatterProtocol
+    from aiologbuch.shared.types import (
+        FormatterProtocol,
+        ShardType,
+        SocketAddress,
+        SocketFraming,
+    )
 
 
 class AsyncStderrHandler(_BaseAsync, _AsyncStderrMixin):
@@ -16,12 +32,27 @@ class AsyncStderrHandler(_BaseAsync, _AsyncStderrMixin):
 
 
 class AsyncFileHandler(_BaseAsync, _AsyncFileMixin):
-    def __init__(self, filename: str, formatter: "FormatterProtocol"):
+    slow = True
+    # NOTE: The mixin knows which records have to reach the disk before returning
+    write_record = _AsyncFileMixin.write_record
+    write_records = _AsyncFileMixin.write_records
+
+    def __init__(
+        self,
+        filename: str,
+        formatter: "FormatterProtocol",
+        pool: _Optional[FormattingPool] = None,
+        durability: _Optional[Durability] = None,
+        index: _Optional[TimeIndex] = None,
+        shard: _Optional["ShardType"] = None,
+    ):
         if not filename:
             raise ValueError("'filename' cannot be empty")
 
-        super(_BaseAsync, self).__init__(formatter=formatter)
+        super().__init__(formatter=formatter, pool=pool)
         self._filename = filename
+        self._configure_writer(durability=durability, index=index)
+        self._configure_shard(shard)
 
 
 class SyncStderrHandler(_BaseSync, _SyncStderrMixin):
@@ -29,9 +60,132 @@ class SyncStderrHandler(_BaseSync, _SyncStderrMixin):
 
 
 class SyncFileHandler(_BaseSync, _SyncFileMixin):
-    def __init__(self, filename: str, formatter: "FormatterProtocol"):
+    write_record = _SyncFileMixin.write_record
+    write_records = _SyncFileMixin.write_records
+
+    def __init__(
+        self,
+        filename: str,
+        formatter: "FormatterProtocol",
+        durability: _Optional[Durability] = None,
+        index: _Optional[TimeIndex] = None,
+        shard: _Optional["ShardType"] = None,
+    ):
         if not filename:
             raise ValueError("'filename' cannot be empty")
 
         super(_BaseSync, self).__init__(formatter=formatter)
         self._filename = filename
+        self.index = index
+        if durability is not None:
+            self.durability = durability
+        self._configure_shard(shard)
+
+
+class AsyncSocketHandler(_BaseAsync, _AsyncSocketMixin):
+    slow = True
+
+    def __init__(
+        self,
+        address: "SocketAddress",
+        formatter: "FormatterProtocol",
+        framing: "SocketFraming" = "newline",
+        max_buffer_size: int = 4 * 1024 * 1024,
+        max_batch_size: int = 64 * 1024,
+        initial_backoff: float = 0.1,
+        max_backoff: float = 30.0,
+        pool: _Optional[FormattingPool] = None,
+    ):
+        super().__init__(formatter=formatter, pool=pool)
+        self._configure_socket(
+            address=address,
+            framing=framing,
+            max_buffer_size=max_buffer_size,
+            max_batch_size=max_batch_size,
+            initial_backoff=initial_backoff,
+            max_backoff=max_backoff,
+        )
+
+    async def write_batch(self, msgs: list[bytes]):
+        # NOTE: Every record is framed on its own, and then they're sent together
+        for msg in msgs:
+            self._push(msg)
+        await self._flush()
+
+
+class SyncSocketHandler(_BaseSync, _SyncSocketMixin):
+    def __init__(
+        self,
+        address: "SocketAddress",
+        formatter: "FormatterProtocol",
+        framing: "SocketFraming" = "newline",
+        max_buffer_size: int = 4 * 1024 * 1024,
+        max_batch_size: int = 64 * 1024,
+        initial_backoff: float = 0.1,
+        max_backoff: float = 30.0,
+    ):
+        super().__init__(formatter=formatter)
+        self._configure_socket(
+            address=address,
+            framing=framing,
+            max_buffer_size=max_buffer_size,
+            max_batch_size=max_batch_size,
+            initial_backoff=initial_backoff,
+            max_backoff=max_backoff,
+        )
+
+    def write_batch(self, msgs: list[bytes]):
+        # NOTE: Every record is framed on its own, and then they're sent together
+        with self._lock:
+            for msg in msgs:
+                self._push(msg)
+            self._flush()
+
+
+class AsyncSyslogHandler(_BaseAsync, _AsyncSyslogMixin):
+    def __init__(
+        self,
+        address: "SocketAddress" = "/dev/log",
+        formatter: _Optional["FormatterProtocol"] = None,
+        app_name: str = "",
+        facility: int = _FACILITY_USER,
+        max_message_size: int = 2048,
+        pool: _Optional[FormattingPool] = None,
+    ):
+        syslog_formatter = _SyslogFormatter(
+            formatter=formatter,
+            app_name=app_name,
+            facility=facility,
+            max_message_size=max_message_size,
+        )
+        super().__init__(formatter=syslog_formatter, pool=pool)
+        self._configure_datagram(address=address)
+
+    async def write_batch(self, msgs: list[bytes]):
+        # NOTE: Every record is its own datagram, so batches can not be joined
+        for msg in msgs:
+            await self.write_and_flush(msg)
+
+
+class SyncSyslogHandler(_BaseSync, _SyncSyslogMixin):
+    def __init__(
+        self,
+        address: "SocketAddress" = "/dev/log",
+        formatter: _Optional["FormatterProtocol"] = None,
+        app_name: str = "",
+        facility: int = _FACILITY_USER,
+        max_message_size: int = 2048,
+    ):
+        syslog_formatter = _SyslogFormatter(
+            formatter=formatter,
+            app_name=app_name,
+            facility=facility,
+            max_message_size=max_message_size,
+        )
+        super().__init__(formatter=syslog_formatter)
+        self._configure_datagram(address=address)
+
+    def write_batch(self, msgs: list[bytes]):
+        # NOTE: Every record is its own datagram, so batches can not be joined
+        for msg in msgs:
+            self.write_and_flush(msg)
@@ -1,16 +1,30 @@
-from logging import Handler
-from typing import TYPE_CHECKING
-
-from anyio.to_thread import run_sync
+import os
+from asyncio import AbstractEventLoop, Future, Task, get_running_loop, shield
+from collections import deque
+from threading import Lock as ThreadLock
+from typing import TYPE_CHECKING, Optional
+from weakref import WeakKeyDictionary, WeakSet
 
 from aiologbuch.shared.conf import settings
-from aiologbuch.shared.utils import sync_lock_context
 
 if TYPE_CHECKING:
-    from aiologbuch.shared.types import FormatterProtocol, LogRecordProtocol
+    from aiologbuch.shared.types import (
+        FilterProtocol,
+        FormatterProtocol,
+        LogRecordProtocol,
+    )
+
+    from .pool import FormattingPool
 
 
 class BaseHandler:
+    # NOTE: Optional level filter of the handler. It is compiled into the routes of
+    # the loggers when the handler is attached, so it must be set before that.
+    filter_: Optional["FilterProtocol"] = None
+    # NOTE: Handlers whose writes may take a while, like the ones waiting on threads or
+    # on the network, are run concurrently with the others by the async loggers
+    slow = False
+
     def __init__(self, formatter: "FormatterProtocol"):
         self.formatter = formatter
 
@@ -18,31 +32,198 @@ class BaseHandler:
         return self.formatter.format(record)
 
 
+class _PoolQueue:
+    """The records of an event loop that wait on the formatting pool"""
+
+    __slots__ = ("pending", "task")
+
+    def __init__(self):
+        self.pending: deque[tuple["LogRecordProtocol", Future[None]]] = deque()
+        self.task: Optional[Task[None]] = None
+
+
 class BaseAsyncHandler(BaseHandler):
+    _queues: WeakKeyDictionary[AbstractEventLoop, _PoolQueue]
+    _queues_lock: ThreadLock
+
+    def __init__(
+        self, formatter: "FormatterProtocol", pool: Optional["FormattingPool"] = None
+    ):
+        super().__init__(formatter=formatter)
+        self.pool = pool
+        self._queues = WeakKeyDictionary()
+        self._queues_lock = ThreadLock()
+        _async_handlers.add(self)
+
+    @property
+    def backlog(self):
+        # NOTE: The records waiting on the formatting pool, or 0 without one
+        with self._queues_lock:
+            return sum(len(queue.pending) for queue in self._queues.values())
+
     async def handle(self, record: "LogRecordProtocol"):
+        if self.pool is not None:
+            return await self._handle_in_pool(record)
+
         try:
             msg = self.format(record)
-            await self.write_and_flush(msg)
+            await self.write_record(record, msg)
         # TODO: Catch custom exceptions
         except:  # noqa
             await self.handle_error(record)
 
+    async def drain(self):
+        """
+        Waits until the records that the running loop handed to the formatting pool so
+        far are written
+        """
+        queue = self._queues.get(get_running_loop())
+        if queue is not None and queue.task is not None:
+            await shield(queue.task)
+
+    async def write_record(self, record: "LogRecordProtocol", msg: bytes):
+        await self.write_and_flush(msg)
+
+    async def write_records(
+        self, records: list["LogRecordProtocol"], msgs: list[bytes]
+    ):
+        await self.write_batch(msgs)
+
+    async def write_batch(self, msgs: list[bytes]):
+        await self.write_and_flush(b"".join(msgs))
+
     async def handle_error(self, record: "LogRecordProtocol"):
         if settings.RAISE_EXCEPTIONS:
-            async with settings.GLOBAL_STDERR_LOCK:
-                await run_sync(Handler.handleError, None, record)
+            from anyio.to_thread import run_sync
+
+            await run_sync(_report_error, record)
+
+    async def _handle_in_pool(self, record: "LogRecordProtocol"):
+        loop = get_running_loop()
+        queue = self._queue(loop)
+        waiter = loop.create_future()
+        queue.pending.append((record, waiter))
+
+        # NOTE: A single drain task per handler and event loop keeps the records of
+        # the loop in the order they were handled, while everything that piles up
+        # behind an in-flight batch is formatted and written together in the next one.
+        # Every loop has its own, so the waiters are only resolved by their own loop.
+        if queue.task is None:
+            queue.task = loop.create_task(self._drain(queue))
+
+        await waiter
+
+    def _queue(self, loop: AbstractEventLoop):
+        if (queue := self._queues.get(loop)) is None:
+            with self._queues_lock:
+                if (queue := self._queues.get(loop)) is None:
+                    queue = self._queues[loop] = _PoolQueue()
+        return queue
+
+    async def _drain(self, queue: _PoolQueue):
+        try:
+            while queue.pending:
+                size = min(len(queue.pending), self.pool.max_batch_size)
+                batch = [queue.pending.popleft() for _ in range(size)]
+                try:
+                    await self._process_batch(batch)
+                finally:
+                    for _, waiter in batch:
+                        if not waiter.done():
+                            waiter.set_result(None)
+        finally:
+            queue.task = None
+
+    def _after_fork(self):
+        # NOTE: The records and the drain tasks belong to the parent's loops, which
+        # write them and wake their callers up
+        self._queues = WeakKeyDictionary()
+        self._queues_lock = ThreadLock()
+
+    async def _process_batch(
+        self, batch: list[tuple["LogRecordProtocol", Future[None]]]
+    ):
+        records = [record for record, _ in batch]
+
+        try:
+            results = await self.pool.format_batch(self.formatter, records)
+        except:  # noqa
+            results = [None] * len(records)
+
+        msgs, written = [], []
+        for record, msg in zip(records, results):
+            if msg is None:
+                await self.handle_error(record)
+            else:
+                msgs.append(msg)
+                written.append(record)
+
+        if not msgs:
+            return
+
+        try:
+            await self.write_records(written, msgs)
+        except:  # noqa
+            for record in written:
+                await self.handle_error(record)
 
 
 class BaseSyncHandler(BaseHandler):
     def handle(self, record: "LogRecordProtocol"):
         try:
             msg = self.format(record)
-            self.write_and_flush(msg)
+            self.write_record(record, msg)
         # TODO: Catch custom exceptions
         except:  # noqa
             self.handle_error(record)
 
+    def handle_batch(self, records: list["LogRecordProtocol"]):
+        msgs: list[bytes] = []
+        written: list["LogRecordProtocol"] = []
+
+        for record in records:
+            try:
+                msgs.append(self.format(record))
+                written.append(record)
+            except:  # noqa
+                self.handle_error(record)
+
+        if not msgs:
+            return
+
+        try:
+            self.write_records(written, msgs)
+        except:  # noqa
+            for record in written:
+                self.handle_error(record)
+
+    def write_record(self, record: "LogRecordProtocol", msg: bytes):
+        self.write_and_flush(msg)
+
+    def write_records(self, records: list["LogRecordProtocol"], msgs: list[bytes]):
+        self.write_batch(msgs)
+
+    def write_batch(self, msgs: list[bytes]):
+        self.write_and_flush(b"".join(msgs))
+
     def handle_error(self, record: "LogRecordProtocol"):
         if settings.RAISE_EXCEPTIONS:
-            with sync_lock_context(lock=settings.GLOBAL_STDERR_LOCK):
-                Handler.handleError(None, record)
+            _report_error(record)
+
+
+_async_handlers: WeakSet[BaseAsyncHandler] = WeakSet()
+
+
+def _reset_async_handlers():
+    for handler in list(_async_handlers):
+        handler._after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_async_handlers)
+
+
+def _report_error(record: "LogRecordProtocol"):
+    from logging import Handler
+
+    with settings.GLOBAL_STDERR_LOCK:
+        Handler.handleError(None, record)
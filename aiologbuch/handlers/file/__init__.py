@@ -1,2 +1,4 @@
 from .async_ import AsyncFileMixin  # noqa
+from .durability import Durability  # noqa
+from .index import TimeIndex  # noqa
 from .sync import SyncFileMixin  # noqa
@@ -1,9 +1,22 @@
+from typing import TYPE_CHECKING, Optional
+
+from aiologbuch.shared.conf import settings
+
+from .durability import Durability
 from .manager import resource_manager
+from .shards import ShardedFileMixin
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import LogRecordProtocol
 
+    from .index import TimeIndex
 
-class AsyncFileMixin:
+
+class AsyncFileMixin(ShardedFileMixin):
     _filename: str
     should_open_stream = True
+    durability = Durability.none()
+    index: Optional["TimeIndex"] = None
 
     @property
     def filename(self):
@@ -13,13 +26,59 @@ class AsyncFileMixin:
     def manager(self):
         return resource_manager
 
-    async def write_and_flush(self, msg: bytes):
-        if self.should_open_stream:
-            await self.manager.aopen_stream(filename=self.filename)
-            self.should_open_stream = False
+    def _configure_writer(
+        self, durability: Optional[Durability], index: Optional["TimeIndex"]
+    ):
+        # NOTE: Only the writer of the 'thread' backend syncs and indexes the files
+        backend = settings.STREAM_BACKEND
+        if durability is not None and durability.enabled and backend != "thread":
+            raise ValueError(f"{backend!r} backend doesn't support durability")
+        if index is not None and backend != "thread":
+            raise ValueError(f"{backend!r} backend doesn't support indexes")
+
+        if durability is not None:
+            self.durability = durability
+        self.index = index
 
-        await self.manager.asend_message(filename=self.filename, msg=msg)
+    async def write_record(self, record: "LogRecordProtocol", msg: bytes):
+        durable = self.durability.requires_sync((record.levelno,))
+        created = None if self.index is None else record.created
+        await self.write_and_flush(msg, durable, created)
+
+    async def write_records(
+        self, records: list["LogRecordProtocol"], msgs: list[bytes]
+    ):
+        durable = self.durability.requires_sync(record.levelno for record in records)
+        created = None
+        if self.index is not None:
+            created = min(record.created for record in records)
+        await self.write_and_flush(b"".join(msgs), durable, created, len(records))
+
+    async def write_and_flush(
+        self,
+        msg: bytes,
+        durable: bool = False,
+        created: Optional[float] = None,
+        count: int = 1,
+    ):
+        if self.shard is not None:
+            filename = self._open_shard()
+        else:
+            # NOTE: The stream of each event loop is opened along with its first
+            # record, which keeps the records in order
+            filename = self.filename
+            if self.should_open_stream:
+                self.manager.open_stream(filename, self.durability, self.index)
+                self.should_open_stream = False
+
+        await self.manager.asend_message(filename, msg, durable, created, count)
 
     async def close(self):
-        await self.manager.aclose_stream(filename=self.filename)
+        if self.shard is not None:
+            for filename in self._take_shards():
+                await self.manager.aclose_stream(filename, self.durability)
+            return
+
+        durability = None if self.should_open_stream else self.durability
+        await self.manager.aclose_stream(filename=self.filename, durability=durability)
         self.should_open_stream = True
@@ -1,16 +1,24 @@
-from dataclasses import dataclass
-from io import TextIOWrapper
-from typing import TYPE_CHECKING, Optional, Union, cast, overload
+import os
+from asyncio import AbstractEventLoop, Future, TimerHandle, get_running_loop
+from concurrent.futures import Future as ThreadFuture
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from io import BufferedWriter
+from select import select
+from threading import Lock as ThreadLock
+from typing import IO, TYPE_CHECKING, Optional, Union, cast, overload
 
-from anyio.streams.file import FileWriteStream
+from anyio.to_thread import run_sync
 
-try:
-    from aiofile import async_open as aopen
-except ImportError:
-    aopen = None
+from aiologbuch.shared.conf import settings
+from aiologbuch.shared.utils import in_daemon_thread
 
+# NOTE: The modules that only some of the backends need, like 'aiofile' and the
+# compression ones, are imported when those backends are first used.
 
 if TYPE_CHECKING:
+    from anyio.streams.file import FileWriteStream
+
     from aiologbuch.shared.types import (
         AsyncStreamBackendType,
         AsyncStreamProtocol,
@@ -34,6 +42,10 @@ def get_stream_backend(name: "StreamBackendType"):
         "thread": _ThreadBackend,
         "aiofile": _AIOFileBackend,
         "sync": _SyncFileBackend,
+        "fd": _FdBackend,
+        "gzip": _GzipBackend,
+        "zlib": _ZlibBackend,
+        "lzma": _LzmaBackend,
     }
 
     if backend := backends.get(name):
@@ -45,10 +57,12 @@ def get_stream_backend(name: "StreamBackendType"):
 @dataclass
 class _ThreadBackend:
     filename: str
-    stream: Optional[FileWriteStream] = None
+    stream: Optional["FileWriteStream"] = None
 
     async def open(self):
         if not self.stream:
+            from anyio.streams.file import FileWriteStream
+
             self.stream = await FileWriteStream.from_path(self.filename, True)
 
     async def send(self, msg: bytes):
@@ -61,6 +75,13 @@ class _ThreadBackend:
             await self.stream.aclose()
             self.stream = None
 
+    def _after_fork(self):
+        if self.stream:
+            from anyio.streams.file import FileStreamAttribute
+
+            discard_file(self.stream.extra(FileStreamAttribute.file))
+            self.stream = None
+
 
 @dataclass
 class _AIOFileBackend:
@@ -68,8 +89,10 @@ class _AIOFileBackend:
     stream: Optional["BinaryFileWrapperProtocol"] = None
 
     async def open(self):
-        if aopen is None:
-            raise RuntimeError("'aiofile' is not installed")
+        try:
+            from aiofile import async_open as aopen
+        except ImportError as exc:
+            raise RuntimeError("'aiofile' is not installed") from exc
 
         if not self.stream:
             self.stream = await aopen(self.filename, mode="a+b")
@@ -84,22 +107,384 @@ class _AIOFileBackend:
             await self.stream.close()
             self.stream = None
 
+    def _after_fork(self):
+        # NOTE: 'aiofile' writes straight to the fd, so there's nothing buffered
+        if self.stream:
+            discard_file(getattr(self.stream.file, "_file_obj", None))
+            self.stream = None
+
+
+@dataclass
+class _FdBackend:
+    """
+    Writes straight from the event loop to a non-blocking fd, which is meant for pipes,
+    FIFOs and character devices. The loop only waits on the fd when the kernel buffer
+    is full. Regular files can't be waited on, so the rare short write to one, like on
+    a full disk, is finished right away instead.
+
+    It can be shared by several event loops and threads: the data that doesn't fit is
+    buffered in order and written by the loop that found the fd full, which then wakes
+    up the senders of the other loops.
+    """
+
+    filename: str
+    fd: Optional[int] = None
+    _buffer: bytearray = field(default_factory=bytearray)
+    _waiters: list[tuple[AbstractEventLoop, Future[None]]] = field(default_factory=list)
+    _drainer: Optional[AbstractEventLoop] = None
+    _lock: ThreadLock = field(default_factory=ThreadLock)
+
+    @classmethod
+    def from_fd(cls, fd: int):
+        # NOTE: A regular file, like 'python app.py 2> app.log', keeps sharing the
+        # file description, and so the offset, with the other writers of the fd, like
+        # 'sys.stderr', or they would overwrite each other. It never blocks anyway.
+        if not _is_pollable(fd):
+            return cls(filename=f"<fd {fd}>", fd=os.dup(fd))
+
+        # NOTE: Reopening the other fds through '/proc' gives them a file description
+        # of their own, so making them non-blocking doesn't affect the other writers.
+        # Where that isn't possible, the description is shared, which is what
+        # 'loop.connect_write_pipe' does anyway.
+        try:
+            own_fd = os.open(f"/proc/self/fd/{fd}", os.O_WRONLY | os.O_APPEND)
+        except OSError:
+            own_fd = os.dup(fd)
+
+        os.set_blocking(own_fd, False)
+        return cls(filename=f"<fd {fd}>", fd=own_fd)
+
+    async def open(self):
+        if self.fd is not None:
+            return
+
+        # NOTE: Opening a FIFO blocks until it has a reader, so it's done in a thread.
+        # The writes are the ones that never leave the loop.
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        fd: Optional[int] = await run_sync(os.open, self.filename, flags, 0o644)
+        os.set_blocking(fd, False)
+
+        with self._lock:
+            if self.fd is None:
+                self.fd, fd = fd, None
+        if fd is not None:
+            os.close(fd)
+
+    async def send(self, msg: bytes):
+        loop = get_running_loop()
+
+        with self._lock:
+            if not self._write_or_buffer(msg):
+                return
+
+            if self._drainer is None:
+                try:
+                    loop.add_writer(self.fd, self._write_buffer)
+                except OSError:
+                    # NOTE: Regular files can't be polled, and never stay full
+                    self._drain()
+                    return
+                self._drainer = loop
+
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+
+        await waiter
+
+    def write(self, msg: bytes):
+        # NOTE: For the sync callers, which can wait on the fd themselves when no loop
+        # is already doing it
+        with self._lock:
+            if self._write_or_buffer(msg) and self._drainer is None:
+                self._drain()
+
+    async def close(self):
+        loop = get_running_loop()
+
+        with self._lock:
+            if self.fd is None:
+                return
+
+            waiter = None
+            if self._buffer and self._is_draining():
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+
+        if waiter is not None:
+            await waiter
+
+        self.close_now()
+
+    def close_now(self):
+        with self._lock:
+            if self.fd is None:
+                return
+
+            # NOTE: Whatever is left is written before closing, even if it blocks
+            self._drain()
+            _, waiters = self._stop_draining()
+            os.close(self.fd)
+            self.fd = None
+
+        _wake_up_all(None, waiters, None)
+
+    def _after_fork(self):
+        # NOTE: The buffered data and the waiters belong to the parent, which writes
+        # and wakes them up, so they're only dropped
+        self._lock = ThreadLock()
+        self._buffer = bytearray()
+        self._waiters, self._drainer = [], None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _write_or_buffer(self, msg: bytes):
+        # NOTE: Returns whether some data was left in the buffer
+        if self.fd is None:
+            raise RuntimeError(f"{self.filename!r}'s stream was not initialized")
+
+        if self._buffer:
+            self._buffer += msg
+            return True
+
+        try:
+            written = os.write(self.fd, msg)
+        except BlockingIOError:
+            written = 0
+
+        if written == len(msg):
+            return False
+
+        self._buffer += memoryview(msg)[written:]
+        return True
+
+    def _is_draining(self):
+        return self._drainer is not None and self._drainer.is_running()
+
+    def _stop_draining(self):
+        drainer, self._drainer = self._drainer, None
+        waiters, self._waiters = self._waiters, []
+
+        if drainer is not None:
+            try:
+                drainer.remove_writer(self.fd)
+            except (OSError, RuntimeError):
+                pass  # NOTE: The loop was closed in the meantime
+
+        return drainer, waiters
+
+    def _drain(self):
+        # NOTE: Blocks until the buffer is written, for when there's no loop to wait on
+        while self._buffer:
+            select((), (self.fd,), ())
+            try:
+                written = os.write(self.fd, self._buffer)
+            except BlockingIOError:
+                continue
+            except OSError:
+                # NOTE: Like a full disk. The data is dropped, so the fd isn't stuck
+                self._buffer.clear()
+                raise
+            del self._buffer[:written]
+
+    def _write_buffer(self):
+        error = None
+
+        with self._lock:
+            try:
+                written = os.write(self.fd, self._buffer)
+            except BlockingIOError:
+                return
+            except OSError as exc:
+                self._buffer.clear()
+                error = exc
+            else:
+                del self._buffer[:written]
+                if self._buffer:
+                    return
+
+            drainer, waiters = self._stop_draining()
+
+        _wake_up_all(drainer, waiters, error)
+
+
+def _is_pollable(fd: int):
+    import stat
+
+    mode = os.fstat(fd).st_mode
+    return stat.S_ISFIFO(mode) or stat.S_ISCHR(mode) or stat.S_ISSOCK(mode)
+
+
+def discard_file(file: Optional[IO[bytes]]):
+    """
+    Closes a file that was inherited from the parent process without flushing its
+    buffer, which the parent writes itself.
+    """
+    if file is None:
+        return
+
+    # NOTE: Once the raw file is closed, the buffered one has nothing to flush to, so
+    # it won't write anything, not even when it's garbage collected
+    try:
+        getattr(file, "raw", file).close()
+    except (OSError, ValueError):
+        pass
+
+
+def _wake_up_all(
+    drainer: Optional[AbstractEventLoop],
+    waiters: list[tuple[AbstractEventLoop, Future[None]]],
+    error: Optional[BaseException],
+):
+    for loop, waiter in waiters:
+        if loop is drainer:
+            _wake_up(waiter, error)
+        else:
+            try:
+                loop.call_soon_threadsafe(_wake_up, waiter, error)
+            except RuntimeError:
+                pass  # NOTE: The loop was closed in the meantime
+
+
+def _wake_up(waiter: Future[None], error: Optional[BaseException]):
+    if waiter.done():
+        return
+    if error is not None:
+        waiter.set_exception(error)
+    else:
+        waiter.set_result(None)
+
 
 @dataclass
 class _SyncFileBackend:
     filename: str
-    stream: Optional[TextIOWrapper] = None
+    stream: Optional[BufferedWriter] = None
 
     def open(self):
         if not self.stream:
-            self.stream = open(file=self.filename, mode="ab", encoding="utf-8")
+            self.stream = open(file=self.filename, mode="ab")
 
     def send(self, msg: bytes):
         if not self.stream:
             raise RuntimeError(f"{self.filename!r}'s stream was not initialized")
         self.stream.write(msg)
+        self.stream.flush()
 
     def close(self):
         if self.stream:
             self.stream.close()
             self.stream = None
+
+
+@dataclass
+class _CompressedBackend:
+    filename: str
+    level: Optional[int] = field(default_factory=lambda: settings.COMPRESSION_LEVEL)
+    block_size: int = field(default_factory=lambda: settings.COMPRESSION_BLOCK_SIZE)
+    flush_interval: float = field(
+        default_factory=lambda: settings.COMPRESSION_FLUSH_INTERVAL
+    )
+    stream: Optional[BufferedWriter] = None
+
+    _buffer: bytearray = field(default_factory=bytearray)
+    _executor: Optional[ThreadPoolExecutor] = None
+    _flush_handle: Optional[TimerHandle] = None
+    _error: Optional[BaseException] = None
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError("compress() must be implemented in subclasses")
+
+    async def open(self):
+        if not self.stream:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="aiologbuch-compressor"
+            )
+            self.stream = await run_sync(open, self.filename, "ab")
+
+    async def send(self, msg: bytes):
+        if not self.stream:
+            raise RuntimeError(f"{self.filename!r}'s stream was not initialized")
+
+        if (error := self._error) is not None:
+            self._error = None
+            raise error
+
+        # NOTE: The event loop only appends to the buffer. Full blocks are compressed
+        # and written by a single worker thread, which keeps them in order.
+        self._buffer += msg
+        if len(self._buffer) >= self.block_size:
+            self._flush_block()
+        elif self._flush_handle is None:
+            loop = get_running_loop()
+            self._flush_handle = loop.call_later(self.flush_interval, self._flush_block)
+
+    async def close(self):
+        if self.stream:
+            self._flush_block()
+            executor, stream = self._executor, self.stream
+
+            def close():
+                executor.shutdown()
+                stream.close()
+
+            await in_daemon_thread(get_running_loop(), close)
+            self.stream, self._executor = None, None
+
+    def _flush_block(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._buffer or self._executor is None:
+            return
+
+        block = bytes(self._buffer)
+        self._buffer.clear()
+
+        future = self._executor.submit(self._write_block, self.stream, block)
+        future.add_done_callback(self._store_error)
+
+    def _write_block(self, stream: BufferedWriter, block: bytes):
+        # NOTE: Every block is a self-contained compressed unit that is flushed right
+        # away, so the file stays readable up to the last block after a crash.
+        stream.write(self.compress(block))
+        stream.flush()
+
+    def _store_error(self, future: ThreadFuture[None]):
+        if (error := future.exception()) is not None:
+            self._error = error
+
+    def _after_fork(self):
+        # NOTE: The worker thread doesn't exist in the child, and the blocks that
+        # weren't written yet belong to the parent
+        if self.stream:
+            discard_file(self.stream)
+        self._buffer = bytearray()
+        self.stream, self._executor = None, None
+        self._flush_handle, self._error = None, None
+
+
+@dataclass
+class _GzipBackend(_CompressedBackend):
+    def compress(self, data: bytes):
+        import gzip
+
+        level = 6 if self.level is None else self.level
+        return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+@dataclass
+class _ZlibBackend(_CompressedBackend):
+    def compress(self, data: bytes):
+        import zlib
+
+        level = -1 if self.level is None else self.level
+        return zlib.compress(data, level)
+
+
+@dataclass
+class _LzmaBackend(_CompressedBackend):
+    def compress(self, data: bytes):
+        import lzma
+
+        return lzma.compress(data, preset=self.level)
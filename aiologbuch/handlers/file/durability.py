@@ -0,0 +1,50 @@
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Optional
+
+from aiologbuch.shared.levels import LogLevel, check_level
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import LevelType
+
+
+class Durability(NamedTuple):
+    """
+    When the records written to a file are fsync'ed. The policies can be combined, and
+    the records at or above 'level' are only handled once they reached the disk, while
+    the others are synced in the background.
+    """
+
+    interval: Optional[float] = None
+    max_bytes: Optional[int] = None
+    level: Optional[int] = None
+
+    @classmethod
+    def none(cls):
+        return cls()
+
+    @classmethod
+    def every_ms(cls, milliseconds: int):
+        if milliseconds <= 0:
+            raise ValueError("'milliseconds' must be positive")
+        return cls(interval=milliseconds / 1000)
+
+    @classmethod
+    def every_bytes(cls, max_bytes: int):
+        if max_bytes <= 0:
+            raise ValueError("'max_bytes' must be positive")
+        return cls(max_bytes=max_bytes)
+
+    @classmethod
+    def on_level(cls, level: "LevelType" = LogLevel.ERROR):
+        return cls(level=check_level(level))
+
+    @property
+    def enabled(self):
+        return self != _NONE
+
+    def requires_sync(self, levels: Iterable[int]):
+        if self.level is None:
+            return False
+        return any(level >= self.level for level in levels)
+
+
+_NONE = Durability()
@@ -0,0 +1,74 @@
+import struct
+from io import FileIO
+from typing import NamedTuple, Optional
+
+from .backends import discard_file
+
+INDEX_SUFFIX = ".idx"
+# NOTE: The creation time of the oldest record written at an offset, and the offset
+INDEX_ENTRY = struct.Struct("<dQ")
+
+
+class TimeIndex(NamedTuple):
+    """
+    How often an entry is added to the sidecar index of a file, which maps the times
+    of the records to their offsets in it. Whichever comes first adds the next one.
+    """
+
+    every_records: Optional[int] = 1000
+    every_bytes: Optional[int] = 1024 * 1024
+
+    def combine(self, other: "TimeIndex"):
+        return TimeIndex(
+            every_records=_min(self.every_records, other.every_records),
+            every_bytes=_min(self.every_bytes, other.every_bytes),
+        )
+
+
+class IndexWriter:
+    """
+    Appends the entries of a file's index. It's only called by the file's writer,
+    under its lock, and only touches the disk once an entry is due.
+    """
+
+    _stream: Optional[FileIO]
+
+    def __init__(self, filename: str, index: TimeIndex):
+        self.filename = filename + INDEX_SUFFIX
+        self.index = index
+        self._stream = None
+        self._records = 0
+        self._bytes = 0
+
+    def is_due(self):
+        records, size = self.index
+        return (
+            self._stream is None
+            or (records is not None and self._records >= records)
+            or (size is not None and self._bytes >= size)
+        )
+
+    def add(self, created: float, offset: int):
+        if self._stream is None:
+            self._stream = FileIO(self.filename, "ab")
+        self._stream.write(INDEX_ENTRY.pack(created, offset))
+        self._records = self._bytes = 0
+
+    def count(self, records: int, size: int):
+        self._records += records
+        self._bytes += size
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def _after_fork(self):
+        discard_file(self._stream)
+        self._stream = None
+
+
+def _min(first: Optional[int], second: Optional[int]):
+    if first is None or second is None:
+        return first if second is None else second
+    return min(first, second)
@@ -1,28 +1,33 @@
-from asyncio import Lock
+import os
+from asyncio import AbstractEventLoop, Lock, get_running_loop, run_coroutine_threadsafe
 from threading import Lock as ThreadLock
-from typing import TYPE_CHECKING, Union, cast
+from typing import TYPE_CHECKING, Optional, Union
+from weakref import WeakKeyDictionary
 
 from aiologbuch.shared.conf import settings
-from aiologbuch.shared.enums import IOModeEnum
-from aiologbuch.shared.utils import sync_lock_context
+from aiologbuch.shared.utils import in_daemon_thread
 
-from .backends import get_stream_backend
+from .backends import _FdBackend, get_stream_backend
+from .writer import FileWriter, LoopFrontEnd
 
 if TYPE_CHECKING:
-    from aiologbuch.shared.types import (
-        AsyncStreamProtocol,
-        IOMode,
-        SyncStreamBackendType,
-        SyncStreamProtocol,
-    )
+    from aiologbuch.shared.types import AsyncStreamBackendType, AsyncStreamProtocol
+
+    from .durability import Durability
+    from .index import TimeIndex
+
+
+_COMPRESSED_BACKENDS = ("gzip", "zlib", "lzma")
 
 
 class _ResourceManager:
-    _lock: Lock
+    _lock: ThreadLock
     _resources: dict[str, "_StreamResource"]
 
     def __init__(self):
-        self._lock = Lock()
+        # NOTE: A thread lock, which is only held to look the resources up, so that
+        # every event loop and thread can share them
+        self._lock = ThreadLock()
         self._resources = dict()
 
     @property
@@ -33,167 +38,276 @@ class _ResourceManager:
     def lock(self):
         return self._lock
 
-    def ensure_correct_mode(self, resource: "_StreamResource", mode: "IOMode"):
-        if resource.mode != mode:
-            raise
-
-    async def aopen_stream(self, filename: str):
-        async with self.lock:
-            if (resource := self.resources.get(filename)) is None:
-                resource = _StreamResource(filename=filename, mode=IOModeEnum.ASYNC)
-                self.resources[filename] = resource
-
-            self.ensure_correct_mode(resource=resource, mode=IOModeEnum.ASYNC)
-
-            resource.reference_count += 1
-
-        await resource.aopen()
-
-    def open_stream(self, filename: str):
-        with sync_lock_context(lock=self.lock):
+    async def aopen_stream(
+        self,
+        filename: str,
+        durability: Optional["Durability"] = None,
+        index: Optional["TimeIndex"] = None,
+    ):
+        await self._acquire(filename, durability, index).aopen()
+
+    def open_stream(
+        self,
+        filename: str,
+        durability: Optional["Durability"] = None,
+        index: Optional["TimeIndex"] = None,
+    ):
+        self._acquire(filename, durability, index)
+
+    async def asend_message(
+        self,
+        filename: str,
+        msg: bytes,
+        durable: bool = False,
+        created: Optional[float] = None,
+        count: int = 1,
+    ):
+        await self._get(filename=filename).asend(msg, durable, created, count)
+
+    def send_message(
+        self,
+        filename: str,
+        msg: bytes,
+        durable: bool = False,
+        created: Optional[float] = None,
+        count: int = 1,
+    ):
+        self._get(filename=filename).send(msg, durable, created, count)
+
+    async def aclose_stream(
+        self, filename: str, durability: Optional["Durability"] = None
+    ):
+        if (resource := self._release(filename, durability)) is not None:
+            await resource.aclose()
+
+    def close_stream(self, filename: str, durability: Optional["Durability"] = None):
+        if (resource := self._release(filename, durability)) is not None:
+            resource.close()
+
+    def _acquire(
+        self,
+        filename: str,
+        durability: Optional["Durability"],
+        index: Optional["TimeIndex"] = None,
+    ):
+        with self.lock:
             if (resource := self.resources.get(filename)) is None:
-                resource = _StreamResource(filename=filename, mode=IOModeEnum.SYNC)
+                resource = _StreamResource(filename=filename)
                 self.resources[filename] = resource
 
-            self.ensure_correct_mode(resource=resource, mode=IOModeEnum.SYNC)
-
             resource.reference_count += 1
-
-        resource.open()
-
-    async def asend_message(self, filename: str, msg: bytes):
-        async with self.lock:
-            if (resource := self.resources.get(filename)) is None:
-                raise RuntimeError(f"{filename!r}'s stream was not initialized")
-
-            self.ensure_correct_mode(resource=resource, mode=IOModeEnum.ASYNC)
-
-        await resource.asend(msg=msg)
-
-    def send_message(self, filename: str, msg: bytes):
-        with sync_lock_context(lock=self.lock):
-            if (resource := self.resources.get(filename)) is None:
-                raise RuntimeError(f"{filename!r}'s stream was not initialized")
-
-            self.ensure_correct_mode(resource=resource, mode=IOModeEnum.SYNC)
-
-        resource.send(msg=msg)
-
-    async def aclose_stream(self, filename: str):
-        stream = None
-
-        async with self.lock:
-            if (resource := self.resources.get(filename)) is None:
-                return
-
-            self.ensure_correct_mode(resource=resource, mode=IOModeEnum.ASYNC)
-
-            resource.reference_count -= 1
-            if resource.reference_count <= 0:
-                stream = self.resources.pop(filename)
-
-        if stream:
-            await stream.aclose()
-
-    def close_stream(self, filename: str):
-        stream = None
-
-        with sync_lock_context(lock=self.lock):
+            if durability is not None and durability.enabled:
+                resource.writer.add_policy(durability)
+            if index is not None:
+                resource.writer.add_index(index)
+            return resource
+
+    def _get(self, filename: str):
+        if (resource := self.resources.get(filename)) is None:
+            raise RuntimeError(f"{filename!r}'s stream was not initialized")
+        return resource
+
+    def _after_fork(self):
+        # NOTE: The handlers of the parent still exist in the child, so the resources
+        # and their reference counts are kept, while their streams are reopened
+        self._lock = ThreadLock()
+        for resource in self.resources.values():
+            resource._after_fork()
+
+    def _release(self, filename: str, durability: Optional["Durability"]):
+        with self.lock:
             if (resource := self.resources.get(filename)) is None:
-                return
-
-            self.ensure_correct_mode(resource=resource, mode=IOModeEnum.SYNC)
+                return None
 
+            if durability is not None and durability.enabled:
+                resource.writer.remove_policy(durability)
             resource.reference_count -= 1
             if resource.reference_count <= 0:
-                stream = self.resources.pop(filename)
+                return self.resources.pop(filename)
 
-        if stream:
-            stream.close()
+        return None
 
 
 class _StreamResource:
+    """
+    Every file has a single thread-safe writer, which the sync callers use directly.
+    Each event loop gets a front-end of its own to reach it, or to write through the
+    async backend that was configured, so the loops never share asyncio primitives.
+    """
+
     _filename: str
-    _lock: Union[Lock, ThreadLock]
-    _stream: Union["AsyncStreamProtocol", "SyncStreamProtocol"]
+    _backend: "AsyncStreamBackendType"
+    _writer: FileWriter
+    _fd_stream: Optional[_FdBackend]
+    _streams: WeakKeyDictionary[AbstractEventLoop, Union[LoopFrontEnd, "_LoopStream"]]
 
     reference_count: int
-    mode: "IOMode"
-
-    def _async_stream(self):
-        backend = get_stream_backend(settings.STREAM_BACKEND)
-        return backend(filename=self.filename)
 
-    def _sync_stream(self):
-        backend = get_stream_backend(cast("SyncStreamBackendType", IOModeEnum.SYNC))
-        return backend(filename=self.filename)
-
-    def __init__(self, filename: str, mode: "IOMode"):
+    def __init__(self, filename: str):
         self._filename = filename
-
-        if mode == IOModeEnum.ASYNC:
-            self._lock = Lock()
-            self._stream = self._async_stream()
-        else:
-            self._lock = ThreadLock()
-            self._stream = self._sync_stream()
-
+        self._backend = settings.STREAM_BACKEND
+        self._writer = FileWriter(filename=filename)
+        self._fd_stream = None
+        self._streams = WeakKeyDictionary()
+        self._plain = False
+        self._lock = ThreadLock()
         self.reference_count = 0
-        self.mode = mode
-
-    @property
-    def lock(self):
-        return self._lock
 
     @property
     def filename(self):
         return self._filename
 
     @property
-    def stream(self):
-        return self._stream
+    def writer(self):
+        return self._writer
 
     async def aopen(self):
-        if self.mode != IOModeEnum.ASYNC:
-            raise
-
-        async with self.lock:
-            await self.stream.open()
-
-    def open(self):
-        if self.mode != IOModeEnum.SYNC:
-            raise
+        await self._stream().open()
+
+    async def asend(
+        self,
+        msg: bytes,
+        durable: bool = False,
+        created: Optional[float] = None,
+        count: int = 1,
+    ):
+        # NOTE: Only the writer's front-ends sync and index the file, the handlers make
+        # sure that no other backend is used along with those
+        stream = self._stream()
+        if isinstance(stream, LoopFrontEnd):
+            await stream.send(msg, durable, created, count)
+        else:
+            await stream.send(msg)
+
+    def send(
+        self,
+        msg: bytes,
+        durable: bool = False,
+        created: Optional[float] = None,
+        count: int = 1,
+    ):
+        # NOTE: Plain and compressed records can't be mixed in the same file
+        if self._backend in _COMPRESSED_BACKENDS and self._streams:
+            raise RuntimeError(f"Can't write plain records to {self.filename!r}")
+        self._plain = True
+
+        if (fd_stream := self._fd_stream) is not None and fd_stream.fd is not None:
+            fd_stream.write(msg)
+        else:
+            self._writer.write(msg, durable, created, count)
 
-        with self.lock:
-            self.stream.open()
+    async def aclose(self):
+        loop = get_running_loop()
+        for stream_loop, stream in self._detach_streams():
+            if stream_loop is loop:
+                await stream.close()
+            elif stream_loop.is_running():
+                run_coroutine_threadsafe(stream.close(), stream_loop)
+
+        if self._fd_stream is not None:
+            await self._fd_stream.close()
+        # NOTE: Not in a worker thread of anyio, which would hold the process up at exit
+        # if the close hangs and the shutdown gives up on it
+        await in_daemon_thread(loop, self._writer.close)
 
-    async def asend(self, msg: bytes):
-        if self.mode != IOModeEnum.ASYNC:
-            raise
+    def close(self):
+        for stream_loop, stream in self._detach_streams():
+            if stream_loop.is_running():
+                run_coroutine_threadsafe(stream.close(), stream_loop)
+
+        if self._fd_stream is not None:
+            self._fd_stream.close_now()
+        self._writer.close()
+
+    def _after_fork(self):
+        self._lock = ThreadLock()
+        self._writer._after_fork()
+
+        for stream in self._streams.values():
+            if isinstance(stream, _LoopStream) and not stream.shared:
+                stream._after_fork()
+        self._streams = WeakKeyDictionary()
+
+        if self._fd_stream is not None:
+            self._fd_stream._after_fork()
+            self._fd_stream = None
+
+    def _stream(self):
+        loop = get_running_loop()
+        if (stream := self._streams.get(loop)) is not None:
+            return stream
+
+        with self._lock:
+            if (stream := self._streams.get(loop)) is None:
+                stream = self._streams[loop] = self._create_stream()
+        return stream
+
+    def _create_stream(self):
+        # NOTE: The 'thread' backend goes through the shared writer, while the 'fd'
+        # stream is shared by the loops, since it's safe to use from all of them. The
+        # other backends are bound to a loop, so every loop opens its own stream.
+        if self._backend == "thread":
+            return self._writer.front_end()
+        if self._backend == "fd":
+            if self._fd_stream is None:
+                self._fd_stream = _FdBackend(filename=self.filename)
+            return _LoopStream(stream=self._fd_stream, shared=True)
+        if self._backend in _COMPRESSED_BACKENDS and self._plain:
+            raise RuntimeError(f"Can't write compressed records to {self.filename!r}")
+        return _LoopStream(stream=get_stream_backend(self._backend)(self.filename))
+
+    def _detach_streams(self):
+        with self._lock:
+            streams = [
+                (loop, stream)
+                for loop, stream in self._streams.items()
+                if not (isinstance(stream, _LoopStream) and stream.shared)
+            ]
+            self._streams.clear()
+        return streams
+
+
+class _LoopStream:
+    """
+    The front-end of an event loop to a stream of an async backend, which is opened
+    when it's first used. The lock only belongs to this loop, and keeps the records
+    in the order they were sent, opening included.
+    """
 
-        async with self.lock:
-            await self.stream.send(msg)
+    _lock: Lock
+    _stream: "AsyncStreamProtocol"
 
-    def send(self, msg: bytes):
-        if self.mode != IOModeEnum.SYNC:
-            raise
+    def __init__(self, stream: "AsyncStreamProtocol", shared: bool = False):
+        self._lock = Lock()
+        self._stream = stream
+        self._opened = False
+        self.shared = shared
 
-        with self.lock:
-            self.stream.send(msg)
+    async def open(self):
+        async with self._lock:
+            await self._open()
 
-    async def aclose(self):
-        if self.mode != IOModeEnum.ASYNC:
-            raise
+    async def send(self, msg: bytes):
+        async with self._lock:
+            await self._open()
+            await self._stream.send(msg)
 
-        async with self.lock:
-            await self.stream.close()
+    async def close(self):
+        # NOTE: The shared streams are closed by their resource
+        async with self._lock:
+            if self._opened and not self.shared:
+                await self._stream.close()
+            self._opened = False
 
-    def close(self):
-        if self.mode != IOModeEnum.SYNC:
-            raise
+    def _after_fork(self):
+        if (after_fork := getattr(self._stream, "_after_fork", None)) is not None:
+            after_fork()
 
-        with self.lock:
-            self.stream.close()
+    async def _open(self):
+        if not self._opened:
+            await self._stream.open()
+            self._opened = True
 
 
 resource_manager = _ResourceManager()
+os.register_at_fork(after_in_child=resource_manager._after_fork)
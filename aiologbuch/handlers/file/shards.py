@@ -0,0 +1,57 @@
+import os
+from threading import Lock, get_native_id
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import ShardType
+
+_SHARD_TYPES = ("process", "thread")
+
+_lock = Lock()
+
+
+def shard_filename(filename: str, shard: "ShardType"):
+    """The file of the calling process, or thread, such as 'app.log.<pid>.<tid>'"""
+    if shard == "process":
+        return f"{filename}.{os.getpid()}"
+    return f"{filename}.{os.getpid()}.{get_native_id()}"
+
+
+class ShardedFileMixin:
+    """
+    Writes the records of every process, or thread, to a file of its own, so that
+    they never share a file, nor its writer. Every shard is opened once, by the first
+    record of its process or thread.
+    """
+
+    shard: Optional["ShardType"] = None
+    _shards: set[str]
+
+    def _configure_shard(self, shard: Optional["ShardType"]):
+        if shard is not None and shard not in _SHARD_TYPES:
+            raise ValueError(f"Unsupported shard: {shard!r}")
+
+        self.shard = shard
+        self._shards = set()
+
+    def _open_shard(self):
+        filename = shard_filename(self.filename, self.shard)
+        if filename not in self._shards:
+            with _lock:
+                if filename not in self._shards:
+                    self.manager.open_stream(filename, self.durability, self.index)
+                    self._shards.add(filename)
+        return filename
+
+    def _take_shards(self):
+        with _lock:
+            shards, self._shards = self._shards, set()
+        return shards
+
+
+def _reset_lock():
+    global _lock
+    _lock = Lock()
+
+
+os.register_at_fork(after_in_child=_reset_lock)
@@ -1,9 +1,20 @@
+from typing import TYPE_CHECKING, Optional
+
+from .durability import Durability
 from .manager import resource_manager
+from .shards import ShardedFileMixin
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import LogRecordProtocol
+
+    from .index import TimeIndex
 
 
-class SyncFileMixin:
+class SyncFileMixin(ShardedFileMixin):
     _filename: str
     should_open_stream = True
+    durability = Durability.none()
+    index: Optional["TimeIndex"] = None
 
     @property
     def filename(self):
@@ -13,13 +24,41 @@ class SyncFileMixin:
     def manager(self):
         return resource_manager
 
-    def write_and_flush(self, msg: bytes):
-        if self.should_open_stream:
-            self.manager.open_stream(filename=self.filename)
-            self.should_open_stream = False
+    def write_record(self, record: "LogRecordProtocol", msg: bytes):
+        durable = self.durability.requires_sync((record.levelno,))
+        created = None if self.index is None else record.created
+        self.write_and_flush(msg, durable, created)
 
-        self.manager.send_message(filename=self.filename, msg=msg)
+    def write_records(self, records: list["LogRecordProtocol"], msgs: list[bytes]):
+        durable = self.durability.requires_sync(record.levelno for record in records)
+        created = None
+        if self.index is not None:
+            created = min(record.created for record in records)
+        self.write_and_flush(b"".join(msgs), durable, created, len(records))
+
+    def write_and_flush(
+        self,
+        msg: bytes,
+        durable: bool = False,
+        created: Optional[float] = None,
+        count: int = 1,
+    ):
+        if self.shard is not None:
+            filename = self._open_shard()
+        else:
+            filename = self.filename
+            if self.should_open_stream:
+                self.manager.open_stream(filename, self.durability, self.index)
+                self.should_open_stream = False
+
+        self.manager.send_message(filename, msg, durable, created, count)
 
     def close(self):
-        self.manager.close_stream(filename=self.filename)
+        if self.shard is not None:
+            for filename in self._take_shards():
+                self.manager.close_stream(filename, self.durability)
+            return
+
+        durability = None if self.should_open_stream else self.durability
+        self.manager.close_stream(filename=self.filename, durability=durability)
         self.should_open_stream = True
@@ -0,0 +1,339 @@
+import os
+from asyncio import AbstractEventLoop, Future, get_running_loop, shield, wrap_future
+from collections import Counter
+from concurrent.futures import Future as ThreadFuture
+from io import BufferedWriter
+from queue import Empty, SimpleQueue
+from threading import Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING, Optional, Union
+from weakref import WeakKeyDictionary
+
+from .backends import discard_file
+from .index import IndexWriter, TimeIndex
+
+if TYPE_CHECKING:
+    from .durability import Durability
+
+    # NOTE: The data, its waiter, whether it's durable, and the creation time of its
+    # oldest record along with how many records it holds, for the index
+    type _Write = tuple[bytes, ThreadFuture[None], bool, Optional[float], int]
+    type _Item = Union[_Write, object, None]
+
+# NOTE: Wakes the writer's thread up, so it checks whether the file must be synced
+_WAKE = object()
+# NOTE: The weight of the last write in the moving average of the write latency
+_LATENCY_WEIGHT = 0.2
+
+
+class FileWriter:
+    """
+    The single writer of a file, shared by every event loop and thread of the process.
+    The sync callers write under its lock, while the event loops hand their records to
+    its thread through front-ends of their own, so no loop ever shares a primitive
+    with another one.
+
+    The thread also syncs the file, as the durability policies of its handlers require.
+    Everything that was written in the meantime is synced at once, so the callers that
+    wait on the disk share a single fsync.
+    """
+
+    _stream: Optional[BufferedWriter]
+    _queue: SimpleQueue["_Item"]
+    _thread: Optional[Thread]
+    _front_ends: WeakKeyDictionary[AbstractEventLoop, "LoopFrontEnd"]
+    _policies: Counter["Durability"]
+    _index: Optional[IndexWriter]
+
+    def __init__(self, filename: str, max_batch_size: int = 512):
+        self.filename = filename
+        self.max_batch_size = max_batch_size
+        self._stream = None
+        self._index = None
+        self._policies = Counter()
+        self._interval: Optional[float] = None
+        self._max_bytes: Optional[int] = None
+        self._latency = 0.0
+        self._reset()
+
+    @property
+    def latency(self):
+        """The moving average of the seconds that writing, and syncing, a batch takes"""
+        return self._latency
+
+    def add_policy(self, durability: "Durability"):
+        with self._lock:
+            self._policies[durability] += 1
+            self._update_policies()
+
+    def remove_policy(self, durability: "Durability"):
+        with self._lock:
+            self._policies[durability] -= 1
+            self._policies = +self._policies
+            self._update_policies()
+
+    def add_index(self, index: TimeIndex):
+        # NOTE: A file has a single index, which follows the handler that asks for the
+        # most entries
+        with self._lock:
+            if self._index is None:
+                self._index = IndexWriter(filename=self.filename, index=index)
+            else:
+                self._index.index = self._index.index.combine(index)
+
+    def front_end(self):
+        loop = get_running_loop()
+        if (front_end := self._front_ends.get(loop)) is None:
+            with self._thread_lock:
+                if (front_end := self._front_ends.get(loop)) is None:
+                    front_end = LoopFrontEnd(writer=self, loop=loop)
+                    self._front_ends[loop] = front_end
+        return front_end
+
+    def write(
+        self,
+        msg: bytes,
+        durable: bool = False,
+        created: Optional[float] = None,
+        count: int = 1,
+    ):
+        # NOTE: The durable writes wait on the thread, so the ones of every thread and
+        # event loop are synced together
+        if durable:
+            return self.submit(msg, True, created, count).result()
+
+        with self._lock:
+            first = not self._dirty
+            self._write(msg, created, count)
+            wake = self._sync_due() or (first and self._interval is not None)
+
+        if wake:
+            self._wake_up()
+
+    def submit(
+        self,
+        msg: bytes,
+        durable: bool = False,
+        created: Optional[float] = None,
+        count: int = 1,
+    ):
+        future: ThreadFuture[None] = ThreadFuture()
+        if self._thread is None:
+            self._start()
+        self._queue.put((msg, future, durable, created, count))
+        return future
+
+    def close(self):
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+        with self._lock:
+            if self._stream is not None:
+                if self._dirty:
+                    os.fsync(self._stream.fileno())
+                self._stream.close()
+                self._stream = None
+            if self._index is not None:
+                self._index.close()
+            self._dirty, self._dirty_since = 0, None
+
+    def _after_fork(self):
+        # NOTE: The file is opened again by the child when it first writes to it. The
+        # data that was still buffered, or enqueued for the parent's thread, is
+        # written by the parent only.
+        discard_file(self._stream)
+        self._stream = None
+        if self._index is not None:
+            self._index._after_fork()
+        self._reset()
+
+    def _reset(self):
+        self._lock = Lock()
+        self._queue = SimpleQueue()
+        self._thread = None
+        self._thread_lock = Lock()
+        self._front_ends = WeakKeyDictionary()
+        self._dirty, self._dirty_since = 0, None
+
+    def _update_policies(self):
+        intervals = [policy.interval for policy in self._policies if policy.interval]
+        sizes = [policy.max_bytes for policy in self._policies if policy.max_bytes]
+        self._interval = min(intervals, default=None)
+        self._max_bytes = min(sizes, default=None)
+
+    def _start(self):
+        with self._thread_lock:
+            if self._thread is None:
+                thread = Thread(
+                    target=self._run, name=f"aiologbuch-writer-{self.filename}"
+                )
+                thread.daemon = True
+                thread.start()
+                self._thread = thread
+
+    def _wake_up(self):
+        if self._thread is None:
+            self._start()
+        self._queue.put(_WAKE)
+
+    def _run(self):
+        queue = self._queue
+
+        while True:
+            try:
+                items = [queue.get(timeout=self._sync_timeout())]
+            except Empty:
+                items = []
+
+            while len(items) < self.max_batch_size:
+                try:
+                    items.append(queue.get_nowait())
+                except Empty:
+                    break
+
+            self._write_batch([item for item in items if isinstance(item, tuple)])
+
+            if None in items:
+                return
+
+    def _write_batch(self, batch: list["_Write"]):
+        # NOTE: Everything that was enqueued in the meantime is written at once, and
+        # then synced once if any of it has to be
+        try:
+            with self._lock:
+                if batch:
+                    created = [item[3] for item in batch if item[3] is not None]
+                    self._write(
+                        b"".join(item[0] for item in batch),
+                        min(created, default=None),
+                        sum(item[4] for item in batch),
+                    )
+
+                durable = any(item[2] for item in batch)
+                if sync := bool(self._dirty and (durable or self._sync_due())):
+                    fd = self._stream.fileno()
+                    self._dirty, self._dirty_since = 0, None
+
+            # NOTE: Outside of the lock, so the sync callers keep writing meanwhile.
+            # Only this thread syncs, and the file is only closed once it stopped.
+            if sync:
+                started = monotonic()
+                os.fsync(fd)
+                self._measure(monotonic() - started)
+        except BaseException as exc:
+            for item in batch:
+                item[1].set_exception(exc)
+        else:
+            for item in batch:
+                item[1].set_result(None)
+
+    def _write(self, data: bytes, created: Optional[float] = None, count: int = 1):
+        if self._stream is None:
+            self._stream = open(self.filename, "ab")
+        started = monotonic()
+        self._stream.write(data)
+        self._stream.flush()
+        self._measure(monotonic() - started)
+
+        if (index := self._index) is not None and created is not None:
+            # NOTE: The offset is only looked up when an entry is due. After an append,
+            # the position is the end of the data, even with other processes writing.
+            if index.is_due():
+                index.add(created, self._stream.tell() - len(data))
+            index.count(count, len(data))
+
+        # NOTE: Only tracked when some handler wants the file to be synced
+        if self._policies:
+            if self._dirty_since is None:
+                self._dirty_since = monotonic()
+            self._dirty += len(data)
+
+    def _measure(self, elapsed: float):
+        self._latency += (elapsed - self._latency) * _LATENCY_WEIGHT
+
+    def _sync_due(self):
+        if not self._dirty:
+            return False
+        if self._max_bytes is not None and self._dirty >= self._max_bytes:
+            return True
+        return (
+            self._interval is not None
+            and monotonic() - self._dirty_since >= self._interval
+        )
+
+    def _sync_timeout(self):
+        if self._interval is None or self._dirty_since is None:
+            return None
+        return max(self._dirty_since + self._interval - monotonic(), 0)
+
+
+class LoopFrontEnd:
+    """
+    Collects the records of one event loop during an iteration and hands them to the
+    writer's thread together, so every loop pays a single thread hop per iteration.
+    """
+
+    _pending: list[bytes]
+    _batch: Optional[Future[None]]
+    _last_batch: Optional[Future[None]]
+
+    def __init__(self, writer: FileWriter, loop: AbstractEventLoop):
+        self.writer = writer
+        self.loop = loop
+        self._pending = []
+        self._durable = False
+        self._created: Optional[float] = None
+        self._count = 0
+        self._batch = None
+        self._last_batch = None
+
+    async def open(self):
+        # NOTE: The writer opens the file itself, when it first writes to it
+        ...
+
+    async def send(
+        self,
+        msg: bytes,
+        durable: bool = False,
+        created: Optional[float] = None,
+        count: int = 1,
+    ):
+        self._pending.append(msg)
+        self._durable = self._durable or durable
+        self._count += count
+        if created is not None and (self._created is None or created < self._created):
+            self._created = created
+        if (batch := self._batch) is None:
+            batch = self._batch = self._last_batch = self.loop.create_future()
+            self.loop.call_soon(self._submit)
+
+        # NOTE: Every sender of the iteration waits on the same future, so it's shielded
+        # for a cancelled sender not to cancel it for the others
+        await shield(batch)
+
+    async def close(self):
+        if (batch := self._last_batch) is not None:
+            await shield(batch)
+
+    def _submit(self):
+        msgs, durable, batch = self._pending, self._durable, self._batch
+        created, count = self._created, self._count
+        self._pending, self._durable, self._batch = [], False, None
+        self._created, self._count = None, 0
+
+        written = self.writer.submit(b"".join(msgs), durable, created, count)
+        written = wrap_future(written, loop=self.loop)
+        written.add_done_callback(lambda future: _copy_result(future, batch))
+
+
+def _copy_result(source: Future[None], target: Future[None]):
+    if target.done():
+        return
+    if (exc := source.exception()) is not None:
+        target.set_exception(exc)
+    else:
+        target.set_result(None)
@@ -0,0 +1,2 @@
+from .async_ import AsyncMemoryHandler  # noqa
+from .sync import SyncMemoryHandler  # noqa
@@ -0,0 +1,57 @@
+from asyncio import Task, get_running_loop
+from signal import SIGUSR1
+from typing import TYPE_CHECKING, Optional
+
+from aiologbuch.shared.levels import LogLevel
+
+from .ring import RingBuffer
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import (
+        AsyncHandlerProtocol,
+        FilterProtocol,
+        LogRecordProtocol,
+    )
+
+
+class AsyncMemoryHandler:
+    filter_: Optional["FilterProtocol"] = None
+    _ring: RingBuffer["LogRecordProtocol"]
+    _tasks: set[Task[None]]
+
+    def __init__(
+        self,
+        target: "AsyncHandlerProtocol",
+        capacity: int = 1000,
+        flush_level: int = LogLevel.ERROR,
+    ):
+        self.target = target
+        self.flush_level = flush_level
+        self._ring = RingBuffer(capacity)
+        self._tasks = set()
+
+    @property
+    def buffered(self):
+        return len(self._ring)
+
+    async def handle(self, record: "LogRecordProtocol"):
+        self._ring.append(record)
+        if record.levelno >= self.flush_level:
+            await self.flush()
+
+    async def flush(self):
+        for record in self._ring.drain():
+            await self.target.handle(record)
+
+    async def close(self):
+        self._ring.clear()
+        await self.target.close()
+
+    def install_signal_trigger(self, signum: int = SIGUSR1):
+        loop = get_running_loop()
+        loop.add_signal_handler(signum, self._flush_from_signal)
+
+    def _flush_from_signal(self):
+        task = get_running_loop().create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,44 @@
+from typing import Optional
+
+
+class RingBuffer[T]:
+    __slots__ = ("_slots", "_capacity", "_next", "_size")
+
+    _slots: list[Optional[T]]
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("'capacity' must be greater than zero")
+
+        # NOTE: The slots are allocated up front and reused, so appending never grows
+        # the buffer and the oldest item is simply overwritten once it is full.
+        self._slots = [None] * capacity
+        self._capacity = capacity
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def append(self, item: T):
+        self._slots[self._next] = item
+        self._next = (self._next + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+
+    def drain(self) -> list[T]:
+        start = (self._next - self._size) % self._capacity
+        items = [
+            self._slots[(start + idx) % self._capacity] for idx in range(self._size)
+        ]
+        self.clear()
+        return items
+
+    def clear(self):
+        for idx in range(self._capacity):
+            self._slots[idx] = None
+        self._next = self._size = 0
@@ -0,0 +1,61 @@
+from signal import SIGUSR1, signal
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Optional
+
+from aiologbuch.shared.levels import LogLevel
+
+from .ring import RingBuffer
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import (
+        FilterProtocol,
+        LogRecordProtocol,
+        SyncHandlerProtocol,
+    )
+
+
+class SyncMemoryHandler:
+    filter_: Optional["FilterProtocol"] = None
+    _ring: RingBuffer["LogRecordProtocol"]
+    _lock: Lock
+
+    def __init__(
+        self,
+        target: "SyncHandlerProtocol",
+        capacity: int = 1000,
+        flush_level: int = LogLevel.ERROR,
+    ):
+        self.target = target
+        self.flush_level = flush_level
+        self._ring = RingBuffer(capacity)
+        self._lock = Lock()
+
+    @property
+    def buffered(self):
+        return len(self._ring)
+
+    def handle(self, record: "LogRecordProtocol"):
+        with self._lock:
+            self._ring.append(record)
+        if record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            records = self._ring.drain()
+
+        for record in records:
+            self.target.handle(record)
+
+    def close(self):
+        with self._lock:
+            self._ring.clear()
+        self.target.close()
+
+    def install_signal_trigger(self, signum: int = SIGUSR1):
+        signal(signum, self._flush_from_signal)
+
+    def _flush_from_signal(self, *_):
+        # NOTE: The signal may interrupt a thread that is holding one of the locks
+        # used by the target, so the dump happens in a thread of its own.
+        Thread(target=self.flush, name="aiologbuch-flight-recorder").start()
@@ -0,0 +1,111 @@
+import os
+from asyncio import get_running_loop
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from copy import copy
+from threading import Lock
+from typing import TYPE_CHECKING, Literal, Optional, Sequence
+from weakref import WeakSet
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import FormatterProtocol, LogRecordProtocol
+
+
+def _format_batch(
+    formatter: "FormatterProtocol", records: Sequence["LogRecordProtocol"]
+):
+    # NOTE: A failing record must not take the rest of the batch down with it, so
+    # failures are reported back as 'None' and handled by the caller.
+    results: list[Optional[bytes]] = []
+    for record in records:
+        try:
+            results.append(formatter.format(record))
+        except Exception:
+            results.append(None)
+    return results
+
+
+class FormattingPool:
+    _executor: Optional[Executor]
+    _lock: Lock
+
+    def __init__(
+        self,
+        kind: Literal["thread", "process"] = "thread",
+        max_workers: Optional[int] = None,
+        max_batch_size: int = 512,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported pool kind: {kind!r}")
+
+        if max_batch_size < 1:
+            raise ValueError("'max_batch_size' must be greater than zero")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_batch_size = max_batch_size
+        self._executor = None
+        self._lock = Lock()
+        _pools.add(self)
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "thread":
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="aiologbuch-formatter",
+                    )
+                else:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    async def format_batch(
+        self, formatter: "FormatterProtocol", records: Sequence["LogRecordProtocol"]
+    ):
+        if self.kind == "process":
+            records = [self._portable(formatter, record) for record in records]
+
+        loop = get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, _format_batch, formatter, records
+        )
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _portable(
+        self, formatter: "FormatterProtocol", record: "LogRecordProtocol"
+    ) -> "LogRecordProtocol":
+        # NOTE: Tracebacks can not be pickled, so their text is rendered (and cached)
+        # here before the record crosses the process boundary.
+        if not record.exc_info:
+            return record
+
+        if format_exception := getattr(formatter, "format_exception", None):
+            format_exception(record)
+
+        portable = copy(record)
+        portable.exc_info = None
+        return portable
+
+    def _after_fork(self):
+        # NOTE: The workers of the parent don't exist in the child, which starts its
+        # own when it first formats a batch. They're left to the parent to shut down.
+        self._lock = Lock()
+        self._executor = None
+
+
+_pools: WeakSet[FormattingPool] = WeakSet()
+
+
+def _reset_pools():
+    for pool in list(_pools):
+        pool._after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_pools)
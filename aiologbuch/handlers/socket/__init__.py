@@ -0,0 +1,2 @@
+from .async_ import AsyncSocketMixin  # noqa
+from .sync import SyncSocketMixin  # noqa
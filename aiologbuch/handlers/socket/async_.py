@@ -0,0 +1,72 @@
+from asyncio import StreamWriter, open_connection, open_unix_connection
+from typing import Optional
+
+from .base import SocketBufferMixin
+
+
+class AsyncSocketMixin(SocketBufferMixin):
+    _writer: Optional[StreamWriter] = None
+    _flushing = False
+
+    async def write_and_flush(self, msg: bytes):
+        self._push(msg)
+        await self._flush()
+
+    async def close(self):
+        self._retry_at = 0.0
+        try:
+            await self._flush()
+        finally:
+            await self._disconnect()
+
+    async def _flush(self):
+        # NOTE: Only one coroutine writes at a time. The others just leave their
+        # records in the buffer, which are then sent together in the next batch.
+        if self._flushing:
+            return
+
+        self._flushing = True
+        try:
+            while self._buffer and await self._connect():
+                batch = self._pop_batch()
+                try:
+                    self._writer.write(batch)
+                    await self._writer.drain()
+                except OSError:
+                    self._requeue(batch)
+                    self._connection_failed()
+                    await self._disconnect()
+                    raise
+        finally:
+            self._flushing = False
+
+    async def _connect(self):
+        if self._writer is not None:
+            return True
+
+        if not self._can_connect():
+            return False
+
+        try:
+            if self.is_unix:
+                _, self._writer = await open_unix_connection(self.address)
+            else:
+                host, port = self.address
+                _, self._writer = await open_connection(host, port)
+        except OSError:
+            self._connection_failed()
+            raise
+
+        self._connection_succeeded()
+        return True
+
+    async def _disconnect(self):
+        if (writer := self._writer) is None:
+            return
+
+        self._writer = None
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            ...
@@ -0,0 +1,94 @@
+from collections import deque
+from struct import Struct
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import SocketAddress, SocketFraming
+
+_LENGTH_PREFIX = Struct(">I")
+
+
+class SocketBufferMixin:
+    address: "SocketAddress"
+    framing: "SocketFraming"
+    max_buffer_size: int
+    max_batch_size: int
+    dropped: int
+
+    _buffer: deque[bytes]
+    _buffered: int
+    _backoff: float
+    _retry_at: float
+
+    def _configure_socket(
+        self,
+        address: "SocketAddress",
+        framing: "SocketFraming",
+        max_buffer_size: int,
+        max_batch_size: int,
+        initial_backoff: float,
+        max_backoff: float,
+    ):
+        if framing not in ("newline", "length"):
+            raise ValueError(f"Unsupported framing: {framing!r}")
+
+        self.address = address
+        self.framing = framing
+        self.max_buffer_size = max_buffer_size
+        self.max_batch_size = max_batch_size
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.dropped = 0
+
+        self._buffer = deque()
+        self._buffered = 0
+        self._backoff = initial_backoff
+        self._retry_at = 0.0
+
+    @property
+    def is_unix(self):
+        return isinstance(self.address, str)
+
+    @property
+    def buffered(self):
+        return self._buffered
+
+    def _push(self, msg: bytes):
+        if self.framing == "length":
+            msg = _LENGTH_PREFIX.pack(len(msg)) + msg
+        elif not msg.endswith(b"\n"):
+            msg += b"\n"
+
+        self._buffer.append(msg)
+        self._buffered += len(msg)
+
+        # NOTE: The buffer is bounded, so while the collector is unreachable the
+        # oldest records are dropped to make room for the new ones.
+        while self._buffered > self.max_buffer_size and len(self._buffer) > 1:
+            self._buffered -= len(self._buffer.popleft())
+            self.dropped += 1
+
+    def _pop_batch(self):
+        batch, size = [], 0
+        while self._buffer and (not batch or size < self.max_batch_size):
+            msg = self._buffer.popleft()
+            batch.append(msg)
+            size += len(msg)
+
+        self._buffered -= size
+        return b"".join(batch)
+
+    def _requeue(self, batch: bytes):
+        self._buffer.appendleft(batch)
+        self._buffered += len(batch)
+
+    def _can_connect(self):
+        return monotonic() >= self._retry_at
+
+    def _connection_failed(self):
+        self._retry_at = monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+
+    def _connection_succeeded(self):
+        self._backoff, self._retry_at = self.initial_backoff, 0.0
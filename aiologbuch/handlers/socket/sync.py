@@ -0,0 +1,73 @@
+import socket
+from threading import Lock
+from typing import Optional
+
+from .base import SocketBufferMixin
+
+
+class SyncSocketMixin(SocketBufferMixin):
+    connect_timeout: Optional[float] = 5.0
+    _socket: Optional[socket.socket] = None
+    _lock: Lock
+
+    def _configure_socket(self, *args, **kwargs):
+        super()._configure_socket(*args, **kwargs)
+        self._lock = Lock()
+
+    def write_and_flush(self, msg: bytes):
+        with self._lock:
+            self._push(msg)
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._retry_at = 0.0
+            try:
+                self._flush()
+            finally:
+                self._disconnect()
+
+    def _flush(self):
+        while self._buffer and self._connect():
+            batch = self._pop_batch()
+            try:
+                self._socket.sendall(batch)
+            except OSError:
+                self._requeue(batch)
+                self._connection_failed()
+                self._disconnect()
+                raise
+
+    def _connect(self):
+        if self._socket is not None:
+            return True
+
+        if not self._can_connect():
+            return False
+
+        try:
+            if self.is_unix:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    sock.settimeout(self.connect_timeout)
+                    sock.connect(self.address)
+                except OSError:
+                    sock.close()
+                    raise
+            else:
+                sock = socket.create_connection(
+                    self.address, timeout=self.connect_timeout
+                )
+        except OSError:
+            self._connection_failed()
+            raise
+
+        sock.settimeout(None)
+        self._socket = sock
+        self._connection_succeeded()
+        return True
+
+    def _disconnect(self):
+        if (sock := self._socket) is not None:
+            self._socket = None
+            sock.close()
@@ -1,7 +1,3 @@
-import atexit
-
-from aiologbuch.shared.utils import syncify
-
 from .manager import resource_manager
 
 
@@ -14,4 +10,6 @@ class AsyncStderrMixin:
         await self.manager.asend_message(msg)
 
     async def close(self):
-        atexit.register(syncify(self.manager.aclose))
+        # NOTE: The stream is shared by every stderr handler, so it's only closed by
+        # 'aiologbuch.shutdown', or when the interpreter exits
+        ...
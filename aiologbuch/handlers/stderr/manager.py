@@ -1,75 +1,75 @@
+import os
 import sys
-from asyncio import StreamWriter, get_running_loop, sleep
-from asyncio.protocols import Protocol
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from threading import Lock
 from typing import Optional, TextIO
 
-from aiologbuch.shared.conf import settings
-from aiologbuch.shared.utils import sync_lock_context
-
-
-class _AIOProto(Protocol):
-    async def _drain_helper(self): ...
-
-    async def _get_close_waiter(self, transport: StreamWriter):
-        while transport.transport._pipe is not None:
-            await sleep(0)  # NOTE: Skips one event loop iteration
+from aiologbuch.handlers.file.backends import _FdBackend
 
 
 @dataclass
 class _ResourceManager:
     stream: TextIO
-    _writer: Optional[StreamWriter] = None
+    _writer: Optional[_FdBackend] = None
     _closed = False
+    _lock: Lock = field(default_factory=Lock)
 
     @property
     def closed(self):
         return self._closed
 
+    @property
+    def writer(self):
+        # NOTE: The same writer is shared by every event loop and thread, since it's
+        # safe to use from all of them
+        if (writer := self._writer) is None:
+            with self._lock:
+                if self.closed:
+                    raise RuntimeError("Writer was closed")
+
+                if (writer := self._writer) is None:
+                    self.stream.flush()
+                    writer = self._writer = _FdBackend.from_fd(self.stream.fileno())
+
+        return writer
+
     async def asend_message(self, msg: bytes):
-        async with settings.GLOBAL_STDERR_LOCK:
-            if self.closed:
-                raise RuntimeError("Writer was closed")
-
-            if not self._writer:
-                loop = get_running_loop()
-                transport, protocol = await loop.connect_write_pipe(
-                    _AIOProto, self.stream
-                )
-                self._writer = StreamWriter(
-                    transport=transport, protocol=protocol, reader=None, loop=loop
-                )
-
-            self._writer.write(msg)
-            await self._writer.drain()
+        if self.closed:
+            raise RuntimeError("Writer was closed")
+        await self.writer.send(msg)
 
     def send_message(self, msg: bytes):
-        with sync_lock_context(lock=settings.GLOBAL_STDERR_LOCK):
-            if self.closed:
-                raise RuntimeError("Writer was closed")
-            self.stream.write(msg.decode())
-            self.stream.flush()
+        if self.closed:
+            raise RuntimeError("Writer was closed")
+        self.writer.write(msg)
 
     async def aclose(self):
-        async with settings.GLOBAL_STDERR_LOCK:
-            if (self.closed) or (not self._writer):
-                return
-
-            self._writer.write(b"Closing stderr...")
-            await self._writer.drain()
+        if (writer := self._detach()) is None:
+            return
 
-            self._writer.close()
-            await self._writer.wait_closed()
-            self._writer, self._closed = None, True
+        await writer.close()
 
     def close(self):
-        with sync_lock_context(lock=settings.GLOBAL_STDERR_LOCK):
-            if self.closed:
-                return
-            self.stream.write("Closing stderr...")
-            self.stream.flush()
-            self.stream.close()
-            self._closed = True
+        if (writer := self._detach()) is None:
+            return
+
+        writer.close_now()
+
+    def _after_fork(self):
+        # NOTE: The child gets a writer of its own when it first logs
+        self._lock = Lock()
+        if (writer := self._writer) is not None:
+            writer._after_fork()
+            self._writer = None
+
+    def _detach(self):
+        with self._lock:
+            if self.closed or self._writer is None:
+                return None
+
+            writer, self._writer, self._closed = self._writer, None, True
+            return writer
 
 
 resource_manager = _ResourceManager(stream=sys.stderr)
+os.register_at_fork(after_in_child=resource_manager._after_fork)
@@ -1,5 +1,3 @@
-import atexit
-
 from .manager import resource_manager
 
 
@@ -12,4 +10,6 @@ class SyncStderrMixin:
         self.manager.send_message(msg)
 
     def close(self):
-        atexit.register(self.manager.close)
+        # NOTE: The stream is shared by every stderr handler, so it's only closed by
+        # 'aiologbuch.shutdown', or when the interpreter exits
+        ...
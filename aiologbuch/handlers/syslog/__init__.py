@@ -0,0 +1,2 @@
+from .async_ import AsyncSyslogMixin  # noqa
+from .sync import SyncSyslogMixin  # noqa
@@ -0,0 +1,38 @@
+import socket
+from asyncio import Future, get_running_loop
+from typing import Any
+
+from .base import DatagramMixin
+
+
+class AsyncSyslogMixin(DatagramMixin):
+    async def write_and_flush(self, msg: bytes):
+        await _sendto(self._open_socket(), msg, self._sockaddr)
+
+    async def close(self):
+        self._close_socket()
+
+
+async def _sendto(sock: socket.socket, msg: bytes, address: Any):
+    # NOTE: 'loop.sock_sendto' isn't implemented by every loop, like uvloop, so the
+    # datagram is sent right away and the loop is only waited on when the socket is
+    # full
+    while True:
+        try:
+            sock.sendto(msg, address)
+            return
+        except (BlockingIOError, InterruptedError):
+            pass
+
+        loop = get_running_loop()
+        waiter = loop.create_future()
+        loop.add_writer(sock.fileno(), _wake, waiter)
+        try:
+            await waiter
+        finally:
+            loop.remove_writer(sock.fileno())
+
+
+def _wake(waiter: "Future[None]"):
+    if not waiter.done():
+        waiter.set_result(None)
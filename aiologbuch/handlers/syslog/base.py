@@ -0,0 +1,40 @@
+import socket
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import SocketAddress
+
+
+class DatagramMixin:
+    address: "SocketAddress"
+    dropped: int
+
+    _socket: Optional[socket.socket] = None
+    _sockaddr: Any = None
+
+    def _configure_datagram(self, address: "SocketAddress"):
+        self.address = address
+        self.dropped = 0
+
+    def _open_socket(self):
+        if self._socket is not None:
+            return self._socket
+
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sockaddr = self.address
+        else:
+            host, port = self.address
+            family, kind, proto, _, sockaddr = socket.getaddrinfo(
+                host, port, type=socket.SOCK_DGRAM
+            )[0]
+            sock = socket.socket(family, kind, proto)
+
+        sock.setblocking(False)
+        self._socket, self._sockaddr = sock, sockaddr
+        return sock
+
+    def _close_socket(self):
+        if (sock := self._socket) is not None:
+            self._socket = None
+            sock.close()
@@ -0,0 +1,15 @@
+from .base import DatagramMixin
+
+
+class SyncSyslogMixin(DatagramMixin):
+    def write_and_flush(self, msg: bytes):
+        sock = self._open_socket()
+        try:
+            sock.sendto(msg, self._sockaddr)
+        except BlockingIOError:
+            # NOTE: The daemon is not keeping up. Dropping the message is better than
+            # blocking the calling thread.
+            self.dropped += 1
+
+    def close(self):
+        self._close_socket()
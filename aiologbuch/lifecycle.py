@@ -0,0 +1,312 @@
+import atexit
+import os
+import sys
+from functools import partial
+from threading import Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Iterable, NamedTuple, Optional, Union
+
+from .shared.utils import in_daemon_thread
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop, Future
+
+    from .managers import AsyncManager, SyncManager
+
+    type _Jobs = dict[Future[Any], str]
+
+# NOTE: Leaves the process enough time to exit within a 10 seconds grace period, such
+# as the termination grace period of a Kubernetes pod
+DEFAULT_TIMEOUT = 8.0
+
+_lock = Lock()
+_done = False
+_signal_tasks: set[Any] = set()
+
+
+class ShutdownReport(NamedTuple):
+    """What was flushed and closed, what failed, and what missed the deadline"""
+
+    closed: tuple[str, ...] = ()
+    failed: tuple[tuple[str, str], ...] = ()
+    timed_out: tuple[str, ...] = ()
+    elapsed: float = 0.0
+
+    @property
+    def ok(self):
+        return not self.failed and not self.timed_out
+
+
+async def ashutdown(timeout: float = DEFAULT_TIMEOUT) -> ShutdownReport:
+    """
+    Flushes and closes every handler of the loggers, and then the files and the stderr
+    stream they share, within 'timeout' seconds. The handlers are closed in parallel,
+    the async ones as tasks and the sync ones in threads. Whatever didn't finish by the
+    deadline is left behind and reported, so the process can still exit in time.
+
+    It only runs once, the later calls return an empty report. The loggers are disabled
+    by it, so the records logged afterwards are dropped.
+    """
+    global _done
+    with _lock:
+        if _done:
+            return ShutdownReport()
+        _done = True
+
+    from .main import _managers
+
+    started = monotonic()
+    report = await _shutdown(list(_managers.values()), started + timeout)
+    report = await _close_resources(started + timeout, report)
+    return report._replace(elapsed=monotonic() - started)
+
+
+def shutdown(timeout: float = DEFAULT_TIMEOUT) -> ShutdownReport:
+    """
+    The same as 'ashutdown', for the code that doesn't run in an event loop. It runs
+    on a loop of its own, so it can't be called from a running one.
+    """
+    from asyncio import get_running_loop, new_event_loop
+
+    try:
+        get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("Use 'await ashutdown()' from a running event loop")
+
+    loop = new_event_loop()
+    try:
+        return loop.run_until_complete(ashutdown(timeout))
+    finally:
+        loop.close()
+
+
+class ShutdownMiddleware:
+    """
+    An ASGI middleware that shuts the logging down when the server shuts the app
+    down, through the lifespan protocol, after the app's own shutdown.
+    """
+
+    def __init__(self, app: Any, timeout: float = DEFAULT_TIMEOUT):
+        self.app = app
+        self.timeout = timeout
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any):
+        if scope["type"] != "lifespan":
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message: dict[str, Any]):
+            if message["type"].startswith("lifespan.shutdown."):
+                await ashutdown(self.timeout)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def install_signal_handlers(
+    signums: Optional[Iterable[int]] = None, timeout: float = DEFAULT_TIMEOUT
+):
+    """
+    Shuts the logging down when one of the signals is received, SIGTERM by default,
+    and then calls the handler that was installed with 'signal.signal' before, or
+    does what the signal does by default. With a running event loop, the handlers are
+    installed on it, and a signal that the loop already handles raises a RuntimeError,
+    since the callback of its 'add_signal_handler' can't be chained to.
+
+    ASGI servers handle the signals themselves, so use the 'ShutdownMiddleware' with
+    them instead.
+    """
+    import signal
+    from asyncio import get_running_loop
+
+    try:
+        loop = get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    signums = (signal.SIGTERM,) if signums is None else tuple(signums)
+    if loop is not None:
+        for signum in signums:
+            if _handled_by(loop, signum):
+                raise RuntimeError(f"The event loop already handles signal {signum}")
+
+    for signum in signums:
+        previous = signal.getsignal(signum)
+        if loop is not None:
+            loop.add_signal_handler(
+                signum, _on_loop_signal, loop, signum, previous, timeout
+            )
+        else:
+            signal.signal(signum, partial(_on_signal, previous, timeout))
+
+
+async def _shutdown(
+    managers: Iterable[Union["AsyncManager", "SyncManager"]],
+    deadline: float,
+    report: ShutdownReport = ShutdownReport(),
+):
+    from asyncio import get_running_loop
+    from inspect import iscoroutinefunction
+
+    loop = get_running_loop()
+
+    # NOTE: The loggers stop handling records first. Then the records still enqueued
+    # for the sync pipeline are written, since its thread hands them to the handlers
+    # that are closed next.
+    handlers = [
+        handler for manager in managers for handler in manager.detach_handlers()
+    ]
+
+    jobs: "_Jobs" = {}
+    for manager in managers:
+        if (listener := getattr(manager, "listener", None)) is not None:
+            jobs[in_daemon_thread(loop, listener.stop)] = "sync pipeline"
+    report = await _wait(jobs, deadline, report)
+
+    jobs = {}
+    for handler in handlers:
+        if iscoroutinefunction(handler.close):
+            job = loop.create_task(_aclose_handler(handler))
+        else:
+            job = in_daemon_thread(loop, handler.close)
+        jobs[job] = _describe(handler)
+    return await _wait(jobs, deadline, report)
+
+
+async def _close_resources(deadline: float, report: ShutdownReport):
+    # NOTE: The resources that the handlers share, which are still open when a handler
+    # wasn't closed in time, or wasn't attached to any logger
+    from asyncio import get_running_loop
+
+    loop = get_running_loop()
+    jobs: "_Jobs" = {}
+    if (files := sys.modules.get("aiologbuch.handlers.file.manager")) is not None:
+        with files.resource_manager.lock:
+            resources = list(files.resource_manager.resources.items())
+            files.resource_manager.resources.clear()
+        for filename, resource in resources:
+            jobs[loop.create_task(resource.aclose())] = f"file {filename!r}"
+    if (stderr := sys.modules.get("aiologbuch.handlers.stderr.manager")) is not None:
+        jobs[loop.create_task(stderr.resource_manager.aclose())] = "stderr"
+    return await _wait(jobs, deadline, report)
+
+
+async def _aclose_handler(handler: Any):
+    if (drain := getattr(handler, "drain", None)) is not None:
+        await drain()
+    await handler.close()
+
+
+async def _wait(jobs: "_Jobs", deadline: float, report: ShutdownReport):
+    from asyncio import wait
+
+    if not jobs:
+        return report
+
+    done, pending = await wait(jobs, timeout=max(deadline - monotonic(), 0))
+    closed, failed = list(report.closed), list(report.failed)
+    for job in done:
+        if job.cancelled():
+            failed.append((jobs[job], "cancelled"))
+        elif (exc := job.exception()) is not None:
+            failed.append((jobs[job], repr(exc)))
+        else:
+            closed.append(jobs[job])
+
+    # NOTE: The tasks are cancelled, while the threads are daemons that are left behind
+    for job in pending:
+        job.cancel()
+
+    return report._replace(
+        closed=tuple(closed),
+        failed=tuple(failed),
+        timed_out=report.timed_out + tuple(jobs[job] for job in pending),
+    )
+
+
+def _describe(handler: Any):
+    target = getattr(handler, "filename", None) or getattr(handler, "address", None)
+    name = type(handler).__name__
+    return name if target is None else f"{name}({target!r})"
+
+
+def _on_signal(previous: Any, timeout: float, signum: int, frame: Any):
+    # NOTE: The signal may interrupt a thread that holds one of the locks that the
+    # shutdown takes, so it runs in a thread of its own, which is waited on
+    thread = Thread(target=shutdown, args=(timeout,), name="aiologbuch-shutdown")
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout + 1)
+    _chain(previous, signum, frame)
+
+
+def _on_loop_signal(
+    loop: "AbstractEventLoop", signum: int, previous: Any, timeout: float
+):
+    async def run():
+        try:
+            await ashutdown(timeout)
+        finally:
+            loop.remove_signal_handler(signum)
+            _chain(previous, signum, None)
+
+    task = loop.create_task(run())
+    _signal_tasks.add(task)
+    task.add_done_callback(_signal_tasks.discard)
+
+
+def _handled_by(loop: "AbstractEventLoop", signum: int):
+    import signal
+
+    # NOTE: The loops install a handler of their own for the signals they handle, which
+    # only wakes them up: a no-op for asyncio's, and a method of the loop for uvloop's
+    handlers = getattr(loop, "_signal_handlers", None)
+    if isinstance(handlers, dict) and signum in handlers:
+        return True
+    return getattr(signal.getsignal(signum), "__self__", None) is loop
+
+
+def _chain(previous: Any, signum: int, frame: Any):
+    import signal
+
+    if callable(previous):
+        previous(signum, frame)
+    elif previous == signal.SIG_DFL:
+        # NOTE: Such as terminating the process, which the default action does
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+
+def _close_at_exit():
+    # NOTE: No thread can be started and no handler can be awaited at this point, so
+    # only the shared files and stderr are flushed and closed, synchronously. The
+    # threads of the sync pipelines were already stopped by their own hook.
+    global _done
+    with _lock:
+        if _done:
+            return
+        _done = True
+
+    if (files := sys.modules.get("aiologbuch.handlers.file.manager")) is not None:
+        with files.resource_manager.lock:
+            resources = list(files.resource_manager.resources.values())
+            files.resource_manager.resources.clear()
+        for resource in resources:
+            try:
+                resource.close()
+            # NOTE: The other files are still closed
+            except:  # noqa
+                pass
+    if (stderr := sys.modules.get("aiologbuch.handlers.stderr.manager")) is not None:
+        stderr.resource_manager.close()
+
+
+def _reset():
+    # NOTE: A forked child shuts its own logging down, even if the parent did already
+    global _lock, _done
+    _lock, _done = Lock(), False
+
+
+atexit.register(_close_at_exit)
+os.register_at_fork(after_in_child=_reset)
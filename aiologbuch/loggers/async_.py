@@ -1,6 +1,5 @@
-from typing import TYPE_CHECKING, Optional
-
-from anyio import create_task_group
+from functools import partial
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 
 from aiologbuch.shared.levels import LogLevel
 from aiologbuch.shared.types import AsyncHandlerProtocol
@@ -10,31 +9,37 @@ from .base import BaseLogger
 if TYPE_CHECKING:
     from aiologbuch.shared.types import LogRecordProtocol, MessageType
 
+    type Dispatcher = Callable[["LogRecordProtocol"], Awaitable[None]]
+
+# NOTE: 'anyio' is only imported when the first record is handled concurrently, and
+# bound here so the later records don't run the import statement again
+_create_task_group: Any = None
+
 
 class AsyncLogger(BaseLogger[AsyncHandlerProtocol]):
     async def debug(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.DEBUG) and self._enabled:
+        if LogLevel.DEBUG >= self._config.level:
             await self._log(LogLevel.DEBUG, msg)
 
     async def info(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.INFO) and self._enabled:
+        if LogLevel.INFO >= self._config.level:
             await self._log(LogLevel.INFO, msg)
 
     async def warning(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.WARNING) and self._enabled:
+        if LogLevel.WARNING >= self._config.level:
             await self._log(LogLevel.WARNING, msg)
 
     async def error(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.ERROR) and self._enabled:
+        if LogLevel.ERROR >= self._config.level:
             await self._log(LogLevel.ERROR, msg)
 
     async def exception(self, exc: BaseException, msg: Optional["MessageType"] = None):
-        if self._filter(level=LogLevel.ERROR) and self._enabled:
+        if LogLevel.ERROR >= self._config.level:
             message = msg if msg else str(exc)
             await self._log(LogLevel.ERROR, message, exc_info=exc)
 
     async def critical(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.CRITICAL) and self._enabled:
+        if LogLevel.CRITICAL >= self._config.level:
             await self._log(LogLevel.CRITICAL, msg)
 
     async def _log(
@@ -43,6 +48,9 @@ class AsyncLogger(BaseLogger[AsyncHandlerProtocol]):
         msg: "MessageType",
         exc_info: Optional[BaseException] = None,
     ):
+        if (dispatch := self._config.routes[level]) is None:
+            return
+
         caller = self._find_caller()
 
         record = self._make_record(
@@ -55,14 +63,56 @@ class AsyncLogger(BaseLogger[AsyncHandlerProtocol]):
             exc_info=exc_info,
         )
 
-        await self._handle(record)
+        await dispatch(record)
 
-    async def _handle(self, record: "LogRecordProtocol"):
-        async with create_task_group() as tg:
-            [tg.start_soon(handler.handle, record) for handler in self._handlers]
+    def _compile_route(
+        self, handlers: tuple[AsyncHandlerProtocol, ...]
+    ) -> Optional["Dispatcher"]:
+        # NOTE: The way the records are handed to the handlers is chosen here, once per
+        # set of handlers, instead of on every call. A single handler is called
+        # directly and several ones are awaited one after the other, while only the
+        # handlers that declare themselves 'slow' get a task of their own.
+        if not handlers:
+            return None
+        if len(handlers) == 1:
+            return handlers[0].handle
+
+        slow = tuple(handler for handler in handlers if getattr(handler, "slow", False))
+        fast = tuple(handler for handler in handlers if handler not in slow)
+
+        if not slow:
+            return partial(_handle_sequentially, handlers)
+        return partial(_handle_concurrently, slow, fast)
 
     async def _disable(self):
-        if self._enabled:
-            [await handler.close() for handler in self._handlers]
-            self._handlers = set()
-            self._enabled = False
+        if self.enabled:
+            [await handler.close() for handler in self._detach_handlers()]
+
+
+async def _handle_sequentially(
+    handlers: tuple[AsyncHandlerProtocol, ...], record: "LogRecordProtocol"
+):
+    for handler in handlers:
+        await handler.handle(record)
+
+
+async def _handle_concurrently(
+    slow: tuple[AsyncHandlerProtocol, ...],
+    fast: tuple[AsyncHandlerProtocol, ...],
+    record: "LogRecordProtocol",
+):
+    create_task_group = _create_task_group or _import_task_group()
+
+    async with create_task_group() as tg:
+        for handler in slow:
+            tg.start_soon(handler.handle, record)
+        for handler in fast:
+            await handler.handle(record)
+
+
+def _import_task_group():
+    global _create_task_group
+    from anyio import create_task_group
+
+    _create_task_group = create_task_group
+    return create_task_group
@@ -1,43 +1,122 @@
-from dataclasses import dataclass
-from inspect import currentframe
-from logging import LogRecord
-from traceback import format_exception
-from typing import TYPE_CHECKING, Optional
+import sys
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Self
+
+from aiologbuch.shared.levels import LogLevel
+
+from .config import LoggerConfig, LoggerSpec, compile_routes
 
 if TYPE_CHECKING:
     from aiologbuch.shared.types import FilterProtocol, MessageType
 
+# NOTE: Effective level of disabled loggers, which is above every level that exists
+DISABLED_LEVEL = LogLevel.CRITICAL + 1
+
+# NOTE: 'logging' is only imported along with the first record, and bound here so the
+# later records don't run the import statement again
+_LogRecord: Any = None
+
 
-@dataclass
-class _StackFrame:
+class _StackFrame(NamedTuple):
     filename: str
     function_name: str
     line_number: int
 
 
 class BaseLogger[HandlerProtocol]:
-    _enabled = True
-    _handlers: set[HandlerProtocol]
     name: str
+    parent: Optional[Self]
+    _spec: LoggerSpec
+    _resolved: LoggerConfig
+    _config: LoggerConfig
+    # NOTE: The level the sheddable loggers are raised to while the load is shed
+    _shed_level: Optional[int]
 
-    def __init__(self, name: str, filter_: "FilterProtocol"):
+    def __init__(self, name: str, filter_: Optional["FilterProtocol"] = None):
         self.name = name
-        self._handlers = set()
-        self._filter_object = filter_
+        self.parent = None
+        self._shed_level = None
+        self._spec = LoggerSpec(filter_=filter_)
+        self._resolve(parent=None)
+
+    @property
+    def level(self):
+        return None if self._spec.filter_ is None else self._spec.filter_.level
+
+    @property
+    def effective_level(self):
+        return self._config.level
+
+    @property
+    def handlers(self) -> tuple[HandlerProtocol, ...]:
+        return self._config.handlers
+
+    @property
+    def propagate(self):
+        return self._spec.propagate
+
+    @property
+    def enabled(self):
+        return self._spec.enabled
+
+    @property
+    def sheddable(self):
+        return self._resolved.sheddable
+
+    def _resolve(self, parent: Optional[Self]):
+        # NOTE: The configuration inherited from the ancestors is resolved here, once,
+        # into an immutable snapshot. The manager builds new snapshots whenever the
+        # logger or one of its ancestors changes and swaps them in with a single
+        # assignment, so the logging calls read '_config' without any locks, and the
+        # records that are already being handled keep the handlers they started with.
+        spec = self._spec
+
+        if spec.filter_ is not None:
+            level = spec.filter_.level
+        elif parent is not None:
+            level = parent._resolved.level
+        else:
+            level = LogLevel.INFO
+
+        handlers = spec.handlers
+        if spec.propagate and parent is not None:
+            handlers += parent._resolved.handlers
 
-    def _filter(self, level: int):
-        return self._filter_object.filter(level=level)
+        sheddable = spec.sheddable
+        if sheddable is None:
+            sheddable = parent is not None and parent._resolved.sheddable
 
-    def _find_caller(self):
+        self.parent = parent
+        self._resolved = LoggerConfig(
+            level=level,
+            handlers=handlers,
+            routes=compile_routes(handlers, self._compile_route),
+            sheddable=sheddable,
+        )
+
+        # NOTE: Shedding only raises the level of the snapshot that the logging calls
+        # check, so it costs nothing per call, while the descendants keep inheriting
+        # the configured level
+        if not spec.enabled:
+            self._config = LoggerConfig(
+                level=DISABLED_LEVEL,
+                handlers=(),
+                routes=compile_routes((), self._compile_route),
+            )
+        elif sheddable and self._shed_level is not None and self._shed_level > level:
+            self._config = self._resolved._replace(level=self._shed_level)
+        else:
+            self._config = self._resolved
+
+    def _compile_route(self, handlers: tuple[HandlerProtocol, ...]) -> Any:
+        return handlers
+
+    def _find_caller(self, depth: int = 3):
         # NOTE: The caller frame is located 3 frames up from the current one, which is
-        # the one that calls 'debug', 'info', 'warning' and so on.
-        caller_frame, CALLER_FRAME_LEVEL = currentframe(), 3
+        # the one that calls 'debug', 'info', 'warning' and so on. The wrappers of the
+        # profiler add frames of their own, so they look further up.
         try:
-            for _ in range(CALLER_FRAME_LEVEL):
-                caller_frame = caller_frame.f_back
-            if caller_frame is None:
-                raise ValueError()
-        except (AttributeError, ValueError) as exc:
+            caller_frame = sys._getframe(depth)
+        except ValueError as exc:
             raise RuntimeError("Could not find the caller's frame") from exc
 
         return _StackFrame(
@@ -56,11 +135,11 @@ class BaseLogger[HandlerProtocol]:
         line_number: int,
         exc_info: Optional[BaseException] = None,
     ):
-        if exc_info:
-            info = (type(exc_info), exc_info, exc_info.__traceback__)
-            text = "".join(format_exception(exc_info, limit=None, chain=True))
-        else:
-            info, text = None, None
+        # NOTE: The traceback text is rendered lazily by the formatters, so that the
+        # caller only pays for capturing the exception itself
+        LogRecord = _LogRecord or _import_log_record()
+
+        info = (type(exc_info), exc_info, exc_info.__traceback__) if exc_info else None
 
         record = LogRecord(
             name=name,
@@ -73,10 +152,24 @@ class BaseLogger[HandlerProtocol]:
             func=function_name,
         )
 
-        if text:
-            record.exc_text = text
-
         return record
 
     def _add_handler(self, handler: HandlerProtocol):
-        self._handlers.add(handler)
+        if handler not in self._spec.handlers:
+            self._spec = self._spec._replace(handlers=self._spec.handlers + (handler,))
+            self._resolve(parent=self.parent)
+
+    def _detach_handlers(self):
+        # NOTE: Disables the logger and hands its own handlers back to be closed
+        handlers = self._spec.handlers
+        self._spec = self._spec._replace(handlers=(), enabled=False)
+        self._resolve(parent=self.parent)
+        return handlers
+
+
+def _import_log_record():
+    global _LogRecord
+    from logging import LogRecord
+
+    _LogRecord = LogRecord
+    return LogRecord
@@ -0,0 +1,54 @@
+from typing import TYPE_CHECKING, Any, Callable, Iterable, NamedTuple, Optional
+
+from aiologbuch.shared.levels import LogLevel
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import FilterProtocol
+
+# NOTE: The routes have one entry for each level up to CRITICAL, so they're indexed by
+# the level itself
+ROUTES_SIZE = LogLevel.CRITICAL + 1
+
+
+class LoggerSpec(NamedTuple):
+    """The configuration set on the logger itself"""
+
+    filter_: Optional["FilterProtocol"] = None
+    handlers: tuple[Any, ...] = ()
+    propagate: bool = True
+    enabled: bool = True
+    # NOTE: Whether the logger's records may be shed under load, None inherits it
+    sheddable: Optional[bool] = None
+
+
+class LoggerConfig(NamedTuple):
+    """The configuration resolved from the logger and its ancestors"""
+
+    level: int
+    handlers: tuple[Any, ...]
+    routes: tuple[Any, ...]
+    sheddable: bool = False
+
+
+def compile_routes[R](
+    handlers: Iterable[Any], compile_route: Callable[[tuple[Any, ...]], R]
+) -> tuple[R, ...]:
+    # NOTE: The handlers' own filters are compiled into a table with the exact handlers
+    # for each level, so dispatching a record is a single lookup instead of a filter
+    # call per handler. Each distinct set of handlers is compiled by the logger only
+    # once, and the levels that share it share the result.
+    filters = [(handler, getattr(handler, "filter_", None)) for handler in handlers]
+    compiled: dict[tuple[Any, ...], R] = {}
+    routes: list[R] = []
+
+    for level in range(ROUTES_SIZE):
+        route = tuple(
+            handler
+            for handler, filter_ in filters
+            if filter_ is None or filter_.filter(level)
+        )
+        if route not in compiled:
+            compiled[route] = compile_route(route)
+        routes.append(compiled[route])
+
+    return tuple(routes)
@@ -0,0 +1,159 @@
+import atexit
+import os
+from queue import Empty, SimpleQueue
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, Optional, Union
+from weakref import WeakSet
+
+if TYPE_CHECKING:
+    from aiologbuch.shared.types import LogRecordProtocol, SyncHandlerProtocol
+
+    type _Item = Union[
+        tuple["LogRecordProtocol", tuple["SyncHandlerProtocol", ...]], Event, object
+    ]
+
+_STOP = object()
+
+_listeners: WeakSet["SyncListener"] = WeakSet()
+
+
+class SyncListener:
+    """
+    Hands the records of the sync loggers to a background thread, which writes them in
+    batches, so the calling threads never wait on a slow disk or a full pipe.
+    """
+
+    _queue: SimpleQueue["_Item"]
+    _thread: Optional[Thread]
+    _lock: Lock
+
+    def __init__(self, max_batch_size: int = 512):
+        self.max_batch_size = max_batch_size
+        self._reset()
+        _listeners.add(self)
+
+    @property
+    def backlog(self):
+        """How many records are enqueued, approximately"""
+        return self._queue.qsize()
+
+    def enqueue(
+        self,
+        record: "LogRecordProtocol",
+        handlers: tuple["SyncHandlerProtocol", ...],
+    ):
+        if self._thread is None:
+            self._start()
+        self._queue.put((record, handlers))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Waits until the records enqueued so far were written"""
+        if self._thread is None:
+            return True
+
+        done = Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Writes the records enqueued so far and stops the thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                thread = Thread(
+                    target=self._run, name="aiologbuch-listener", daemon=True
+                )
+                thread.start()
+                self._thread = thread
+
+    def _reset(self):
+        # NOTE: Also called in the child processes after a fork, where the thread of
+        # the parent doesn't exist. The records that were still enqueued belong to
+        # the parent, which writes them, and a new thread is started when needed.
+        self._queue = SimpleQueue()
+        self._thread = None
+        self._lock = Lock()
+
+    def _run(self):
+        queue = self._queue
+
+        while True:
+            items = [queue.get()]
+            while len(items) < self.max_batch_size:
+                try:
+                    items.append(queue.get_nowait())
+                except Empty:
+                    break
+
+            # NOTE: The records are grouped by handler, keeping their order, so every
+            # handler formats and writes its whole batch at once
+            batches: dict["SyncHandlerProtocol", list["LogRecordProtocol"]] = {}
+            waiters: list[Event] = []
+            stop = False
+
+            for item in items:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, Event):
+                    waiters.append(item)
+                else:
+                    record, handlers = item
+                    for handler in handlers:
+                        batches.setdefault(handler, []).append(record)
+
+            for handler, records in batches.items():
+                _write(handler, records)
+
+            for waiter in waiters:
+                waiter.set()
+
+            if stop:
+                return
+
+
+class QueuedRoute:
+    """Stands for the handlers of a route, which are then called by the listener"""
+
+    __slots__ = ("listener", "handlers")
+
+    def __init__(
+        self, listener: SyncListener, handlers: tuple["SyncHandlerProtocol", ...]
+    ):
+        self.listener = listener
+        self.handlers = handlers
+
+    def handle(self, record: "LogRecordProtocol"):
+        self.listener.enqueue(record, self.handlers)
+
+
+def _write(handler: "SyncHandlerProtocol", records: list["LogRecordProtocol"]):
+    try:
+        if (handle_batch := getattr(handler, "handle_batch", None)) is not None:
+            handle_batch(records)
+        else:
+            for record in records:
+                handler.handle(record)
+    # NOTE: The handlers deal with their own errors, this only keeps the thread alive
+    except:  # noqa
+        pass
+
+
+def _stop_listeners():
+    for listener in list(_listeners):
+        listener.stop()
+
+
+def _reset_listeners():
+    for listener in list(_listeners):
+        listener._reset()
+
+
+atexit.register(_stop_listeners)
+os.register_at_fork(after_in_child=_reset_listeners)
@@ -6,33 +6,44 @@ from aiologbuch.shared.types import SyncHandlerProtocol
 from .base import BaseLogger
 
 if TYPE_CHECKING:
-    from aiologbuch.shared.types import LogRecordProtocol, MessageType
+    from aiologbuch.shared.types import FilterProtocol, LogRecordProtocol, MessageType
+
+    from .listener import SyncListener
 
 
 class SyncLogger(BaseLogger[SyncHandlerProtocol]):
+    def __init__(
+        self,
+        name: str,
+        filter_: Optional["FilterProtocol"] = None,
+        listener: Optional["SyncListener"] = None,
+    ):
+        self._listener = listener
+        super().__init__(name=name, filter_=filter_)
+
     def debug(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.DEBUG) and self._enabled:
+        if LogLevel.DEBUG >= self._config.level:
             self._log(LogLevel.DEBUG, msg)
 
     def info(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.INFO) and self._enabled:
+        if LogLevel.INFO >= self._config.level:
             self._log(LogLevel.INFO, msg)
 
     def warning(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.WARNING) and self._enabled:
+        if LogLevel.WARNING >= self._config.level:
             self._log(LogLevel.WARNING, msg)
 
     def error(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.ERROR) and self._enabled:
+        if LogLevel.ERROR >= self._config.level:
             self._log(LogLevel.ERROR, msg)
 
     def exception(self, exc: BaseException, msg: Optional["MessageType"] = None):
-        if self._filter(level=LogLevel.ERROR) and self._enabled:
+        if LogLevel.ERROR >= self._config.level:
             message = msg if msg else str(exc)
             self._log(LogLevel.ERROR, message, exc_info=exc)
 
     def critical(self, msg: "MessageType"):
-        if self._filter(level=LogLevel.CRITICAL) and self._enabled:
+        if LogLevel.CRITICAL >= self._config.level:
             self._log(LogLevel.CRITICAL, msg)
 
     def _log(
@@ -41,6 +52,9 @@ class SyncLogger(BaseLogger[SyncHandlerProtocol]):
         msg: "MessageType",
         exc_info: Optional[BaseException] = None,
     ):
+        if not (handlers := self._config.routes[level]):
+            return
+
         caller = self._find_caller()
 
         record = self._make_record(
@@ -53,13 +67,23 @@ class SyncLogger(BaseLogger[SyncHandlerProtocol]):
             exc_info=exc_info,
         )
 
-        self._handle(record)
+        self._handle(record, handlers)
 
-    def _handle(self, record: "LogRecordProtocol"):
-        [handler.handle(record) for handler in self._handlers]
+    def _compile_route(self, handlers: tuple[SyncHandlerProtocol, ...]):
+        # NOTE: With a listener, the records are only enqueued in the caller's thread
+        if self._listener is None or not handlers:
+            return handlers
+
+        from .listener import QueuedRoute
+
+        return (QueuedRoute(listener=self._listener, handlers=handlers),)
+
+    def _handle(
+        self, record: "LogRecordProtocol", handlers: tuple[SyncHandlerProtocol, ...]
+    ):
+        for handler in handlers:
+            handler.handle(record)
 
     def _disable(self):
-        if self._enabled:
-            [handler.close() for handler in self._handlers]
-            self._handlers = set()
-            self._enabled = False
+        if self.enabled:
+            [handler.close() for handler in self._detach_handlers()]
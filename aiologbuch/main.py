@@ -1,15 +1,19 @@
-from inspect import currentframe, getmodule
-from typing import TYPE_CHECKING, Literal, overload
+import os
+import sys
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Iterable, Literal, Optional, TypedDict, Unpack
+from typing import Union, overload
 
-from .filters import Filter
-from .formatters import JsonFormatter
-from .handlers import AsyncStderrHandler, SyncStderrHandler
 from .loggers import AsyncLogger, SyncLogger
 from .managers import get_logger_manager
+from .shared.enums import IOModeEnum
+from .shared.filters import ExclusiveFilter, Filter
 from .shared.levels import check_level
 
 if TYPE_CHECKING:
-    from .shared.types import LevelType
+    from .managers import AsyncManager, SyncManager
+    from .shedding import Signal
+    from .shared.types import FilterProtocol, LevelType, LoggerChanges
 
 
 # TODO: Make sure that users can globally configure:
@@ -17,14 +21,24 @@ if TYPE_CHECKING:
 # - formatter
 
 
-async_manager = get_logger_manager(AsyncLogger)
-sync_manager = get_logger_manager(SyncLogger)
+# NOTE: The managers, and the handlers of their root loggers, are only created on the
+# first call for each kind, which keeps 'import aiologbuch' cheap and lets the settings
+# be configured before that.
+_managers: dict[str, Union["AsyncManager", "SyncManager"]] = {}
+_managers_lock = Lock()
+
+
+class _LoggerOptions(TypedDict, total=False):
+    level: Optional["LevelType"]
+    handlers: Iterable[Any]
+    propagate: bool
+    sheddable: Optional[bool]
 
 
 @overload
 def get_logger(
     name: str = "",
-    level: "LevelType" = "INFO",
+    level: Optional["LevelType"] = None,
     filename: str = "",
     exclusive: bool = False,
     kind: Literal["async"] = "async",
@@ -35,7 +49,7 @@ def get_logger(
 @overload
 def get_logger(
     name: str = "",
-    level: "LevelType" = "INFO",
+    level: Optional["LevelType"] = None,
     filename: str = "",
     exclusive: bool = False,
     kind: Literal["sync"] = "sync",
@@ -45,7 +59,7 @@ def get_logger(
 
 def get_logger(
     name: str = "",
-    level: "LevelType" = "INFO",
+    level: Optional["LevelType"] = None,
     filename: str = "",
     exclusive: bool = False,
     kind: Literal["async", "sync"] = "async",
@@ -54,50 +68,225 @@ def get_logger(
     This function is used to get a logger instance. If you inform the same name, it
     will always return the same logger.
 
-    If you don't inform a 'filename', the logger will only log to 'sys.stderr'.
+    Loggers are organized in a hierarchy by their dotted names, so 'app.db' is a child
+    of 'app', which is a child of the root logger. A logger without a level inherits it
+    from its closest ancestor, and records are also handled by the ancestors' handlers.
+
+    Every logger logs to 'sys.stderr', through the root logger. If you inform a
+    'filename', the logger also logs to that file.
 
     :param name: The name of the logger.
-    :param level: The level of the logger. Default is INFO.
+    :param level: The level of the logger. If informed for an existing logger, its \
+        level is updated. Default is None, which inherits the ancestors' level (the \
+        root logger's level is INFO).
     :param filename: The filename to write the logs.
-    :param exclusive: If True, the logger will only log the messages that are \
-        exclusively for the level chosen. Only works with a 'filename' specified.\
-        Default is False.
+    :param exclusive: If True, only the messages of exactly the level chosen are \
+        written to the file, while 'sys.stderr' still gets the others. Requires both \
+        a 'level' and a 'filename'. Default is False.
     :param kind: Determines the kind of the logger that will be returned, either a \
         sync or an async logger. The possible values are 'async' and 'sync'. The \
         default value is 'async'.
 
     :returns: A logger instance.
     """
+    if exclusive and (level is None or not filename):
+        raise ValueError("'exclusive' requires both a 'level' and a 'filename'")
+
     if not name:
+        # NOTE: The module name is read straight from the caller's globals, since
+        # 'inspect.getmodule' may go through all of 'sys.modules' and stat their files
         try:
-            if (frame := currentframe().f_back) is None:
-                raise ValueError()
-        except (AttributeError, ValueError) as exc:
-            raise RuntimeError("Could not find the caller's frame") from exc
+            name = sys._getframe(1).f_globals["__name__"]
+        except (ValueError, KeyError) as exc:
+            raise RuntimeError("Could not find the caller's module") from exc
 
-        if (module := getmodule(frame)) is None:
-            raise RuntimeError("Could not find the caller's module")
+    manager = _get_manager(kind=kind)
 
-        name = module.__name__
+    # NOTE: Fast path for the repeated calls, which return the existing logger without
+    # building a new filter when its level doesn't change
+    if (
+        (not filename)
+        and (logger := manager.loggers.get(name)) is not None
+        and (level is None or logger.level == check_level(level=level))
+    ):
+        return logger
 
-    filter_ = Filter(level=check_level(level=level))
-    manager = async_manager if kind == "async" else sync_manager
+    filter_ = None if level is None else Filter(level=check_level(level=level))
     logger, created = manager.get_logger(name=name, filter_=filter_)
 
-    if created:
-        if kind == "async":
-            _setup_async_logger(logger=logger)
-        else:
-            _setup_sync_logger(logger=logger)
+    if (not created) and (filter_ is not None) and (logger.level != filter_.level):
+        manager.set_level(name=name, filter_=filter_)
+
+    if filename:
+        handler_filter = ExclusiveFilter(level=filter_.level) if exclusive else None
+        _add_file_handler(
+            manager=manager, logger=logger, filename=filename, filter_=handler_filter
+        )
 
     return logger
 
 
-def _setup_async_logger(logger: AsyncLogger):
-    stderr_handler = AsyncStderrHandler(formatter=JsonFormatter())
-    logger._add_handler(stderr_handler)
+def configure_logger(
+    name: str,
+    kind: Literal["async", "sync"] = "async",
+    **options: Unpack[_LoggerOptions],
+):
+    """
+    This function reconfigures a logger at runtime, creating it if it doesn't exist.
+    Only the options informed are changed, and the change is applied atomically to
+    the logger and its descendants, without stopping the ones that are logging.
+
+    :param name: The name of the logger.
+    :param kind: The kind of the logger, either 'async' or 'sync'. The default value \
+        is 'async'.
+    :param level: The new level of the logger, or None to inherit it.
+    :param handlers: The new handlers of the logger, replacing the current ones.
+    :param propagate: If False, the ancestors' handlers are not used.
+    :param sheddable: If True, the logger and its descendants are low priority, so \
+        their level is raised while the load is shed. None inherits it.
+
+    :returns: The handlers that were removed. The records that were already being \
+        handled may still use them, so it is up to the caller to close them.
+    """
+    changes: "LoggerChanges" = {}
+    if "level" in options:
+        level = options["level"]
+        changes["filter_"] = None if level is None else Filter(check_level(level=level))
+    if "handlers" in options:
+        changes["handlers"] = options["handlers"]
+    if "propagate" in options:
+        changes["propagate"] = options["propagate"]
+    if "sheddable" in options:
+        changes["sheddable"] = options["sheddable"]
+
+    return _get_manager(kind=kind).configure_logger(name=name, **changes)
+
+
+def create_load_shedder(
+    signals: Optional[Iterable["Signal"]] = None,
+    kind: Literal["async", "sync"] = "async",
+    **options: Any,
+):
+    """
+    This function creates a load shedder for the loggers of a kind, which raises the
+    level of the sheddable loggers while the pipeline is under pressure. Call 'start()'
+    on it for the sync loggers, or run 'run()' as a task for the async ones.
+
+    :param signals: What to watch. Default is None, which watches the sync pipeline's \
+        queue and the backlogs of the root logger's async handlers.
+    :param kind: The kind of the loggers, either 'async' or 'sync'. The default value \
+        is 'async'.
+    :param options: The options of 'LoadShedder', such as 'level', 'high' and 'low'.
+    """
+    from .shedding import LoadShedder, handler_backlog, listener_backlog
+
+    manager = _get_manager(kind=kind)
+    if signals is None:
+        if kind == IOModeEnum.ASYNC:
+            signals = [
+                handler_backlog(handler)
+                for handler in manager.root.handlers
+                if hasattr(handler, "backlog")
+            ]
+        elif manager.listener is not None:
+            signals = [listener_backlog(manager.listener)]
+        else:
+            signals = []
+
+    return LoadShedder(manager=manager, signals=signals, **options)
+
+
+@overload
+def _get_manager(kind: Literal["async"]) -> "AsyncManager": ...
+
+
+@overload
+def _get_manager(kind: Literal["sync"]) -> "SyncManager": ...
+
+
+def _get_manager(kind: Literal["async", "sync"]):
+    if (manager := _managers.get(kind)) is not None:
+        return manager
+
+    with _managers_lock:
+        if (manager := _managers.get(kind)) is None:
+            if kind == IOModeEnum.ASYNC:
+                manager = get_logger_manager(IOModeEnum.ASYNC, AsyncLogger)
+                _setup_async_logger(manager=manager, logger=manager.root)
+            else:
+                manager = get_logger_manager(
+                    IOModeEnum.SYNC, SyncLogger, listener=_create_listener()
+                )
+                _setup_sync_logger(manager=manager, logger=manager.root)
+            _managers[kind] = manager
+
+    return manager
+
+
+def _reinit_locks():
+    # NOTE: For pre-fork servers, the locks may have been held by another thread of
+    # the parent when it forked
+    global _managers_lock
+    _managers_lock = Lock()
+    for manager in _managers.values():
+        manager._after_fork()
+
+
+os.register_at_fork(after_in_child=_reinit_locks)
+
+
+def _create_listener():
+    from .shared.conf import settings
+
+    if not settings.SYNC_PIPELINE:
+        return None
+
+    from .loggers.listener import SyncListener
+
+    return SyncListener()
+
+
+def _add_file_handler(
+    manager: Union["AsyncManager", "SyncManager"],
+    logger: Union[AsyncLogger, SyncLogger],
+    filename: str,
+    filter_: Optional["FilterProtocol"],
+):
+    from .formatters import JsonFormatter
+    from .handlers import AsyncFileHandler, SyncFileHandler
+    from .shared.conf import settings
+
+    for handler in logger._spec.handlers:
+        if getattr(handler, "filename", None) == filename:
+            return
+
+    if isinstance(logger, AsyncLogger):
+        handler = AsyncFileHandler(
+            filename=filename, formatter=JsonFormatter(), pool=settings.FORMATTING_POOL
+        )
+    else:
+        handler = SyncFileHandler(filename=filename, formatter=JsonFormatter())
+
+    # NOTE: The filter is set before the handler is attached, so it is compiled into
+    # the loggers' routes
+    handler.filter_ = filter_
+    manager.add_handler(name=logger.name, handler=handler)
+
+
+def _setup_async_logger(manager: "AsyncManager", logger: AsyncLogger):
+    from .formatters import JsonFormatter
+    from .handlers import AsyncStderrHandler
+    from .shared.conf import settings
+
+    stderr_handler = AsyncStderrHandler(
+        formatter=JsonFormatter(), pool=settings.FORMATTING_POOL
+    )
+    manager.add_handler(name=logger.name, handler=stderr_handler)
+
 
+def _setup_sync_logger(manager: "SyncManager", logger: SyncLogger):
+    from .formatters import JsonFormatter
+    from .handlers import SyncStderrHandler
 
-def _setup_sync_logger(logger: SyncLogger):
     stderr_handler = SyncStderrHandler(formatter=JsonFormatter())
-    logger._add_handler(stderr_handler)
+    manager.add_handler(name=logger.name, handler=stderr_handler)
@@ -1,4 +1,4 @@
-from typing import overload
+from typing import TYPE_CHECKING, Optional, overload
 
 from aiologbuch.shared.enums import IOModeEnum
 from aiologbuch.shared.types import AsyncMode, BaseLoggerProtocol, IOMode, SyncMode
@@ -6,6 +6,9 @@ from aiologbuch.shared.types import AsyncMode, BaseLoggerProtocol, IOMode, SyncM
 from .async_ import AsyncLoggerManager as AsyncManager
 from .sync import SyncLoggerManager as SyncManager
 
+if TYPE_CHECKING:
+    from aiologbuch.loggers.listener import SyncListener
+
 
 @overload
 def get_logger_manager(
@@ -15,11 +18,17 @@ def get_logger_manager(
 
 @overload
 def get_logger_manager(
-    mode: SyncMode, logger_class: BaseLoggerProtocol
+    mode: SyncMode,
+    logger_class: BaseLoggerProtocol,
+    listener: Optional["SyncListener"] = None,
 ) -> SyncManager: ...
 
 
-def get_logger_manager(mode: IOMode, logger_class: BaseLoggerProtocol):
+def get_logger_manager(
+    mode: IOMode,
+    logger_class: BaseLoggerProtocol,
+    listener: Optional["SyncListener"] = None,
+):
     if mode == IOModeEnum.ASYNC:
         return AsyncManager(logger_class)
-    return SyncManager(logger_class)
+    return SyncManager(logger_class, listener=listener)
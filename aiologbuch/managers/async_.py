@@ -1,12 +1,24 @@
 from aiologbuch.shared.types import AsyncLoggerProtocol
 
-from .base import BaseLoggerManager
+from .base import ROOT_LOGGER_NAME, BaseLoggerManager
 
 
 class AsyncLoggerManager(BaseLoggerManager[AsyncLoggerProtocol]):
     async def disable(self):
-        [await self.loggers[name]._disable() for name in self.loggers]
+        [await self.loggers[name]._disable() for name in list(self.loggers)]
+        with self._lock:
+            self._refresh(ROOT_LOGGER_NAME)
 
     async def disable_logger(self, name: str):
-        if logger := self.loggers.pop(name, None):
+        if name == ROOT_LOGGER_NAME:
+            await self.root._disable()
+            with self._lock:
+                return self._refresh(ROOT_LOGGER_NAME)
+
+        with self._lock:
+            logger = self.loggers.pop(name, None)
+            if logger:
+                self._refresh(name)
+
+        if logger:
             await logger._disable()
@@ -1,13 +1,30 @@
-from aiologbuch.shared.types import BaseLoggerProtocol, FilterProtocol
+from threading import RLock
+from typing import Optional, Unpack
+
+from aiologbuch.shared.filters import Filter
+from aiologbuch.shared.levels import LogLevel
+from aiologbuch.shared.types import BaseLoggerProtocol, FilterProtocol, LoggerChanges
+
+ROOT_LOGGER_NAME = "root"
 
 
 class BaseLoggerManager[T: BaseLoggerProtocol]:
     _loggers: dict[str, T]
     _logger_class: T
+    _lock: RLock
+    _shed_level: Optional[int]
 
     def __init__(self, logger_class: T):
         self._loggers = dict()
         self._logger_class = logger_class
+        self._lock = RLock()
+        self._shed_level = None
+        self._loggers[ROOT_LOGGER_NAME] = self._create_logger(
+            ROOT_LOGGER_NAME, Filter(level=LogLevel.INFO)
+        )
+
+    def _after_fork(self):
+        self._lock = RLock()
 
     @property
     def loggers(self):
@@ -17,9 +34,112 @@ class BaseLoggerManager[T: BaseLoggerProtocol]:
     def logger_class(self):
         return self._logger_class
 
-    def get_logger(self, name: str, filter_: FilterProtocol):
-        created = False
-        if name not in self.loggers:
-            self.loggers[name], created = self.logger_class(name, filter_), True
+    @property
+    def root(self):
+        return self._loggers[ROOT_LOGGER_NAME]
+
+    @property
+    def shed_level(self):
+        return self._shed_level
+
+    def shed(self, level: Optional[int]):
+        """
+        Raises the level of every sheddable logger to 'level', or restores them when
+        it's None. Only their snapshots are replaced, like any other change.
+        """
+        with self._lock:
+            self._shed_level = level
+            for logger in self.loggers.values():
+                logger._shed_level = level
+            self._refresh(ROOT_LOGGER_NAME)
+
+    def get_logger(self, name: str, filter_: Optional[FilterProtocol] = None):
+        if (logger := self.loggers.get(name)) is not None:
+            return logger, False
+
+        with self._lock:
+            if (logger := self.loggers.get(name)) is not None:
+                return logger, False
+
+            logger = self._create_logger(name, filter_)
+            logger._shed_level = self._shed_level
+            self.loggers[name] = logger
+            self._refresh(name)
+
+        return self.loggers[name], True
+
+    def configure_logger(self, name: str, **changes: Unpack[LoggerChanges]):
+        """
+        Atomically replaces the configuration of a logger, creating it if needed. The
+        handlers that were removed are returned, and it is up to the caller to close
+        them once the records that are still using them were handled.
+        """
+        if "handlers" in changes:
+            changes["handlers"] = tuple(changes["handlers"])
+
+        with self._lock:
+            logger, _ = self.get_logger(name=name)
+            previous = logger._spec
+            logger._spec = previous._replace(**changes)
+            self._refresh(name)
+
+        return tuple(
+            handler
+            for handler in previous.handlers
+            if handler not in logger._spec.handlers
+        )
+
+    def set_level(self, name: str, filter_: Optional[FilterProtocol]):
+        self.configure_logger(name=name, filter_=filter_)
+
+    def add_handler[H](self, name: str, handler: H):
+        with self._lock:
+            logger, _ = self.get_logger(name=name)
+            if handler not in logger._spec.handlers:
+                self.configure_logger(
+                    name=name, handlers=logger._spec.handlers + (handler,)
+                )
+
+    def detach_handlers(self):
+        """
+        Disables every logger and returns their handlers to be closed, once each, even
+        when several loggers share them
+        """
+        with self._lock:
+            handlers = dict.fromkeys(
+                handler
+                for name in list(self.loggers)
+                for handler in self.loggers[name]._detach_handlers()
+            )
+            self._refresh(ROOT_LOGGER_NAME)
+        return tuple(handlers)
+
+    def _create_logger(self, name: str, filter_: Optional[FilterProtocol]) -> T:
+        return self.logger_class(name, filter_)
+
+    def _parent_of(self, name: str):
+        if name == ROOT_LOGGER_NAME:
+            return None
+
+        while "." in name:
+            name = name.rpartition(".")[0]
+            if (parent := self.loggers.get(name)) is not None:
+                return parent
+
+        return self.loggers.get(ROOT_LOGGER_NAME)
+
+    def _refresh(self, name: str):
+        # NOTE: Changing a logger, or creating one in between existing loggers, only
+        # affects that logger and its descendants. They are resolved parents first, so
+        # every logger can build on the snapshot already cached on its parent.
+        if name == ROOT_LOGGER_NAME:
+            affected = list(self.loggers)
+        else:
+            prefix = name + "."
+            affected = [
+                item for item in self.loggers if item == name or item.startswith(prefix)
+            ]
 
-        return self.loggers[name], created
+        affected.sort(key=lambda item: (item != ROOT_LOGGER_NAME, item.count(".")))
+        for item in affected:
+            self.loggers[item]._resolve(parent=self._parent_of(item))
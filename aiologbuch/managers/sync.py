@@ -1,12 +1,51 @@
-from aiologbuch.shared.types import SyncLoggerProtocol
+from typing import TYPE_CHECKING, Optional
 
-from .base import BaseLoggerManager
+from aiologbuch.shared.types import FilterProtocol, SyncLoggerProtocol
+
+from .base import ROOT_LOGGER_NAME, BaseLoggerManager
+
+if TYPE_CHECKING:
+    from aiologbuch.loggers.listener import SyncListener
 
 
 class SyncLoggerManager(BaseLoggerManager[SyncLoggerProtocol]):
+    def __init__(
+        self,
+        logger_class: SyncLoggerProtocol,
+        listener: Optional["SyncListener"] = None,
+    ):
+        self._listener = listener
+        super().__init__(logger_class)
+
+    @property
+    def listener(self):
+        return self._listener
+
     def disable(self):
-        [self.loggers[name]._disable() for name in self.loggers]
+        # NOTE: The records still enqueued are written before the handlers are closed
+        if self.listener is not None:
+            self.listener.stop()
+
+        [self.loggers[name]._disable() for name in list(self.loggers)]
+        with self._lock:
+            self._refresh(ROOT_LOGGER_NAME)
 
     def disable_logger(self, name: str):
-        if logger := self.loggers.pop(name, None):
+        if self.listener is not None:
+            self.listener.flush()
+
+        if name == ROOT_LOGGER_NAME:
+            self.root._disable()
+            with self._lock:
+                return self._refresh(ROOT_LOGGER_NAME)
+
+        with self._lock:
+            logger = self.loggers.pop(name, None)
+            if logger:
+                self._refresh(name)
+
+        if logger:
             logger._disable()
+
+    def _create_logger(self, name: str, filter_: Optional[FilterProtocol]):
+        return self.logger_class(name, filter_, listener=self.listener)
@@ -0,0 +1,660 @@
+"""
+Opt-in profiling of the logging hot path.
+
+    python -m aiologbuch.profile [-o profile.json] (script.py | -m module) [args...]
+    python -m aiologbuch.profile --show profile.json
+
+While enabled, the time each stage of a logging call takes is measured with
+'perf_counter_ns' and aggregated into histograms, per logger for the filter check,
+'_find_caller' and '_make_record', and per handler for the formatting, the lock
+acquisitions in the resource managers and the write to the backend.
+
+Enabling wraps those methods of the loggers and handlers, and the locks of the
+resource managers, in timers that call the originals, and disabling swaps the
+originals back, so the code that runs while profiling is disabled is exactly the
+code that runs without it. The async loggers whose routes bound the wrapped handlers
+meanwhile get their routes compiled again.
+
+The handlers with a formatting pool format their records in the pool, which isn't
+broken down: their 'format' stage stays empty, and their 'send' includes waiting on
+the pool to format the batch.
+"""
+
+import os
+import sys
+from contextvars import ContextVar
+from inspect import iscoroutinefunction
+from threading import Lock
+from time import perf_counter_ns
+from typing import IO, TYPE_CHECKING, Any, Callable, Optional, Sequence
+from weakref import WeakKeyDictionary, WeakSet
+
+
+if TYPE_CHECKING:
+    from .shared.types import LogRecordProtocol
+
+LOGGER_STAGES = ("filter", "find_caller", "make_record")
+HANDLER_STAGES = ("format", "lock", "send")
+
+# NOTE: Every power of 2 is split into 4 buckets, so the percentiles are within 25%
+_SUB_BITS = 2
+_SUB_BUCKETS = 1 << _SUB_BITS
+
+_lock = Lock()
+_enabled = False
+_histograms: dict[tuple[str, str, str], "Histogram"] = {}
+_originals: list[tuple[Any, str, Any]] = []
+_handler_names: WeakKeyDictionary[Any, str] = WeakKeyDictionary()
+# NOTE: The async loggers that compiled routes while profiling, which bind the wrapped
+# methods of the handlers until they're compiled again
+_compiled: WeakSet[Any] = WeakSet()
+
+
+class Histogram:
+    """The distribution of the durations of a stage, in nanoseconds"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+        self.buckets: dict[int, int] = {}
+        self._lock = Lock()
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, duration: int):
+        index = _bucket(duration)
+        with self._lock:
+            if not self.count or duration < self.min:
+                self.min = duration
+            if duration > self.max:
+                self.max = duration
+            self.count += 1
+            self.total += duration
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, percent: float) -> int:
+        """The upper bound of the bucket that holds the given percentile"""
+        if not self.count:
+            return 0
+
+        rank, seen = percent / 100 * self.count, 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_upper_bound(index), self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]):
+        histogram = cls()
+        histogram.count, histogram.total = data["count"], data["total"]
+        histogram.min, histogram.max = data["min"], data["max"]
+        histogram.buckets = {int(index): n for index, n in data["buckets"].items()}
+        return histogram
+
+    def _copy(self):
+        with self._lock:
+            return Histogram.from_dict(self.as_dict())
+
+
+def enable():
+    """
+    Starts profiling the loggers and handlers, including the existing ones. The async
+    loggers bind their handlers into routes, so the ones that weren't created through
+    'get_logger' only get profiled routes once they're reconfigured.
+    """
+    global _enabled
+    with _lock:
+        if _enabled:
+            return
+        _patch_loggers()
+        _patch_handlers()
+        _patch_locks()
+        _enabled = True
+        _recompile_routes()
+
+
+def disable():
+    """Stops profiling and restores the original code. The histograms are kept."""
+    global _enabled
+    with _lock:
+        if not _enabled:
+            return
+        _unwrap_locks()
+        while _originals:
+            owner, name, original = _originals.pop()
+            setattr(owner, name, original)
+        _enabled = False
+        _recompile_routes()
+        _recompile_loggers()
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def histograms() -> dict[str, dict[str, dict[str, Histogram]]]:
+    """
+    Copies of the histograms, as '{"loggers": {name: {stage: histogram}}, "handlers":
+    {name: {stage: histogram}}}'
+    """
+    result: dict[str, dict[str, dict[str, Histogram]]] = {
+        "loggers": {},
+        "handlers": {},
+    }
+    for (kind, name, stage), histogram in list(_histograms.items()):
+        result[kind].setdefault(name, {})[stage] = histogram._copy()
+    return result
+
+
+def dump(file: Optional[IO[str]] = None, format: str = "text"):
+    """Writes the histograms to 'file', stdout by default, as a table or as JSON"""
+    file = sys.stdout if file is None else file
+    if format == "json":
+        import json
+
+        json.dump(_serialize(histograms()), file, indent=2)
+        file.write("\n")
+    elif format == "text":
+        file.write(render(histograms()))
+    else:
+        raise ValueError(f"Unknown format {format!r}, use 'text' or 'json'")
+
+
+def render(data: dict[str, dict[str, dict[str, Histogram]]]):
+    columns = ("count", "mean", "p50", "p90", "p99", "max")
+    lines: list[str] = []
+    for kind, stages in (("loggers", LOGGER_STAGES), ("handlers", HANDLER_STAGES)):
+        for name, histogram_by_stage in sorted(data.get(kind, {}).items()):
+            lines.append(f"{kind[:-1]} {name}")
+            lines.append(f"  {'stage':<12}" + "".join(f"{c:>10}" for c in columns))
+            for stage in stages:
+                if (histogram := histogram_by_stage.get(stage)) is None:
+                    continue
+                values = (
+                    histogram.mean,
+                    histogram.percentile(50),
+                    histogram.percentile(90),
+                    histogram.percentile(99),
+                    histogram.max,
+                )
+                lines.append(
+                    f"  {stage:<12}{histogram.count:>10}"
+                    + "".join(f"{_duration(value):>10}" for value in values)
+                )
+            lines.append("")
+
+    return "\n".join(lines) if lines else "No logging calls were profiled\n"
+
+
+def _bucket(duration: int):
+    if duration < _SUB_BUCKETS:
+        return max(duration, 0)
+    exponent = duration.bit_length() - 1
+    mantissa = (duration >> (exponent - _SUB_BITS)) & (_SUB_BUCKETS - 1)
+    return (exponent - _SUB_BITS + 1) * _SUB_BUCKETS + mantissa
+
+
+def _upper_bound(index: int):
+    if index < _SUB_BUCKETS:
+        return index
+    exponent = index // _SUB_BUCKETS + _SUB_BITS - 1
+    width = 1 << (exponent - _SUB_BITS)
+    return (_SUB_BUCKETS + index % _SUB_BUCKETS) * width + width - 1
+
+
+def _duration(nanoseconds: float):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if nanoseconds >= scale:
+            return f"{nanoseconds / scale:.1f}{unit}"
+    return f"{nanoseconds:.0f}ns"
+
+
+def _serialize(data: dict[str, dict[str, dict[str, Histogram]]]):
+    return {
+        kind: {
+            name: {stage: histogram.as_dict() for stage, histogram in stages.items()}
+            for name, stages in names.items()
+        }
+        for kind, names in data.items()
+    }
+
+
+def _deserialize(data: dict[str, Any]):
+    return {
+        kind: {
+            name: {
+                stage: Histogram.from_dict(histogram)
+                for stage, histogram in stages.items()
+            }
+            for name, stages in names.items()
+        }
+        for kind, names in data.items()
+    }
+
+
+def _histogram(kind: str, name: str, stage: str):
+    key = (kind, name, stage)
+    if (histogram := _histograms.get(key)) is None:
+        histogram = _histograms.setdefault(key, Histogram())
+    return histogram
+
+
+def _handler_name(handler: Any):
+    if (name := _handler_names.get(handler)) is None:
+        from .lifecycle import _describe
+
+        name = _handler_names[handler] = _describe(handler)
+    return name
+
+
+def _recompile_routes():
+    from .main import _managers
+    from .managers.base import ROOT_LOGGER_NAME
+
+    for manager in list(_managers.values()):
+        with manager._lock:
+            manager._refresh(ROOT_LOGGER_NAME)
+
+
+def _recompile_loggers():
+    # NOTE: The loggers of the managers were compiled again along with their managers,
+    # under their locks, while the ones created by hand only have their own
+    from .main import _managers
+
+    managed = {
+        id(logger)
+        for manager in list(_managers.values())
+        for logger in list(manager.loggers.values())
+    }
+    for logger in list(_compiled):
+        if id(logger) not in managed:
+            logger._resolve(parent=logger.parent)
+    _compiled.clear()
+
+
+def _patch(owner: Any, name: str, replacement: Any):
+    _originals.append((owner, name, owner.__dict__[name]))
+    setattr(owner, name, replacement)
+
+
+# NOTE: The wrappers only time the original methods, which they call. The logging
+# methods and '_find_caller' get a wrapper each, so the caller is 2 frames further up.
+_WRAPPED_CALLER_DEPTH = 2
+
+
+class _Call:
+    """A logging call, until its record is made or it's filtered out"""
+
+    __slots__ = ("start", "passed")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.passed = False
+
+
+class _Handling:
+    """A record being handled, and how long formatting it took"""
+
+    __slots__ = ("name", "formatted")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.formatted = 0
+
+
+_calls: ContextVar[Optional[_Call]] = ContextVar("aiologbuch_profile_call")
+# NOTE: The handler that is writing in the current thread or task, which the lock
+# acquisitions of the resource managers are attributed to
+_handlings: ContextVar[Optional[_Handling]] = ContextVar(
+    "aiologbuch_profile_handling", default=None
+)
+
+
+def _wrap_log(method: Callable[..., Any]):
+    # NOTE: The filter check is the time until the record is made, or the whole call
+    # when the record was filtered out
+    def finish(self: Any, call: _Call):
+        if not call.passed:
+            duration = perf_counter_ns() - call.start
+            _histogram("loggers", self.name, "filter").add(duration)
+
+    if iscoroutinefunction(method):
+
+        async def alog(self: Any, *args: Any, **kwargs: Any):
+            call = _Call(perf_counter_ns())
+            token = _calls.set(call)
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                _calls.reset(token)
+                finish(self, call)
+
+        return alog
+
+    def log(self: Any, *args: Any, **kwargs: Any):
+        call = _Call(perf_counter_ns())
+        token = _calls.set(call)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _calls.reset(token)
+            finish(self, call)
+
+    return log
+
+
+def _wrap_compile_route(method: Callable[..., Any]):
+    def _compile_route(self: Any, handlers: tuple[Any, ...]):
+        _compiled.add(self)
+        return method(self, handlers)
+
+    return _compile_route
+
+
+def _wrap_find_caller(method: Callable[..., Any]):
+    def _find_caller(self: Any, depth: int = 3):
+        start = perf_counter_ns()
+        if (call := _calls.get(None)) is not None and not call.passed:
+            call.passed = True
+            _histogram("loggers", self.name, "filter").add(start - call.start)
+
+        try:
+            return method(self, depth + _WRAPPED_CALLER_DEPTH)
+        finally:
+            duration = perf_counter_ns() - start
+            _histogram("loggers", self.name, "find_caller").add(duration)
+
+    return _find_caller
+
+
+def _wrap_make_record(method: Callable[..., Any]):
+    def _make_record(self: Any, *args: Any, **kwargs: Any):
+        start = perf_counter_ns()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            duration = perf_counter_ns() - start
+            _histogram("loggers", self.name, "make_record").add(duration)
+
+    return _make_record
+
+
+def _wrap_format(method: Callable[..., Any]):
+    def format(self: Any, record: "LogRecordProtocol"):
+        start = perf_counter_ns()
+        try:
+            return method(self, record)
+        finally:
+            duration = perf_counter_ns() - start
+            _histogram("handlers", _handler_name(self), "format").add(duration)
+            if (handling := _handlings.get()) is not None:
+                handling.formatted += duration
+
+    return format
+
+
+def _wrap_handle(method: Callable[..., Any]):
+    # NOTE: The send is whatever handling the records took, besides formatting them
+    def finish(handling: _Handling, start: int):
+        duration = perf_counter_ns() - start - handling.formatted
+        _histogram("handlers", handling.name, "send").add(duration)
+
+    if iscoroutinefunction(method):
+
+        async def ahandle(self: Any, *args: Any, **kwargs: Any):
+            handling = _Handling(_handler_name(self))
+            token, start = _handlings.set(handling), perf_counter_ns()
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                _handlings.reset(token)
+                finish(handling, start)
+
+        return ahandle
+
+    def handle(self: Any, *args: Any, **kwargs: Any):
+        handling = _Handling(_handler_name(self))
+        token, start = _handlings.set(handling), perf_counter_ns()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _handlings.reset(token)
+            finish(handling, start)
+
+    return handle
+
+
+def _wrap(owner: Any, name: str, wrapper: Callable[[Any], Any]):
+    _patch(owner, name, wrapper(owner.__dict__[name]))
+
+
+def _patch_loggers():
+    from .loggers import AsyncLogger, SyncLogger
+    from .loggers.base import BaseLogger
+
+    for logger_class in (SyncLogger, AsyncLogger):
+        for name in ("debug", "info", "warning", "error", "exception", "critical"):
+            _wrap(logger_class, name, _wrap_log)
+    _wrap(BaseLogger, "_find_caller", _wrap_find_caller)
+    _wrap(BaseLogger, "_make_record", _wrap_make_record)
+    _wrap(AsyncLogger, "_compile_route", _wrap_compile_route)
+
+
+def _patch_handlers():
+    from .handlers import AsyncMemoryHandler, SyncMemoryHandler
+    from .handlers.base import BaseAsyncHandler, BaseHandler, BaseSyncHandler
+
+    _wrap(BaseHandler, "format", _wrap_format)
+    _wrap(BaseSyncHandler, "handle", _wrap_handle)
+    _wrap(BaseSyncHandler, "handle_batch", _wrap_handle)
+    _wrap(BaseAsyncHandler, "handle", _wrap_handle)
+    # NOTE: They only buffer the records, and hand them to their target's 'handle'
+    _wrap(SyncMemoryHandler, "handle", _wrap_handle)
+    _wrap(AsyncMemoryHandler, "handle", _wrap_handle)
+
+
+class _TimedLock:
+    """Times how long a thread lock takes to acquire, for the writing handler"""
+
+    __slots__ = ("lock",)
+
+    def __init__(self, lock: Any):
+        self.lock = lock
+
+    def __enter__(self):
+        start = perf_counter_ns()
+        self.lock.acquire()
+        _record_lock(perf_counter_ns() - start)
+        return True
+
+    def __exit__(self, *_):
+        self.lock.release()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1):
+        return self.lock.acquire(blocking, timeout)
+
+    def release(self):
+        self.lock.release()
+
+    def locked(self):
+        return self.lock.locked()
+
+
+class _TimedAsyncLock:
+    """Times how long an asyncio lock takes to acquire, for the writing handler"""
+
+    __slots__ = ("lock",)
+
+    def __init__(self, lock: Any):
+        self.lock = lock
+
+    async def __aenter__(self):
+        start = perf_counter_ns()
+        await self.lock.acquire()
+        _record_lock(perf_counter_ns() - start)
+
+    async def __aexit__(self, *_):
+        self.lock.release()
+
+    async def acquire(self):
+        return await self.lock.acquire()
+
+    def release(self):
+        self.lock.release()
+
+    def locked(self):
+        return self.lock.locked()
+
+
+def _record_lock(duration: int):
+    # NOTE: Only the acquisitions on behalf of a handler, not the writer's thread's
+    if (handling := _handlings.get()) is not None:
+        _histogram("handlers", handling.name, "lock").add(duration)
+
+
+def _wrap_lock(owner: Any, timed: Callable[[Any], Any] = _TimedLock):
+    if not isinstance(owner._lock, (_TimedLock, _TimedAsyncLock)):
+        owner._lock = timed(owner._lock)
+
+
+def _unwrap_lock(owner: Any):
+    if isinstance(owner._lock, (_TimedLock, _TimedAsyncLock)):
+        owner._lock = owner._lock.lock
+
+
+def _lock_owners():
+    from .handlers.file.manager import _LoopStream
+    from .handlers.file.manager import resource_manager as files
+    from .handlers.stderr.manager import resource_manager as stderr
+
+    owners: list[Any] = [files, stderr]
+    with files.lock:
+        resources = list(files.resources.values())
+    for resource in resources:
+        owners.append(resource.writer)
+        owners.extend(
+            stream
+            for stream in list(resource._streams.values())
+            if isinstance(stream, _LoopStream)
+        )
+    return owners
+
+
+def _patch_locks():
+    from .handlers.file.manager import _LoopStream
+    from .handlers.file.writer import FileWriter
+
+    # NOTE: The writers and streams created, or reset after a fork, while profiling
+    # get timed locks too
+    reset, init = FileWriter._reset, _LoopStream.__init__
+
+    def _reset(self: FileWriter):
+        reset(self)
+        _wrap_lock(self)
+
+    def __init__(self: _LoopStream, *args: Any, **kwargs: Any):
+        init(self, *args, **kwargs)
+        _wrap_lock(self, _TimedAsyncLock)
+
+    _patch(FileWriter, "_reset", _reset)
+    _patch(_LoopStream, "__init__", __init__)
+
+    for owner in _lock_owners():
+        _wrap_lock(owner, _owner_lock_type(owner))
+
+
+def _unwrap_locks():
+    for owner in _lock_owners():
+        _unwrap_lock(owner)
+
+
+def _after_fork():
+    # NOTE: The child profiles itself, and the managers replaced their locks already
+    global _lock
+    _lock = Lock()
+    _histograms.clear()
+    if _enabled:
+        for owner in _lock_owners():
+            _unwrap_lock(owner)
+            _wrap_lock(owner, _owner_lock_type(owner))
+
+
+def _owner_lock_type(owner: Any):
+    from .handlers.file.manager import _LoopStream
+
+    return _TimedAsyncLock if isinstance(owner, _LoopStream) else _TimedLock
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    import runpy
+    from argparse import REMAINDER, ArgumentParser
+
+    parser = ArgumentParser(
+        prog="python -m aiologbuch.profile",
+        description="Runs a program with the logging profiled, and then dumps the "
+        "histograms of every stage.",
+    )
+    parser.add_argument("-o", "--output", help="the output file. Defaults to stdout")
+    parser.add_argument(
+        "-f", "--format", choices=("text", "json"), default=None, help="of the output"
+    )
+    parser.add_argument("-m", dest="module", help="run a module, like 'python -m'")
+    parser.add_argument("--show", metavar="FILE", help="show a saved JSON profile")
+    parser.add_argument("args", nargs=REMAINDER, help="the script and its arguments")
+    args = parser.parse_args(argv)
+
+    if args.show:
+        import json
+
+        with open(args.show) as file:
+            sys.stdout.write(render(_deserialize(json.load(file))))
+        return
+
+    if args.module is None and not args.args:
+        parser.error("a script or a module to run is required")
+
+    format = args.format or ("json" if args.output else "text")
+    target = args.module if args.module is not None else args.args[0]
+    argv_before = sys.argv[:]
+    sys.argv = [target, *(args.args if args.module is not None else args.args[1:])]
+
+    enable()
+    try:
+        if args.module is not None:
+            runpy.run_module(args.module, run_name="__main__", alter_sys=True)
+        else:
+            runpy.run_path(target, run_name="__main__")
+    finally:
+        disable()
+        sys.argv = argv_before
+        if args.output:
+            with open(args.output, "w") as output:
+                dump(output, format)
+        else:
+            dump(format=format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import json
+import sys
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from typing import IO, Any, Iterator, Optional, Sequence
+
+from aiologbuch.formatters.binary import (
+    FLOAT,
+    FRAME_DEFINE,
+    FRAME_HEADER,
+    FRAME_RECORD,
+    INLINE_KEY,
+    MAGIC,
+    STATIC_FIELDS,
+    TAG_DICT,
+    TAG_FALSE,
+    TAG_FLOAT,
+    TAG_INT,
+    TAG_LIST,
+    TAG_NONE,
+    TAG_STR,
+    TAG_TIMESTAMP,
+    TAG_TRUE,
+)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class _Decoder:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.keys = {idx: name for idx, name in enumerate(STATIC_FIELDS, start=1)}
+
+    def read_varint(self, data: memoryview, pos: int):
+        result, shift = 0, 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result, pos
+            shift += 7
+
+    def read_str(self, data: memoryview, pos: int):
+        size, pos = self.read_varint(data, pos)
+        return str(data[pos : pos + size], "utf-8", "surrogatepass"), pos + size
+
+    def read_key(self, data: memoryview, pos: int):
+        key_id, pos = self.read_varint(data, pos)
+        if key_id == INLINE_KEY:
+            return self.read_str(data, pos)
+
+        try:
+            return self.keys[key_id], pos
+        except KeyError:
+            raise ValueError(f"Undefined key id: {key_id}") from None
+
+    def read_value(self, data: memoryview, pos: int) -> tuple[Any, int]:
+        tag = data[pos]
+        pos += 1
+
+        if tag == TAG_NONE:
+            return None, pos
+        elif tag == TAG_TRUE:
+            return True, pos
+        elif tag == TAG_FALSE:
+            return False, pos
+        elif tag == TAG_INT:
+            value, pos = self.read_varint(data, pos)
+            return (value >> 1) ^ -(value & 1), pos
+        elif tag == TAG_FLOAT:
+            return FLOAT.unpack_from(data, pos)[0], pos + FLOAT.size
+        elif tag == TAG_STR:
+            return self.read_str(data, pos)
+        elif tag == TAG_TIMESTAMP:
+            value, pos = self.read_varint(data, pos)
+            return datetime.fromtimestamp(value / 1_000_000, tz=timezone.utc), pos
+        elif tag == TAG_LIST:
+            size, pos = self.read_varint(data, pos)
+            items = []
+            for _ in range(size):
+                item, pos = self.read_value(data, pos)
+                items.append(item)
+            return items, pos
+        elif tag == TAG_DICT:
+            size, pos = self.read_varint(data, pos)
+            mapping = {}
+            for _ in range(size):
+                key, pos = self.read_key(data, pos)
+                mapping[key], pos = self.read_value(data, pos)
+            return mapping, pos
+
+        raise ValueError(f"Unknown value tag: {tag:#x}")
+
+    def decode_frame(self, frame: memoryview) -> Optional[dict[str, Any]]:
+        if not frame:
+            raise ValueError("Empty frame")
+        kind = frame[0]
+
+        if kind == FRAME_RECORD:
+            size, pos = self.read_varint(frame, 1)
+            record = {}
+            for _ in range(size):
+                key, pos = self.read_key(frame, pos)
+                record[key], pos = self.read_value(frame, pos)
+            return record
+        elif kind == FRAME_DEFINE:
+            key_id, pos = self.read_varint(frame, 1)
+            self.keys[key_id], _ = self.read_str(frame, pos)
+            return None
+        elif kind == FRAME_HEADER:
+            if bytes(frame[1:]) != MAGIC:
+                raise ValueError("Invalid stream header")
+            self.reset()
+            return None
+
+        raise ValueError(f"Unknown frame type: {kind:#x}")
+
+
+def _split_frame(buffer: bytearray, start: int):
+    # NOTE: Returns the frame boundaries or 'None' if the buffer does not hold the
+    # whole frame yet.
+    pos, size, shift = start, 0, 0
+    while pos < len(buffer):
+        byte = buffer[pos]
+        pos += 1
+        size |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            end = pos + size
+            return (pos, end) if end <= len(buffer) else None
+        shift += 7
+    return None
+
+
+def iter_records(
+    stream: IO[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[dict[str, Any]]:
+    """
+    Lazily decodes the records written by a 'BinaryFormatter'. Only the current chunk
+    and the frame being decoded are kept in memory. A truncated trailing frame, such as
+    the one left behind by a crash, is silently ignored.
+    """
+    decoder, buffer = _Decoder(), bytearray()
+
+    while chunk := stream.read(chunk_size):
+        buffer += chunk
+
+        start = 0
+        while (bounds := _split_frame(buffer, start)) is not None:
+            frame_start, frame_end = bounds
+            with memoryview(buffer) as view:
+                record = decoder.decode_frame(view[frame_start:frame_end])
+            if record is not None:
+                yield record
+            start = frame_end
+
+        del buffer[:start]
+
+
+def read_records(filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    with open(filename, "rb") as stream:
+        yield from iter_records(stream, chunk_size=chunk_size)
+
+
+def format_timestamp(value: datetime):
+    return value.strftime("%Y-%m-%dT%H:%M:%S") + ".%03dZ" % (value.microsecond // 1000)
+
+
+def to_json_lines(records: Iterator[dict[str, Any]], output: IO[str]):
+    for record in records:
+        if isinstance(timestamp := record.get("timestamp"), datetime):
+            record["timestamp"] = format_timestamp(timestamp)
+        output.write(json.dumps(record, default=str))
+        output.write("\n")
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = ArgumentParser(
+        prog="python -m aiologbuch.readers.binary",
+        description="Converts binary aiologbuch logs to JSON lines.",
+    )
+    parser.add_argument("filename", help="the binary log file, or '-' for stdin")
+    parser.add_argument("-o", "--output", help="the output file. Defaults to stdout")
+    args = parser.parse_args(argv)
+
+    if args.filename == "-":
+        records = iter_records(sys.stdin.buffer)
+    else:
+        records = read_records(args.filename)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            to_json_lines(records, output)
+    else:
+        to_json_lines(records, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
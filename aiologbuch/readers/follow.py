@@ -0,0 +1,190 @@
+import json
+import os
+from io import FileIO
+from typing import Any, AsyncIterator, NamedTuple, Optional
+
+from anyio import sleep
+from anyio.to_thread import run_sync
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_POLL_INTERVAL = 0.25
+
+
+class Checkpoint(NamedTuple):
+    """Where a follower stopped, which a new one can resume from"""
+
+    inode: int
+    offset: int
+
+
+class Line:
+    """
+    A line of a followed file, without its terminator. 'data' is a view into the chunk
+    it was read in, so it's only copied if it's decoded or turned into bytes.
+    """
+
+    __slots__ = ("data", "offset", "inode")
+
+    def __init__(self, data: memoryview, offset: int, inode: int):
+        self.data = data
+        self.offset = offset
+        self.inode = inode
+
+    @property
+    def checkpoint(self):
+        # NOTE: Right after this line, so resuming from it doesn't repeat it
+        return Checkpoint(inode=self.inode, offset=self.offset)
+
+    def json(self) -> Any:
+        return json.loads(self.data.tobytes())
+
+    def __bytes__(self):
+        return self.data.tobytes()
+
+    def __repr__(self):
+        return f"Line({bytes(self)!r}, offset={self.offset})"
+
+
+async def follow(
+    filename: str,
+    checkpoint: Optional[Checkpoint] = None,
+    from_end: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    stop_at_eof: bool = False,
+) -> AsyncIterator[Line]:
+    """
+    Follows a file written by the file handlers, like 'tail -F', yielding its lines as
+    they're written. It starts from the 'checkpoint' of a previous follower, if the
+    file is still the same one, or from the start or the end of the file. Rotated
+    files are followed by their new file, and truncated ones from their start again.
+
+    The file is read in chunks of 'chunk_size' bytes, off the event loop, and the
+    lines are views into them. So memory stays constant, as long as the lines aren't
+    kept around, and only lines longer than a chunk need a bigger one.
+    """
+    reader = _Reader(filename, chunk_size)
+    try:
+        await run_sync(reader.open, checkpoint, from_end)
+
+        while True:
+            chunk = await run_sync(reader.read)
+            if chunk is not None:
+                for line in reader.split(chunk):
+                    yield line
+                continue
+
+            # NOTE: At the end of the file, which is checked for rotations and
+            # truncations before waiting on more data. A rotated file is read until
+            # its end once more, for what was written before it was replaced.
+            if reader.replaced:
+                if (last := await run_sync(reader.reopen)) is not None:
+                    yield last
+                continue
+            if await run_sync(reader.check_replaced):
+                continue
+            if stop_at_eof:
+                return
+            await sleep(poll_interval)
+    finally:
+        reader.close()
+
+
+class _Reader:
+    _file: Optional[FileIO]
+
+    def __init__(self, filename: str, chunk_size: int):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self._file = None
+        self._inode = 0
+        self._position = 0
+        self._partial = b""
+        self.replaced = False
+
+    def open(self, checkpoint: Optional[Checkpoint], from_end: bool):
+        if not self._open():
+            return
+
+        size = os.fstat(self._file.fileno()).st_size
+        if checkpoint is not None and checkpoint.inode == self._inode:
+            if checkpoint.offset <= size:
+                self._seek(checkpoint.offset)
+        elif from_end:
+            self._seek(size)
+
+    def read(self) -> Optional[memoryview]:
+        if self._file is None and not self._open():
+            return None
+
+        # NOTE: A new buffer per chunk, since the lines of the previous one may still
+        # be in use. Only the partial line at its end is copied over.
+        partial = self._partial
+        buffer = bytearray(len(partial) + max(self.chunk_size, len(partial)))
+        buffer[: len(partial)] = partial
+
+        with memoryview(buffer) as view:
+            read = self._file.readinto(view[len(partial) :])
+        if not read:
+            return None
+
+        self._position += read
+        return memoryview(buffer)[: len(partial) + read]
+
+    def split(self, chunk: memoryview):
+        # NOTE: 'bytes.find' on the buffer itself, so there are no copies per line
+        buffer, size = chunk.obj, len(chunk)
+        start = 0
+        offset = self._position - size
+
+        while (end := buffer.find(b"\n", start, size)) >= 0:
+            yield Line(chunk[start:end], offset + end + 1, self._inode)
+            start = end + 1
+
+        self._partial = bytes(chunk[start:])
+
+    def check_replaced(self):
+        if self._file is None:
+            return False
+
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return False  # NOTE: Rotated, but the new file wasn't created yet
+
+        if stat.st_ino != self._inode:
+            self.replaced = True
+        elif stat.st_size < self._position:
+            self._partial = b""
+            self._seek(0)
+            return True
+        return self.replaced
+
+    def reopen(self):
+        """Returns the partial last line of the file that was replaced, if any"""
+        last = None
+        if self._partial:
+            last = Line(memoryview(self._partial), self._position, self._inode)
+
+        self.close()
+        self._partial, self.replaced = b"", False
+        self._open()
+        return last
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        try:
+            self._file = FileIO(self.filename, "rb")
+        except FileNotFoundError:
+            return False
+
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._position = 0
+        return True
+
+    def _seek(self, offset: int):
+        self._position = self._file.seek(offset)
@@ -0,0 +1,197 @@
+import json
+import mmap
+import os
+import sys
+from argparse import ArgumentParser
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import IO, Any, Iterator, Optional, Sequence
+
+from aiologbuch.handlers.file.index import INDEX_ENTRY, INDEX_SUFFIX
+from aiologbuch.shared.levels import check_level
+
+from .binary import format_timestamp
+
+# NOTE: The records of several threads and event loops aren't written in the exact
+# order they were created, so the range is widened by this many seconds before the
+# index is looked up. The records themselves are still filtered by the exact range.
+DEFAULT_SLACK = 1.0
+
+
+def read_index(filename: str) -> list[tuple[float, int]]:
+    """
+    Reads the sidecar index of a log file, as (created, offset) pairs. A truncated
+    trailing entry, such as the one left behind by a crash, is ignored.
+    """
+    try:
+        with open(filename + INDEX_SUFFIX, "rb") as stream:
+            data = stream.read()
+    except FileNotFoundError:
+        return []
+
+    size = len(data) - len(data) % INDEX_ENTRY.size
+    return list(INDEX_ENTRY.iter_unpack(data[:size]))
+
+
+def find_offsets(
+    index: list[tuple[float, int]],
+    size: int,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    slack: float = DEFAULT_SLACK,
+):
+    """Returns the part of the file that holds the records between 'start' and 'end'"""
+    # NOTE: Several processes may write to the same file, each one adding entries of
+    # its own, so they're sorted by offset. Then every entry gets the oldest time from
+    # there on, which bounds the records written after it and keeps them sorted.
+    entries = sorted(index, key=lambda entry: entry[1])
+    times, offsets, oldest = [], [], float("inf")
+    for created, offset in reversed(entries):
+        oldest = min(oldest, created)
+        times.append(oldest)
+        offsets.append(offset)
+    times.reverse()
+    offsets.reverse()
+
+    first, last = 0, size
+    if start is not None and (position := bisect_right(times, start - slack)) > 0:
+        first = offsets[position - 1]
+    if end is not None and (position := bisect_right(times, end + slack)) < len(times):
+        last = offsets[position]
+
+    return first, last
+
+
+def iter_range(
+    filename: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    level: Optional[Any] = None,
+    slack: float = DEFAULT_SLACK,
+) -> Iterator[bytes]:
+    """
+    Lazily yields the lines of a JSON log file whose records are between 'start' and
+    'end', as timestamps, and at or above 'level'. Only the part of the file that the
+    index points to is read, through a memory map.
+    """
+    for line, _ in _iter_matches(filename, start, end, level, slack):
+        yield line
+
+
+def read_range(
+    filename: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    level: Optional[Any] = None,
+    slack: float = DEFAULT_SLACK,
+) -> Iterator[dict[str, Any]]:
+    for _, record in _iter_matches(filename, start, end, level, slack):
+        yield record
+
+
+def _iter_matches(
+    filename: str,
+    start: Optional[float],
+    end: Optional[float],
+    level: Optional[Any],
+    slack: float,
+) -> Iterator[tuple[bytes, dict[str, Any]]]:
+    with open(filename, "rb") as stream:
+        size = os.fstat(stream.fileno()).st_size
+        if not size:
+            return
+
+        first, last = find_offsets(read_index(filename), size, start, end, slack)
+        lower = None if start is None else _to_timestamp(start)
+        upper = None if end is None else _to_timestamp(end)
+        minimum = None if level is None else check_level(level)
+
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = first
+            while position < last:
+                line_end = data.find(b"\n", position, size)
+                line = data[position : size if line_end < 0 else line_end]
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    # NOTE: Only the last line may be partial, since it's still being
+                    # written or was cut short by a crash
+                    if line_end < 0:
+                        return
+                    raise ValueError(
+                        f"Invalid record at offset {position} of {filename!r}"
+                    ) from exc
+
+                if _matches(record, lower, upper, minimum):
+                    yield line, record
+                if line_end < 0:
+                    return
+                position = line_end + 1
+
+
+def _matches(
+    record: dict[str, Any],
+    lower: Optional[str],
+    upper: Optional[str],
+    minimum: Optional[int],
+):
+    # NOTE: The timestamps are ISO 8601 in UTC, so they can be compared as strings
+    timestamp = record.get("timestamp", "")
+    if lower is not None and timestamp < lower:
+        return False
+    if upper is not None and timestamp > upper:
+        return False
+    if minimum is not None:
+        try:
+            return check_level(record.get("level", "")) >= minimum
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+def _to_timestamp(value: float):
+    return format_timestamp(datetime.fromtimestamp(value, tz=timezone.utc))
+
+
+def _parse_time(value: str):
+    try:
+        return float(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.timestamp()
+
+
+def to_lines(lines: Iterator[bytes], output: IO[bytes]):
+    for line in lines:
+        output.write(line)
+        output.write(b"\n")
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = ArgumentParser(
+        prog="python -m aiologbuch.readers.index",
+        description="Prints the records of a JSON log file in a time range.",
+    )
+    parser.add_argument("filename", help="the JSON log file")
+    parser.add_argument(
+        "-s", "--start", type=_parse_time, help="ISO 8601 time or UNIX timestamp"
+    )
+    parser.add_argument(
+        "-e", "--end", type=_parse_time, help="ISO 8601 time or UNIX timestamp"
+    )
+    parser.add_argument("-l", "--level", help="the minimum level, like ERROR")
+    parser.add_argument("-o", "--output", help="the output file. Defaults to stdout")
+    args = parser.parse_args(argv)
+
+    lines = iter_range(args.filename, args.start, args.end, args.level)
+    if args.output:
+        with open(args.output, "wb") as output:
+            to_lines(lines, output)
+    else:
+        to_lines(lines, sys.stdout.buffer)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import json
+import os
+import re
+import sys
+from argparse import ArgumentParser
+from contextlib import ExitStack
+from glob import escape, glob
+from heapq import merge
+from typing import IO, Iterable, Iterator, Optional, Sequence
+
+DEFAULT_BUFFER_SIZE = 256 * 1024
+
+# NOTE: 'app.log.<pid>' and 'app.log.<pid>.<tid>', as the file handlers name them
+_SHARD_SUFFIX = re.compile(r"\.\d+(\.\d+)?")
+_TIMESTAMP_PREFIX = b'{"timestamp": "'
+_TIMESTAMP_SIZE = len("2024-01-01T00:00:00.000Z")
+
+
+def find_shards(filename: str) -> list[str]:
+    """The shard files of a log file, along with the file itself if it exists"""
+    shards = [
+        path
+        for path in glob(escape(filename) + ".*")
+        if _SHARD_SUFFIX.fullmatch(path, len(filename))
+    ]
+    if os.path.isfile(filename):
+        shards.append(filename)
+    return sorted(shards)
+
+
+def iter_merged(
+    filenames: Iterable[str], buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> Iterator[bytes]:
+    """
+    Lazily merges JSON log files into a single stream of lines, ordered by their
+    timestamps. Each file must already be in order, as the shards are, so only one
+    line per file is kept in a heap, and each file is read through a buffer of
+    'buffer_size' bytes. Memory stays constant, however big the files are.
+    """
+    with ExitStack() as stack:
+        files = [
+            stack.enter_context(open(filename, "rb", buffering=buffer_size))
+            for filename in filenames
+        ]
+        yield from (line for _, line in merge(*map(_keyed_lines, files)))
+
+
+def merge_files(
+    filenames: Iterable[str],
+    output: IO[bytes],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+):
+    for line in iter_merged(filenames, buffer_size):
+        output.write(line)
+        output.write(b"\n")
+
+
+def _keyed_lines(file: IO[bytes]):
+    # NOTE: The lines that have no timestamp, such as a truncated last line, keep the
+    # one of the line before them, so they stay where they were in their file
+    key = b""
+    for line in file:
+        line = line.rstrip(b"\r\n")
+        if line:
+            key = _timestamp(line) or key
+            yield key, line
+
+
+def _timestamp(line: bytes) -> Optional[bytes]:
+    # NOTE: The JSON formatter writes the timestamp first, as ISO 8601 in UTC, so it's
+    # sliced off the line and compared as bytes, without decoding the record
+    if line.startswith(_TIMESTAMP_PREFIX):
+        start = len(_TIMESTAMP_PREFIX)
+        return line[start : start + _TIMESTAMP_SIZE]
+
+    try:
+        timestamp = json.loads(line).get("timestamp")
+    except (ValueError, AttributeError):
+        return None
+    return timestamp.encode() if isinstance(timestamp, str) else None
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = ArgumentParser(
+        prog="python -m aiologbuch.readers.merge",
+        description="Merges JSON log files, such as the shards of a file, by time.",
+    )
+    parser.add_argument(
+        "filenames",
+        nargs="+",
+        help="the files to merge. A sharded file is replaced by its shards",
+    )
+    parser.add_argument("-o", "--output", help="the output file. Defaults to stdout")
+    parser.add_argument(
+        "-b", "--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE, help="per file"
+    )
+    args = parser.parse_args(argv)
+
+    filenames: list[str] = []
+    for filename in args.filenames:
+        filenames.extend(find_shards(filename) or [filename])
+
+    if args.output:
+        with open(args.output, "wb") as output:
+            merge_files(filenames, output, args.buffer_size)
+    else:
+        merge_files(filenames, sys.stdout.buffer, args.buffer_size)
+
+
+if __name__ == "__main__":
+    main()
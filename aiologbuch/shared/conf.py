@@ -1,32 +1,97 @@
-from asyncio import Lock
-from os import getenv
+from os import getenv, register_at_fork
 from threading import Lock as ThreadLock
+from typing import TYPE_CHECKING, NamedTuple, Optional, TypedDict, Unpack
 
 from .types import AsyncStreamBackendType
-from .utils import parse_bool
+from .utils import parse_bool, parse_optional_int
+
+if TYPE_CHECKING:
+    from aiologbuch.handlers.pool import FormattingPool
 
 _settings_lock = ThreadLock()
-_configured = False
 
 
-class _Settings:
-    RAISE_EXCEPTIONS = parse_bool(getenv("AIOLOGBUCH_RAISE_EXCEPTIONS", "0"))
+class _Snapshot(NamedTuple):
+    RAISE_EXCEPTIONS: bool = parse_bool(getenv("AIOLOGBUCH_RAISE_EXCEPTIONS", "0"))
+    TRACEBACK_CACHE_SIZE: int = int(getenv("AIOLOGBUCH_TRACEBACK_CACHE_SIZE", "128"))
+    TRACEBACK_MAX_DEPTH: Optional[int] = parse_optional_int(
+        getenv("AIOLOGBUCH_TRACEBACK_MAX_DEPTH", "")
+    )
+    TRACEBACK_MAX_LENGTH: Optional[int] = parse_optional_int(
+        getenv("AIOLOGBUCH_TRACEBACK_MAX_LENGTH", "")
+    )
+    STREAM_BACKEND: AsyncStreamBackendType = "thread"
+    FORMATTING_POOL: Optional["FormattingPool"] = None
+    COMPRESSION_LEVEL: Optional[int] = None
+    COMPRESSION_BLOCK_SIZE: int = 256 * 1024
+    COMPRESSION_FLUSH_INTERVAL: float = 1.0
+    SYNC_PIPELINE: bool = parse_bool(getenv("AIOLOGBUCH_SYNC_PIPELINE", "0"))
+
+
+class _Options(TypedDict, total=False):
+    raise_exceptions: bool
+    formatting_pool: Optional["FormattingPool"]
+    compression_level: Optional[int]
+    compression_block_size: int
+    compression_flush_interval: float
+    sync_pipeline: bool
 
-    GLOBAL_STDERR_LOCK: Lock
+
+class _Settings:
+    RAISE_EXCEPTIONS: bool
+    TRACEBACK_CACHE_SIZE: int
+    TRACEBACK_MAX_DEPTH: Optional[int]
+    TRACEBACK_MAX_LENGTH: Optional[int]
     STREAM_BACKEND: AsyncStreamBackendType
+    FORMATTING_POOL: Optional["FormattingPool"]
+    COMPRESSION_LEVEL: Optional[int]
+    COMPRESSION_BLOCK_SIZE: int
+    COMPRESSION_FLUSH_INTERVAL: float
+    SYNC_PIPELINE: bool
 
-    def configure(self, stream_backend: AsyncStreamBackendType = "thread"):
-        global _configured
+    # NOTE: A thread lock, so that every event loop and thread can share it
+    GLOBAL_STDERR_LOCK: ThreadLock
+    _snapshot: _Snapshot
 
-        with _settings_lock:
-            if _configured:
-                # NOTE: Once called, the settings can not be changed
-                return
+    def __init__(self):
+        self.GLOBAL_STDERR_LOCK = ThreadLock()
+        self._snapshot = _Snapshot()
 
-            self.GLOBAL_STDERR_LOCK = Lock()
-            self.STREAM_BACKEND = stream_backend
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._snapshot, name)
 
-            _configured = True
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def configure(
+        self,
+        stream_backend: Optional[AsyncStreamBackendType] = None,
+        **options: Unpack[_Options],
+    ):
+        # NOTE: The settings are an immutable snapshot, so reconfiguring them only
+        # swaps the reference. Readers never lock, and the resources that were already
+        # created keep the settings they were created with.
+        changes = {name.upper(): value for name, value in options.items()}
+        # NOTE: Still the first positional parameter, like it's always been
+        if stream_backend is not None:
+            changes["STREAM_BACKEND"] = stream_backend
+
+        with _settings_lock:
+            self._snapshot = self._snapshot._replace(**changes)
 
 
 settings = _Settings()
+
+
+def _reinit_locks():
+    # NOTE: Another thread may have held the locks while the process was forked, and
+    # it doesn't exist in the child to release them
+    global _settings_lock
+    _settings_lock = ThreadLock()
+    settings.GLOBAL_STDERR_LOCK = ThreadLock()
+
+
+register_at_fork(after_in_child=_reinit_locks)
@@ -1,4 +1,3 @@
-import logging
 from enum import IntEnum
 from typing import TYPE_CHECKING
 
@@ -6,12 +5,13 @@ if TYPE_CHECKING:
     from aiologbuch.shared.types import LevelType
 
 
+# NOTE: Same values as the ones in the 'logging' module, which isn't imported here
 class LogLevel(IntEnum):
-    DEBUG = logging.DEBUG
-    INFO = logging.INFO
-    WARNING = logging.WARNING
-    ERROR = logging.ERROR
-    CRITICAL = logging.CRITICAL
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+    CRITICAL = 50
 
 
 def check_level(level: "LevelType"):
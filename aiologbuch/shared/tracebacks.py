@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from threading import Lock
+from traceback import StackSummary, format_exception, format_exception_only, walk_tb
+from types import CodeType, TracebackType
+from typing import Optional
+
+from .conf import settings
+
+type _Fingerprint = tuple[type[BaseException], tuple[tuple[CodeType, int], ...]]
+
+_TRACEBACK_HEADER = "Traceback (most recent call last):\n"
+_CAUSE_MESSAGE = (
+    "\nThe above exception was the direct cause of the following exception:\n\n"
+)
+_CONTEXT_MESSAGE = (
+    "\nDuring handling of the above exception, another exception occurred:\n\n"
+)
+_TRUNCATED_MESSAGE = "... (traceback truncated)\n"
+
+
+class TracebackRenderer:
+    _cache: OrderedDict[_Fingerprint, str]
+    _lock: Lock
+
+    def __init__(
+        self,
+        cache_size: int = 128,
+        max_depth: Optional[int] = None,
+        max_length: Optional[int] = None,
+    ):
+        self._cache = OrderedDict()
+        self._lock = Lock()
+        self.cache_size = cache_size
+        self.max_depth = max_depth
+        self.max_length = max_length
+
+    @property
+    def cache(self):
+        return self._cache
+
+    def render(self, exc: BaseException):
+        chain, links = self._walk_chain(exc)
+
+        if any(isinstance(item, BaseExceptionGroup) for item in chain):
+            # NOTE: Exception groups have a nested layout that is not worth
+            # reimplementing here, so they are rendered uncached by the stdlib.
+            text = "".join(format_exception(exc, chain=True))
+        else:
+            parts: list[str] = []
+            for idx in range(len(chain) - 1, -1, -1):
+                parts.append(self._render_single(chain[idx]))
+                if idx > 0:
+                    parts.append(links[idx - 1])
+            text = "".join(parts)
+
+        if self.max_length is not None and len(text) > self.max_length:
+            text = text[: self.max_length].rstrip("\n") + "\n" + _TRUNCATED_MESSAGE
+
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _walk_chain(self, exc: BaseException):
+        # NOTE: Mirrors the order used by 'traceback.format_exception', where 'chain'
+        # goes from the newest exception to the oldest one and 'links[idx]' is the
+        # message that connects 'chain[idx + 1]' to 'chain[idx]'.
+        chain: list[BaseException] = []
+        links: list[str] = []
+        seen: set[int] = set()
+
+        current: Optional[BaseException] = exc
+        while current is not None and id(current) not in seen:
+            seen.add(id(current))
+            chain.append(current)
+
+            if current.__cause__ is not None:
+                current = current.__cause__
+                links.append(_CAUSE_MESSAGE)
+            elif current.__context__ is not None and not current.__suppress_context__:
+                current = current.__context__
+                links.append(_CONTEXT_MESSAGE)
+            else:
+                current = None
+
+        return chain, links
+
+    def _render_single(self, exc: BaseException):
+        summary = "".join(format_exception_only(exc))
+        if exc.__traceback__ is None:
+            return summary
+        return self._render_stack(type(exc), exc.__traceback__) + summary
+
+    def _render_stack(self, exc_type: type[BaseException], tb: TracebackType):
+        frames = list(walk_tb(tb))
+
+        omitted = 0
+        if self.max_depth is not None and len(frames) > self.max_depth:
+            omitted = len(frames) - self.max_depth
+            frames = frames[omitted:] if self.max_depth > 0 else []
+
+        fingerprint = (
+            exc_type,
+            tuple((frame.f_code, line_number) for frame, line_number in frames),
+        )
+
+        with self._lock:
+            if (text := self._cache.get(fingerprint)) is not None:
+                self._cache.move_to_end(fingerprint)
+                return text
+
+        text = _TRACEBACK_HEADER
+        if omitted:
+            text += f"  [... {omitted} earlier frame(s) omitted]\n"
+        text += "".join(StackSummary.extract(iter(frames), lookup_lines=True).format())
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[fingerprint] = text
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return text
+
+
+traceback_renderer = TracebackRenderer(
+    cache_size=settings.TRACEBACK_CACHE_SIZE,
+    max_depth=settings.TRACEBACK_MAX_DEPTH,
+    max_length=settings.TRACEBACK_MAX_LENGTH,
+)
@@ -1,4 +1,5 @@
 from .loggers import AsyncLoggerProtocol, SyncLoggerProtocol, BaseLoggerProtocol  # noqa
+from .loggers import LoggerChanges  # noqa
 from .general import (  # noqa
     LevelType,
     MessageType,
@@ -8,6 +9,9 @@ from .general import (  # noqa
     StreamBackendType,
     SyncStreamBackendType,
     AsyncStreamBackendType,
+    SocketAddress,
+    SocketFraming,
+    ShardType,
 )
 from .filters import FilterProtocol  # noqa
 from .records import LogRecordProtocol  # noqa
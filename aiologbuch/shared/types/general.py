@@ -9,6 +9,15 @@ type SyncMode = Literal["sync"]
 type IOMode = AsyncMode | SyncMode
 
 
-type StreamBackendType = Literal["thread", "aiofile", "sync"]
-type AsyncStreamBackendType = Literal["thread", "aiofile"]
+type StreamBackendType = Literal[
+    "thread", "aiofile", "fd", "gzip", "zlib", "lzma", "sync"
+]
+type AsyncStreamBackendType = Literal["thread", "aiofile", "fd", "gzip", "zlib", "lzma"]
 type SyncStreamBackendType = Literal["sync"]
+
+
+type SocketAddress = tuple[str, int] | str
+type SocketFraming = Literal["newline", "length"]
+
+
+type ShardType = Literal["process", "thread"]
@@ -1,14 +1,29 @@
-from typing import TYPE_CHECKING, Protocol, Self
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Protocol, Self, TypedDict
 
 if TYPE_CHECKING:
+    from aiologbuch.loggers.config import LoggerSpec
+
     from .filters import FilterProtocol
 
 
+class LoggerChanges(TypedDict, total=False):
+    filter_: Optional["FilterProtocol"]
+    handlers: Iterable[Any]
+    propagate: bool
+    sheddable: Optional[bool]
+
+
 class BaseLoggerProtocol(Protocol):
-    def __call__(self, name: str, filter_: "FilterProtocol") -> Self: ...
+    name: str
+    parent: Optional[Self]
+    _spec: "LoggerSpec"
+
+    def __call__(self, name: str, filter_: Optional["FilterProtocol"]) -> Self: ...
 
     def _add_handler[T](self, handler: T) -> None: ...
 
+    def _resolve(self, parent: Optional[Self]) -> None: ...
+
 
 class AsyncLoggerProtocol(BaseLoggerProtocol):
     async def _disable(self) -> None: ...
@@ -1,3 +1,4 @@
+from types import TracebackType
 from typing import TYPE_CHECKING, Optional, Protocol
 
 if TYPE_CHECKING:
@@ -17,5 +18,8 @@ class LogRecordProtocol(Protocol):
     pathname: str
     funcName: str
     lineno: int
+    exc_info: Optional[
+        tuple[type[BaseException], BaseException, Optional[TracebackType]]
+    ]
     exc_text: Optional[str]
     msg: "MessageType"
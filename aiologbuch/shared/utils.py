@@ -1,58 +1,59 @@
-from asyncio import Lock, get_running_loop
-from contextlib import contextmanager
-from functools import partial, wraps
-from typing import Awaitable, Callable
+from threading import Thread
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
-from anyio.from_thread import start_blocking_portal
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop, Future
 
-from .exceptions import WouldDeadlock
 
+def parse_bool(value: str):
+    val = value.lower().strip()
+    if val.isdigit():
+        return bool(int(val))
+    return val == "true"
 
-def _thread_has_event_loop():
-    try:
-        get_running_loop()
-        return True
-    except RuntimeError:
-        return False
 
+def parse_optional_int(value: str):
+    val = value.strip()
+    if not val:
+        return None
+    return int(val)
 
-@contextmanager
-def sync_lock_context(lock: Lock):
-    # NOTE: This if check is to prevent the deadlock that would happen in high
-    # concurrent scenarios with many coroutines acquiring and releasing the lock
-    # alongside sync logger calls, should the user mix sync logging with async logging.
-    if _thread_has_event_loop() and lock.locked():
-        raise WouldDeadlock()
 
-    # TODO: Check the following case:
-    # No event loop and lock is locked. Use a generator to yield control but with the
-    # lock being held by it. The other case would be multi threading environment, but
-    # that'd be safe because the GIL would be released by the waiting thread, leaving
-    # room for the thread that is holding the lock to release it.
-    if (not _thread_has_event_loop()) and (lock.locked()):
-        ...
+def in_daemon_thread(loop: "AbstractEventLoop", function: Callable[[], Any]):
+    """
+    Runs a blocking 'function' in a daemon thread, and resolves the returned future on
+    'loop'. Unlike the worker threads of anyio, a thread that is given up on, such as
+    a close that missed the shutdown deadline, doesn't keep the process from exiting.
+    """
+    future: "Future[Any]" = loop.create_future()
 
-    with start_blocking_portal() as portal:
-        portal.call(lock.acquire)
+    def run():
+        try:
+            function()
+        except BaseException as exc:
+            _resolve(loop, future, exc)
+        else:
+            _resolve(loop, future, None)
 
     try:
-        yield
-    finally:
-        lock.release()
-
-
-def syncify[R, **Spec](function: Callable[Spec, Awaitable[R]]):
-    @wraps(function)
-    def _actual_decorator(*args: Spec.args, **kwargs: Spec.kwargs) -> R:
-        func = partial(function, *args, **kwargs)
-        with start_blocking_portal() as portal:
-            return portal.call(func)
+        Thread(target=run, name="aiologbuch-shutdown", daemon=True).start()
+    except RuntimeError:
+        run()  # NOTE: No thread can be started while the interpreter is exiting
+    return future
 
-    return _actual_decorator
 
+def _resolve(
+    loop: "AbstractEventLoop", future: "Future[Any]", exc: Optional[BaseException]
+):
+    def set_result():
+        if future.done():
+            return
+        if exc is None:
+            future.set_result(None)
+        else:
+            future.set_exception(exc)
 
-def parse_bool(value: str):
-    val = value.lower().strip()
-    if val.isdigit():
-        return bool(int(val))
-    return val == "true"
+    try:
+        loop.call_soon_threadsafe(set_result)
+    except RuntimeError:
+        pass  # NOTE: The loop was closed, after the deadline was missed
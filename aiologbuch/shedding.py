@@ -0,0 +1,242 @@
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, Iterable, NamedTuple, Optional, Union
+
+from .shared.filters import Filter
+from .shared.levels import LogLevel, check_level
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop
+
+    from .loggers.listener import SyncListener
+    from .managers import AsyncManager, SyncManager
+    from .shared.types import LevelType
+
+DEFAULT_INTERVAL = 0.5
+MARKER_LOGGER_NAME = "aiologbuch.shedding"
+MARKER_LEVEL = LogLevel.WARNING
+
+
+class Signal(NamedTuple):
+    """
+    Something of the pipeline that's watched for pressure. 'pressure' returns how close
+    it is to its limit, where 1.0 means that it reached it.
+    """
+
+    name: str
+    pressure: Callable[[], float]
+
+
+def queue_depth(name: str, size: Callable[[], int], limit: int):
+    return Signal(name=name, pressure=lambda: size() / limit)
+
+
+def listener_backlog(listener: "SyncListener", limit: int = 10_000):
+    """The records enqueued for the thread of the sync pipeline"""
+    return queue_depth("listener_backlog", lambda: listener.backlog, limit)
+
+
+def handler_backlog(handler: Any, limit: int = 1000):
+    """The records of an async handler that wait on its formatting pool"""
+    return queue_depth("handler_backlog", lambda: handler.backlog, limit)
+
+
+def dropped_records(*handlers: Any, limit: int = 1):
+    """The records dropped by socket and syslog handlers since the last check"""
+    last = sum(handler.dropped for handler in handlers)
+
+    def pressure():
+        nonlocal last
+        dropped = sum(handler.dropped for handler in handlers)
+        delta, last = dropped - last, dropped
+        return delta / limit
+
+    return Signal(name="dropped_records", pressure=pressure)
+
+
+def write_latency(filename: str, limit: float = 0.05):
+    """The moving average of the seconds that the writer of a file takes per write"""
+    from .handlers.file.manager import resource_manager
+
+    def pressure():
+        if (resource := resource_manager.resources.get(filename)) is None:
+            return 0.0
+        return resource.writer.latency / limit
+
+    return Signal(name="write_latency", pressure=pressure)
+
+
+class LoadShedder:
+    """
+    Watches the signals of the pipeline and, while any of them is under pressure,
+    raises the level of the sheddable loggers to 'level'. It starts shedding once the
+    pressure reaches 'high', and only stops once it's back below 'low', so it doesn't
+    flap around a single threshold. Every transition is logged as a marker record.
+
+    The levels are only changed on the loggers' cached snapshots, like any other
+    reconfiguration, so the logging calls don't check anything more.
+    """
+
+    _thread: Optional[Thread]
+
+    def __init__(
+        self,
+        manager: Union["AsyncManager", "SyncManager"],
+        signals: Iterable[Signal],
+        level: "LevelType" = LogLevel.WARNING,
+        high: float = 1.0,
+        low: float = 0.5,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        if low > high:
+            raise ValueError("The low threshold must not exceed the high one")
+
+        self.manager = manager
+        self.signals = tuple(signals)
+        self.level = check_level(level=level)
+        self.high = high
+        self.low = low
+        self.interval = interval
+        self._since: Optional[float] = None
+        self._lock = Lock()
+        self._thread = None
+        self._stopped = Event()
+        self._tasks: set[Any] = set()
+        self._loop: Optional["AbstractEventLoop"] = None
+        self._pending: list[dict[str, Any]] = []
+
+        # NOTE: The markers must get through while the load is shed, and whatever the
+        # level of the root logger is, unless the marker logger was given one
+        marker_logger = self.manager.loggers.get(MARKER_LOGGER_NAME)
+        if marker_logger is None or marker_logger.level is None:
+            self.manager.configure_logger(
+                MARKER_LOGGER_NAME, sheddable=False, filter_=Filter(level=MARKER_LEVEL)
+            )
+        else:
+            self.manager.configure_logger(MARKER_LOGGER_NAME, sheddable=False)
+        self._logger = self.manager.loggers[MARKER_LOGGER_NAME]
+
+    @property
+    def shedding(self):
+        return self._since is not None
+
+    def evaluate(self) -> Optional[dict[str, Any]]:
+        """Checks the signals once, and returns the marker of the transition, if any"""
+        pressures = {signal.name: signal.pressure() for signal in self.signals}
+        pressure = max(pressures.values(), default=0.0)
+
+        with self._lock:
+            if not self.shedding and pressure >= self.high:
+                self._since = monotonic()
+                self.manager.shed(self.level)
+                return {
+                    "event": "load_shedding_started",
+                    "level": LogLevel(self.level).name,
+                    "pressure": round(pressure, 3),
+                    "signals": _rounded(pressures),
+                }
+            if self.shedding and pressure < self.low:
+                return self._restore(pressure, pressures)
+        return None
+
+    def check(self):
+        if (marker := self.evaluate()) is not None:
+            self._log_now(marker)
+
+    async def acheck(self):
+        from asyncio import get_running_loop
+
+        self._loop = get_running_loop()
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for marker in pending:
+            await self._logger.warning(marker)
+
+        if (marker := self.evaluate()) is not None:
+            await self._logger.warning(marker)
+
+    def start(self):
+        """Checks the signals every 'interval' seconds in a thread, for sync loggers"""
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = Thread(
+                target=self._watch, name="aiologbuch-shedder", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stops the thread, if any, and restores the levels of the loggers"""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopped.set()
+            thread.join()
+
+        with self._lock:
+            marker = self._restore(0.0, {}) if self.shedding else None
+
+        if marker is not None:
+            self._log_now(marker)
+
+    async def run(self):
+        """Checks the signals every 'interval' seconds, for async loggers"""
+        from anyio import CancelScope, sleep
+
+        try:
+            while True:
+                await self.acheck()
+                await sleep(self.interval)
+        finally:
+            with self._lock:
+                marker = self._restore(0.0, {}) if self.shedding else None
+
+            # NOTE: The task is usually stopped by cancelling it, which mustn't also
+            # cancel the marker
+            if marker is not None:
+                with CancelScope(shield=True):
+                    await self._logger.warning(marker)
+
+    def _log_now(self, marker: dict[str, Any]):
+        if not _is_async(self._logger):
+            return self._logger.warning(marker)
+
+        # NOTE: The async handlers are bound to the loops they run on, so from sync
+        # code the marker is logged by a task of the running loop, or of the loop that
+        # checks the signals. Without either, it waits until 'acheck' runs again.
+        from asyncio import get_running_loop, run_coroutine_threadsafe
+
+        try:
+            loop = get_running_loop()
+        except RuntimeError:
+            if (loop := self._loop) is not None and loop.is_running():
+                run_coroutine_threadsafe(self._logger.warning(marker), loop)
+            else:
+                with self._lock:
+                    self._pending.append(marker)
+        else:
+            task = loop.create_task(self._logger.warning(marker))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def _restore(self, pressure: float, pressures: dict[str, float]):
+        duration, self._since = monotonic() - self._since, None
+        self.manager.shed(None)
+        return {
+            "event": "load_shedding_stopped",
+            "pressure": round(pressure, 3),
+            "signals": _rounded(pressures),
+            "duration": round(duration, 3),
+        }
+
+
+def _rounded(pressures: dict[str, float]):
+    return {name: round(value, 3) for name, value in pressures.items()}
+
+
+def _is_async(logger: Any):
+    from .loggers import AsyncLogger
+
+    return isinstance(logger, AsyncLogger)
@@ -0,0 +1,105 @@
+"""
+Throughput and latency of the file handlers under each durability policy.
+
+    python -m benchmarks.durability [--records 2000] [--workers 8] [--dir /tmp]
+
+Every policy is run twice: by sync loggers in several threads, and by an async logger
+with as many concurrent tasks. The latency is the time each logging call took.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from threading import Thread
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import AsyncFileHandler, Durability, SyncFileHandler
+from aiologbuch.loggers import AsyncLogger, SyncLogger
+
+POLICIES = {
+    "none": Durability.none(),
+    "every 10ms": Durability.every_ms(10),
+    "every 64KiB": Durability.every_bytes(64 * 1024),
+    "ERROR and above": Durability.on_level("ERROR"),
+}
+
+
+def _run_sync(filename: str, durability: Durability, records: int, workers: int):
+    handler = SyncFileHandler(
+        filename=filename, formatter=JsonFormatter(), durability=durability
+    )
+    logger = SyncLogger(name="benchmark")
+    logger._add_handler(handler)
+    latencies: list[float] = []
+
+    def work():
+        for index in range(records // workers):
+            start = time.perf_counter()
+            logger.error(f"record {index}")
+            latencies.append(time.perf_counter() - start)
+
+    threads = [Thread(target=work) for _ in range(workers)]
+    start = time.perf_counter()
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+    handler.close()
+    return time.perf_counter() - start, latencies
+
+
+def _run_async(filename: str, durability: Durability, records: int, workers: int):
+    handler = AsyncFileHandler(
+        filename=filename, formatter=JsonFormatter(), durability=durability
+    )
+    logger = AsyncLogger(name="benchmark")
+    logger._add_handler(handler)
+    latencies: list[float] = []
+
+    async def work():
+        for index in range(records // workers):
+            start = time.perf_counter()
+            await logger.error(f"record {index}")
+            latencies.append(time.perf_counter() - start)
+
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(*(work() for _ in range(workers)))
+        await handler.close()
+        return time.perf_counter() - start
+
+    return asyncio.run(main()), latencies
+
+
+def _report(name: str, mode: str, elapsed: float, latencies: list[float]):
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e6
+    print(
+        f"{name:<16} {mode:<6} {len(latencies) / elapsed:>12,.0f} "
+        f"{p50:>10,.0f} {p99:>10,.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dir", default=None, help="Directory of the log files")
+    args = parser.parse_args()
+
+    print(f"{'policy':<16} {'mode':<6} {'records/s':>12} {'p50 (us)':>10} ", end="")
+    print(f"{'p99 (us)':>10}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for index, (name, durability) in enumerate(POLICIES.items()):
+            for mode, run in (("sync", _run_sync), ("async", _run_async)):
+                filename = os.path.join(directory, f"{mode}-{index}.log")
+                elapsed, latencies = run(
+                    filename, durability, args.records, args.workers
+                )
+                _report(name, mode, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import json
+from io import BytesIO, StringIO
+
+from pytest import mark, raises
+
+from aiologbuch.formatters import BinaryFormatter, JsonFormatter
+from aiologbuch.loggers import SyncLogger
+from aiologbuch.readers.binary import iter_records, main, to_json_lines
+from aiologbuch.shared.filters import Filter
+
+
+def _record(msg, exc_info=None):
+    logger = SyncLogger("test", Filter(level=0))
+    return logger._make_record(
+        name="test",
+        level=20,
+        msg=msg,
+        filename=__file__,
+        function_name="test",
+        line_number=7,
+        exc_info=exc_info,
+    )
+
+
+MESSAGES = [
+    "plain text",
+    {"user": {"id": -42, "tags": ["a", "b"], "active": True}, "ratio": 0.5},
+    {"user": {"id": 2**70, "tags": [], "active": False}, "note": None},
+]
+
+
+@mark.unit
+def test_binary_records_should_round_trip_to_json_lines():
+    formatter = BinaryFormatter()
+    stream = BytesIO(b"".join(formatter.format(_record(msg)) for msg in MESSAGES))
+
+    output = StringIO()
+    to_json_lines(iter_records(stream, chunk_size=7), output)
+
+    decoded = [json.loads(line) for line in output.getvalue().splitlines()]
+    expected = [json.loads(JsonFormatter().format(_record(msg))) for msg in MESSAGES]
+
+    assert [item["message"] for item in decoded] == MESSAGES
+    assert [item.keys() for item in decoded] == [item.keys() for item in expected]
+    assert decoded[0]["line_number"] == 7
+
+
+@mark.unit
+def test_binary_formatter_should_intern_keys_once_per_stream():
+    formatter = BinaryFormatter()
+
+    first = formatter.format(_record({"payload": 1}))
+    second = formatter.format(_record({"payload": 2}))
+
+    assert first.count(b"payload") == 1
+    assert b"payload" not in second
+    assert len(second) < len(JsonFormatter().format(_record({"payload": 2}))) / 2
+
+
+class _Unprintable:
+    def __str__(self):
+        raise RuntimeError("unprintable")
+
+
+@mark.unit
+def test_binary_formatter_should_only_intern_the_keys_of_encoded_records():
+    formatter = BinaryFormatter()
+    with raises(RuntimeError):
+        formatter.format(_record({"payload": 1, "broken": _Unprintable()}))
+
+    data = formatter.format(_record({"payload": 2}))
+    records = list(iter_records(BytesIO(data)))
+    assert [record["message"] for record in records] == [{"payload": 2}]
+
+
+@mark.unit
+def test_binary_reader_should_handle_restarted_writers_and_truncation():
+    data = BinaryFormatter().format(_record({"a": 1}))
+    data += BinaryFormatter().format(_record({"b": 2}))
+    partial = BinaryFormatter().format(_record({"c": 3}))
+
+    records = list(iter_records(BytesIO(data + partial[:-3])))
+
+    assert [record["message"] for record in records] == [{"a": 1}, {"b": 2}]
+
+
+@mark.unit
+def test_binary_reader_should_reject_empty_frames():
+    with raises(ValueError, match="Empty frame"):
+        list(iter_records(BytesIO(b"\x00")))
+
+
+@mark.unit
+def test_binary_cli_should_convert_files(tmp_path):
+    source, target = tmp_path / "app.bin", tmp_path / "app.jsonl"
+    source.write_bytes(BinaryFormatter().format(_record("hello")))
+
+    main([str(source), "-o", str(target)])
+
+    assert json.loads(target.read_text())["message"] == "hello"
@@ -0,0 +1,56 @@
+import gzip
+import lzma
+import zlib
+from asyncio import sleep
+
+from pytest import mark
+
+from aiologbuch.handlers.file.backends import get_stream_backend
+
+LINES = [f'{{"message": "debug trace {idx}"}}\n'.encode() for idx in range(200)]
+
+
+def _decompress_zlib(data: bytes):
+    output = b""
+    while data:
+        decompressor = zlib.decompressobj()
+        output += decompressor.decompress(data)
+        data = decompressor.unused_data
+    return output
+
+
+DECOMPRESSORS = {
+    "gzip": gzip.decompress,
+    "lzma": lzma.decompress,
+    "zlib": _decompress_zlib,
+}
+
+
+@mark.unit
+@mark.parametrize("name", ["gzip", "zlib", "lzma"])
+async def test_compressed_backends_should_write_readable_blocks(tmp_path, name):
+    filename = tmp_path / f"app.log.{name}"
+    backend = get_stream_backend(name)(filename=str(filename), block_size=1024)
+
+    await backend.open()
+    for line in LINES:
+        await backend.send(line)
+    await backend.close()
+
+    data = filename.read_bytes()
+    assert DECOMPRESSORS[name](data) == b"".join(LINES)
+    assert len(data) < len(b"".join(LINES))
+
+
+@mark.unit
+async def test_compressed_backend_should_flush_on_interval_without_closing(tmp_path):
+    filename = tmp_path / "app.log.gz"
+    backend = get_stream_backend("gzip")(filename=str(filename), flush_interval=0.01)
+
+    await backend.open()
+    await backend.send(LINES[0])
+    await sleep(0.2)
+
+    # NOTE: Simulates a crash, since the stream is read before it was closed
+    assert gzip.decompress(filename.read_bytes()) == LINES[0]
+    await backend.close()
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import time
+from threading import Lock, Thread
+
+from pytest import fixture, mark, raises
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import AsyncFileHandler, Durability, SyncFileHandler
+from aiologbuch.loggers import AsyncLogger, SyncLogger
+from aiologbuch.shared.conf import settings
+
+
+class _FsyncRecorder:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = 0
+        self.sizes: list[int] = []
+        self._lock = Lock()
+
+    def __call__(self, fd: int):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls += 1
+            self.sizes.append(os.fstat(fd).st_size)
+
+
+@fixture
+def fsync(monkeypatch):
+    recorder = _FsyncRecorder()
+    monkeypatch.setattr(os, "fsync", recorder)
+    return recorder
+
+
+def _sync_logger(filename: str, durability: Durability):
+    handler = SyncFileHandler(
+        filename=filename, formatter=JsonFormatter(), durability=durability
+    )
+    logger = SyncLogger(name="durable")
+    logger._add_handler(handler)
+    return logger, handler
+
+
+def _wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+@mark.unit
+def test_records_at_the_policys_level_should_be_synced_before_returning(
+    tmp_path, fsync
+):
+    filename = str(tmp_path / "audit.log")
+    logger, handler = _sync_logger(filename, Durability.on_level("ERROR"))
+
+    logger.info("not durable")
+    assert fsync.calls == 0
+
+    logger.error("durable")
+    assert fsync.calls == 1
+    assert fsync.sizes == [os.path.getsize(filename)]
+
+    handler.close()
+
+
+@mark.unit
+def test_concurrent_durable_writers_should_share_the_fsyncs(tmp_path, fsync):
+    fsync.delay = 0.02
+    filename = str(tmp_path / "audit.log")
+    logger, handler = _sync_logger(filename, Durability.on_level("ERROR"))
+
+    def log():
+        for index in range(10):
+            logger.error(f"record {index}")
+
+    threads = [Thread(target=log) for _ in range(8)]
+    [thread.start() for thread in threads]
+    [thread.join(10) for thread in threads]
+    handler.close()
+
+    with open(filename) as file:
+        assert len(file.readlines()) == 80
+    assert fsync.calls < 80
+
+
+@mark.unit
+def test_async_durable_records_should_be_synced_together(tmp_path, fsync):
+    filename = str(tmp_path / "audit.log")
+    handler = AsyncFileHandler(
+        filename=filename,
+        formatter=JsonFormatter(),
+        durability=Durability.on_level("ERROR"),
+    )
+    logger = AsyncLogger(name="durable")
+    logger._add_handler(handler)
+
+    async def main():
+        await asyncio.gather(*(logger.error(f"record {idx}") for idx in range(50)))
+        synced = fsync.calls
+        await handler.close()
+        return synced
+
+    assert asyncio.run(main()) == 1
+    with open(filename) as file:
+        assert len(file.readlines()) == 50
+
+
+@mark.unit
+def test_byte_and_interval_policies_should_sync_in_the_background(tmp_path, fsync):
+    filename = str(tmp_path / "bytes.log")
+    logger, handler = _sync_logger(filename, Durability.every_bytes(1024))
+
+    logger.info("small")
+    time.sleep(0.05)
+    assert fsync.calls == 0
+
+    logger.info("x" * 1024)
+    assert _wait_for(lambda: fsync.calls == 1)
+    handler.close()
+
+    filename = str(tmp_path / "interval.log")
+    logger, handler = _sync_logger(filename, Durability.every_ms(20))
+
+    logger.info("first")
+    assert _wait_for(lambda: fsync.calls == 2)
+    time.sleep(0.05)
+    assert fsync.calls == 2
+    handler.close()
+
+
+@mark.unit
+def test_durability_should_require_the_thread_backend(tmp_path):
+    previous = settings.STREAM_BACKEND
+    settings.configure(stream_backend="fd")
+
+    try:
+        with raises(ValueError):
+            AsyncFileHandler(
+                filename=str(tmp_path / "audit.log"),
+                formatter=JsonFormatter(),
+                durability=Durability.every_ms(10),
+            )
+    finally:
+        settings.configure(stream_backend=previous)
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from threading import Thread
+
+import uvloop
+from pytest import mark
+
+from aiologbuch.handlers.file.backends import get_stream_backend
+
+LOOP_FACTORIES = [asyncio.new_event_loop, uvloop.new_event_loop]
+
+# NOTE: Bigger than the default pipe buffer, so the writer has to wait on the loop
+MESSAGES = [f"{idx:06d}".encode() * 100 + b"\n" for idx in range(1000)]
+
+
+def _run(loop_factory, coro):
+    loop = loop_factory()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def _read_all(fd: int, chunks: list[bytes]):
+    while chunk := os.read(fd, 65536):
+        chunks.append(chunk)
+
+
+@mark.unit
+@mark.parametrize("loop_factory", LOOP_FACTORIES, ids=["asyncio", "uvloop"])
+def test_fd_backend_should_wait_on_full_pipes_without_losing_data(loop_factory):
+    reader, writer = os.pipe()
+    backend = get_stream_backend("fd").from_fd(writer)
+    os.close(writer)
+
+    async def main():
+        await backend.open()
+        sends = [asyncio.ensure_future(backend.send(msg)) for msg in MESSAGES]
+        await asyncio.sleep(0.05)
+
+        # NOTE: The pipe is full, so the remaining data waits on the loop until the
+        # reader starts
+        assert backend._buffer
+        chunks: list[bytes] = []
+        thread = Thread(target=_read_all, args=(reader, chunks))
+        thread.start()
+
+        await asyncio.gather(*sends)
+        await backend.close()
+        await asyncio.to_thread(thread.join)
+        return b"".join(chunks)
+
+    assert _run(loop_factory, main()) == b"".join(MESSAGES)
+    os.close(reader)
+
+
+@mark.unit
+@mark.parametrize("loop_factory", LOOP_FACTORIES, ids=["asyncio", "uvloop"])
+def test_fd_backend_should_write_to_fifos(tmp_path, loop_factory):
+    filename = str(tmp_path / "sidecar.fifo")
+    os.mkfifo(filename)
+    chunks: list[bytes] = []
+
+    def read_fifo():
+        fd = os.open(filename, os.O_RDONLY)
+        try:
+            _read_all(fd, chunks)
+        finally:
+            os.close(fd)
+
+    thread = Thread(target=read_fifo)
+    thread.start()
+
+    async def main():
+        backend = get_stream_backend("fd")(filename=filename)
+        await backend.open()
+        for msg in MESSAGES:
+            await backend.send(msg)
+        await backend.close()
+
+    _run(loop_factory, main())
+    thread.join(5)
+
+    assert b"".join(chunks) == b"".join(MESSAGES)
+
+
+@mark.unit
+@mark.parametrize("loop_factory", LOOP_FACTORIES, ids=["asyncio", "uvloop"])
+def test_fd_backend_should_finish_short_writes_to_regular_files(
+    tmp_path, loop_factory, monkeypatch
+):
+    fd = os.open(tmp_path / "app.log", os.O_WRONLY | os.O_CREAT)
+    backend = get_stream_backend("fd").from_fd(fd)
+    os.close(fd)
+    write, calls = os.write, []
+
+    # NOTE: Like a disk that is almost full, which only takes part of the first write
+    def short_write(fd, data):
+        calls.append(len(data))
+        return write(fd, bytes(data)[: len(data) // 2] if len(calls) == 1 else data)
+
+    async def main():
+        monkeypatch.setattr(os, "write", short_write)
+        await asyncio.wait_for(backend.send(b"first record\n"), 1)
+        await asyncio.wait_for(backend.send(b"second record\n"), 1)
+        monkeypatch.undo()
+        await backend.close()
+
+    _run(loop_factory, main())
+
+    assert (tmp_path / "app.log").read_bytes() == b"first record\nsecond record\n"
+
+
+@mark.unit
+def test_stderr_handlers_should_not_overwrite_a_redirected_stderr(tmp_path):
+    script = """
+        import asyncio, sys
+        from aiologbuch.formatters import JsonFormatter
+        from aiologbuch.handlers import AsyncStderrHandler, SyncStderrHandler
+        from aiologbuch.loggers import AsyncLogger, SyncLogger
+
+        async def main():
+            logger = AsyncLogger("async")
+            logger._add_handler(AsyncStderrHandler(formatter=JsonFormatter()))
+            await logger.info("async record")
+            sys.stderr.write("plain stderr write\\n")
+            sys.stderr.flush()
+            await logger.info("async record")
+
+        asyncio.run(main())
+        logger = SyncLogger("sync")
+        logger._add_handler(SyncStderrHandler(formatter=JsonFormatter()))
+        logger.info("sync record")
+        sys.stderr.write("plain stderr write\\n")
+        sys.stderr.flush()
+        logger.info("sync record")
+        """
+
+    # NOTE: Opened without O_APPEND, like 'python app.py 2> app.log'
+    with open(tmp_path / "app.log", "wb") as stderr:
+        subprocess.run(
+            [sys.executable, "-c", textwrap.dedent(script)], stderr=stderr, check=True
+        )
+
+    lines = (tmp_path / "app.log").read_text().splitlines()
+    plain = "plain stderr write"
+    assert [
+        line if line == plain else json.loads(line)["message"] for line in lines
+    ] == [
+        "async record",
+        plain,
+        "async record",
+        "sync record",
+        plain,
+        "sync record",
+    ]
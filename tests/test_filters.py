@@ -1,5 +1,3 @@
-from unittest.mock import MagicMock
-
 from pytest import mark
 
 from aiologbuch.filters import Filter
@@ -19,7 +17,6 @@ from aiologbuch.shared.levels import LogLevel
 )
 def test_filter(filter_level: int, record_level: int, expected: bool):
     _filter = Filter(level=filter_level)
-    record = MagicMock(levelno=record_level)
 
     assert _filter.level == filter_level
-    assert _filter.filter(record) == expected
+    assert _filter.filter(level=record_level) == expected
@@ -0,0 +1,114 @@
+import asyncio
+import os
+
+from pytest import mark
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import SyncFileHandler
+from aiologbuch.loggers import SyncLogger
+from aiologbuch.readers.follow import Checkpoint, follow
+
+
+async def _collect(filename: str, **options):
+    return [line async for line in follow(filename, stop_at_eof=True, **options)]
+
+
+async def _next_lines(lines, count: int):
+    return [bytes(await asyncio.wait_for(anext(lines), 5)) for _ in range(count)]
+
+
+@mark.unit
+async def test_follow_should_split_the_chunks_into_views(tmp_path):
+    filename = tmp_path / "app.log"
+    contents = [b"short", b"x" * 100, b"", b"last"]
+    filename.write_bytes(b"\n".join(contents) + b"\npartial")
+
+    lines = await _collect(str(filename), chunk_size=16)
+
+    assert [bytes(line) for line in lines] == contents
+    assert [line.offset for line in lines] == [6, 107, 108, 113]
+    assert all(isinstance(line.data, memoryview) for line in lines)
+
+
+@mark.unit
+async def test_lines_of_a_chunk_should_share_its_buffer(tmp_path):
+    filename = tmp_path / "app.log"
+    filename.write_bytes(b"a\nb\nc\n")
+
+    first, second, third = await _collect(str(filename))
+
+    assert first.data.obj is second.data.obj is third.data.obj
+
+
+@mark.unit
+async def test_follow_should_resume_from_checkpoints(tmp_path):
+    filename = tmp_path / "app.log"
+    filename.write_bytes(b"".join(f"line {idx}\n".encode() for idx in range(10)))
+
+    async for line in follow(str(filename), stop_at_eof=True):
+        if bytes(line) == b"line 3":
+            checkpoint = line.checkpoint
+            break
+
+    resumed = await _collect(str(filename), checkpoint=checkpoint)
+    assert [bytes(line) for line in resumed] == [
+        f"line {idx}".encode() for idx in range(4, 10)
+    ]
+
+    # NOTE: The checkpoint of another file isn't used
+    other = await _collect(str(filename), checkpoint=Checkpoint(inode=0, offset=21))
+    assert len(other) == 10
+
+
+@mark.unit
+async def test_follow_should_handle_appends_rotations_and_truncations(tmp_path):
+    filename = tmp_path / "app.log"
+    filename.write_bytes(b"first\n")
+    lines = follow(str(filename), poll_interval=0.01).__aiter__()
+
+    try:
+        assert await _next_lines(lines, 1) == [b"first"]
+
+        with open(filename, "ab") as file:
+            file.write(b"second\nthi")
+            file.flush()
+            await asyncio.sleep(0.05)
+            file.write(b"rd\n")
+        assert await _next_lines(lines, 2) == [b"second", b"third"]
+
+        # NOTE: What's written to the rotated file before the new one is created is
+        # still read
+        os.rename(filename, tmp_path / "app.log.1")
+        with open(tmp_path / "app.log.1", "ab") as file:
+            file.write(b"late\n")
+        filename.write_bytes(b"rotated\n")
+        assert await _next_lines(lines, 2) == [b"late", b"rotated"]
+
+        # NOTE: The follower has to be polling to notice the truncation, before the
+        # file grows past its position again
+        with open(filename, "r+b") as file:
+            file.truncate(0)
+        truncated = asyncio.ensure_future(_next_lines(lines, 1))
+        await asyncio.sleep(0.05)
+        filename.write_bytes(b"truncated\n")
+        assert await truncated == [b"truncated"]
+    finally:
+        await lines.aclose()
+
+
+@mark.unit
+async def test_lines_should_be_decoded_lazily(tmp_path):
+    filename = str(tmp_path / "app.log")
+    handler = SyncFileHandler(filename=filename, formatter=JsonFormatter())
+    logger = SyncLogger(name="follow")
+    logger._add_handler(handler)
+
+    logger.info("hello")
+    logger.error("world")
+    handler.close()
+
+    records = [line.json() for line in await _collect(filename)]
+    assert [(record["level"], record["message"]) for record in records] == [
+        ("INFO", "hello"),
+        ("ERROR", "world"),
+    ]
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import os
+import signal
+import time
+from io import BytesIO
+from threading import Event, Thread
+
+from pytest import mark
+
+from aiologbuch.formatters import BinaryFormatter, JsonFormatter
+from aiologbuch.handlers import AsyncFileHandler, FormattingPool, SyncFileHandler
+from aiologbuch.handlers.file.manager import resource_manager
+from aiologbuch.loggers import AsyncLogger, SyncLogger
+from aiologbuch.readers.binary import iter_records
+from aiologbuch.shared.conf import settings
+from aiologbuch.shared.filters import Filter
+
+pytestmark = mark.filterwarnings(
+    "ignore:This process .* is multi-threaded:DeprecationWarning"
+)
+
+
+def _fork(child):
+    if (pid := os.fork()) == 0:
+        code = 1
+        try:
+            child()
+            code = 0
+        finally:
+            os._exit(code)
+
+    # NOTE: A child that deadlocks is killed, rather than hanging the tests
+    deadline = time.monotonic() + 10
+    while (waited := os.waitpid(pid, os.WNOHANG))[0] == 0:
+        if time.monotonic() > deadline:
+            os.kill(pid, signal.SIGKILL)
+            waited = os.waitpid(pid, 0)
+            break
+        time.sleep(0.01)
+
+    return os.waitstatus_to_exitcode(waited[1])
+
+
+def _read_messages(filename: str):
+    with open(filename) as file:
+        return [json.loads(line)["message"] for line in file]
+
+
+@mark.unit
+@mark.parametrize("backend", ["thread", "fd"])
+def test_children_should_log_to_the_parents_files_while_it_is_logging(
+    tmp_path, backend
+):
+    filename = str(tmp_path / "workers.log")
+    previous = settings.STREAM_BACKEND
+    settings.configure(stream_backend=backend)
+
+    try:
+        async_handler = AsyncFileHandler(filename=filename, formatter=JsonFormatter())
+        sync_handler = SyncFileHandler(filename=filename, formatter=JsonFormatter())
+        async_logger = AsyncLogger(name="async")
+        async_logger._add_handler(async_handler)
+        sync_logger = SyncLogger(name="sync")
+        sync_logger._add_handler(sync_handler)
+        asyncio.run(async_logger.info("parent"))
+
+        # NOTE: Keeps the locks of the file busy, so the fork happens while a thread
+        # of the parent may be holding them
+        stop, sent = Event(), []
+
+        def log_forever():
+            while not stop.is_set():
+                sync_logger.info("busy")
+                sent.append(None)
+
+        thread = Thread(target=log_forever)
+        thread.start()
+
+        async def log_from_child():
+            await asyncio.gather(*(async_logger.info(f"child {i}") for i in range(50)))
+            await async_handler.close()
+
+        def child():
+            sync_logger.info("child sync")
+            asyncio.run(log_from_child())
+            sync_handler.close()
+
+        exit_codes = [_fork(child) for _ in range(3)]
+        stop.set()
+        thread.join(5)
+
+        asyncio.run(async_handler.close())
+        sync_handler.close()
+    finally:
+        settings.configure(stream_backend=previous)
+
+    messages = _read_messages(filename)
+    assert exit_codes == [0, 0, 0]
+    assert messages.count("parent") == 1
+    assert messages.count("busy") == len(sent)
+    assert messages.count("child sync") == 3
+    for index in range(50):
+        assert messages.count(f"child {index}") == 3
+
+
+@mark.unit
+def test_children_should_not_flush_the_data_buffered_by_the_parent(tmp_path):
+    filename = str(tmp_path / "buffered.log")
+    resource_manager.open_stream(filename=filename)
+    resource = resource_manager.resources[filename]
+    resource.send(b"first\n")
+
+    # NOTE: Written to the buffer only, as if the fork happened in the middle of a write
+    resource.writer._stream.write(b"pending\n")
+
+    def child():
+        resource_manager.send_message(filename=filename, msg=b"child\n")
+        resource_manager.close_stream(filename=filename)
+
+    assert _fork(child) == 0
+    resource_manager.close_stream(filename=filename)
+
+    with open(filename, "rb") as file:
+        assert file.read().splitlines() == [b"first", b"child", b"pending"]
+
+
+@mark.unit
+@mark.parametrize("kind", ["thread", "process"])
+def test_children_should_get_formatting_pools_of_their_own(tmp_path, kind):
+    filename = str(tmp_path / "pooled.log")
+    pool = FormattingPool(kind=kind, max_workers=1)
+    handler = AsyncFileHandler(filename=filename, formatter=JsonFormatter(), pool=pool)
+    logger = AsyncLogger(name="async")
+    logger._add_handler(handler)
+
+    async def log(msg: str):
+        await logger.info(msg)
+        await handler.close()
+
+    # NOTE: The parent's workers already exist when it forks
+    asyncio.run(log("parent"))
+
+    def child():
+        asyncio.run(asyncio.wait_for(log("child"), timeout=5))
+        pool.shutdown()
+
+    exit_code = _fork(child)
+    pool.shutdown()
+
+    assert exit_code == 0
+    assert _read_messages(filename) == ["parent", "child"]
+
+
+@mark.unit
+def test_children_should_not_reuse_the_binary_key_ids_of_the_parent(tmp_path):
+    formatter = BinaryFormatter()
+    logger = SyncLogger("test", Filter(level=0))
+
+    def format(msg):
+        return formatter.format(
+            logger._make_record(
+                name="test",
+                level=20,
+                msg=msg,
+                filename=__file__,
+                function_name="test",
+                line_number=7,
+                exc_info=None,
+            )
+        )
+
+    first = format({"first": 1})
+    child_output = tmp_path / "child.bin"
+
+    def child():
+        child_output.write_bytes(format({"child_key": 3}))
+
+    assert _fork(child) == 0
+
+    # NOTE: The parent defines its key before the child's record is written, and then
+    # uses it again, as two processes sharing the same file would
+    data = first + format({"parent_key": 1}) + child_output.read_bytes()
+    data += format({"parent_key": 2})
+    records = iter_records(BytesIO(data))
+    assert [record["message"] for record in records] == [
+        {"first": 1},
+        {"parent_key": 1},
+        {"child_key": 3},
+        {"parent_key": 2},
+    ]
@@ -0,0 +1,95 @@
+import subprocess
+import sys
+
+from pytest import mark
+
+# NOTE: Cumulative time, in microseconds, that 'import aiologbuch' may take on a cold
+# interpreter. The best of a few runs is used to keep the test from being flaky.
+IMPORT_TIME_BUDGET = 100_000
+RUNS = 5
+
+LAZY_MODULES = (
+    "aiofile",
+    "anyio",
+    "asyncio",
+    "dataclasses",
+    "gzip",
+    "inspect",
+    "json",
+    "logging",
+    "lzma",
+    "traceback",
+)
+
+
+def _import_time():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import aiologbuch"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    for line in result.stderr.splitlines():
+        # NOTE: The lines look like 'import time: self [us] | cumulative | package'
+        _, cumulative, name = line.split("|")
+        if name.strip() == "aiologbuch":
+            return int(cumulative)
+
+    raise AssertionError("'aiologbuch' not found in the -X importtime output")
+
+
+@mark.unit
+def test_cold_import_should_stay_within_budget():
+    best = min(_import_time() for _ in range(RUNS))
+
+    assert best <= IMPORT_TIME_BUDGET, f"'import aiologbuch' took {best}us"
+
+
+@mark.unit
+def test_import_should_not_load_lazy_modules():
+    code = (
+        "import sys, aiologbuch; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == ""
+
+
+@mark.unit
+def test_lazy_modules_should_be_imported_once_by_the_hot_path(monkeypatch):
+    import builtins
+    import logging
+
+    from aiologbuch.loggers import SyncLogger, base
+    from aiologbuch.shared.filters import Filter
+
+    class Handler:
+        filter_ = None
+        records = []
+
+        def handle(self, record):
+            self.records.append(record)
+
+    handler = Handler()
+    logger = SyncLogger("test", Filter(level=0))
+    logger._add_handler(handler)
+    logger.info("first")
+    assert base._LogRecord is logging.LogRecord
+
+    imported = []
+    original = builtins.__import__
+
+    def spy(name, *args, **kwargs):
+        imported.append(name)
+        return original(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", spy)
+    logger.info("second")
+    monkeypatch.undo()
+
+    assert imported == []
+    assert [record.msg for record in handler.records] == ["first", "second"]
@@ -0,0 +1,202 @@
+import asyncio
+import json
+
+from pytest import mark, raises
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import AsyncFileHandler, SyncFileHandler, TimeIndex
+from aiologbuch.loggers import SyncLogger
+from aiologbuch.readers.index import find_offsets, main, read_index, read_range
+from aiologbuch.shared.conf import settings
+from aiologbuch.shared.filters import Filter
+
+START = 1_700_000_000.0
+
+
+def _records(count: int):
+    logger = SyncLogger("test", Filter(level=0))
+    for index in range(count):
+        record = logger._make_record(
+            name="test",
+            level=40 if index % 10 == 0 else 20,
+            msg=f"record {index}",
+            filename=__file__,
+            function_name="test",
+            line_number=7,
+            exc_info=None,
+        )
+        record.created = START + index
+        record.msecs = 0
+        yield record
+
+
+def _write_log(filename: str, count: int = 500, batch_size: int = 1):
+    handler = SyncFileHandler(
+        filename=filename,
+        formatter=JsonFormatter(),
+        index=TimeIndex(every_records=20, every_bytes=None),
+    )
+    records = list(_records(count))
+    for index in range(0, count, batch_size):
+        handler.handle_batch(records[index : index + batch_size])
+    handler.close()
+
+
+@mark.unit
+@mark.parametrize("batch_size", [1, 7])
+def test_file_handlers_should_index_every_n_records(tmp_path, batch_size):
+    filename = str(tmp_path / "app.log")
+    _write_log(filename, batch_size=batch_size)
+
+    index = read_index(filename)
+    assert 500 // 20 - 3 <= len(index) <= 500 // 20 + 1
+
+    with open(filename, "rb") as file:
+        data = file.read()
+    for created, offset in index:
+        line = data[offset : data.index(b"\n", offset)]
+        assert json.loads(line)["message"] == f"record {int(created - START)}"
+
+
+@mark.unit
+def test_range_reads_should_only_read_the_indexed_part_of_the_file(tmp_path):
+    filename = str(tmp_path / "app.log")
+    _write_log(filename)
+
+    start, end = START + 200, START + 260
+    first, last = find_offsets(read_index(filename), 1 << 30, start, end)
+    with open(filename, "rb") as file:
+        data = file.read()
+    assert 0 < first and last < len(data)
+
+    messages = [record["message"] for record in read_range(filename, start, end)]
+    assert messages == [f"record {index}" for index in range(200, 261)]
+
+    errors = read_range(filename, start, end, level="ERROR")
+    assert [record["message"] for record in errors] == [
+        f"record {index}" for index in range(200, 261, 10)
+    ]
+
+
+@mark.unit
+def test_range_reads_should_scan_the_whole_file_without_an_index(tmp_path):
+    filename = str(tmp_path / "app.log")
+    handler = SyncFileHandler(filename=filename, formatter=JsonFormatter())
+    handler.handle_batch(list(_records(50)))
+    handler.close()
+
+    assert read_index(filename) == []
+    messages = [record["message"] for record in read_range(filename, START + 45)]
+    assert messages == [f"record {index}" for index in range(45, 50)]
+
+
+@mark.unit
+def test_async_file_handlers_should_index_the_records(tmp_path):
+    filename = str(tmp_path / "app.log")
+    handler = AsyncFileHandler(
+        filename=filename,
+        formatter=JsonFormatter(),
+        index=TimeIndex(every_records=50, every_bytes=None),
+    )
+
+    async def main():
+        for record in _records(500):
+            await handler.handle(record)
+        await handler.close()
+
+    asyncio.run(main())
+    assert len(read_index(filename)) >= 2
+    messages = [record["message"] for record in read_range(filename, START + 490)]
+    assert messages == [f"record {index}" for index in range(490, 500)]
+
+
+@mark.unit
+def test_indexes_should_require_the_thread_backend(tmp_path):
+    previous = settings.STREAM_BACKEND
+    settings.configure(stream_backend="aiofile")
+
+    try:
+        with raises(ValueError):
+            AsyncFileHandler(
+                filename=str(tmp_path / "app.log"),
+                formatter=JsonFormatter(),
+                index=TimeIndex(),
+            )
+    finally:
+        settings.configure(stream_backend=previous)
+
+
+@mark.unit
+def test_the_cli_should_print_the_lines_in_the_range(tmp_path):
+    filename = str(tmp_path / "app.log")
+    _write_log(filename, count=100)
+
+    output = tmp_path / "range.log"
+    main(
+        [
+            filename,
+            "--start",
+            "2023-11-14T22:13:50Z",
+            "--end",
+            str(START + 59),
+            "--level",
+            "ERROR",
+            "-o",
+            str(output),
+        ]
+    )
+
+    lines = output.read_bytes().splitlines()
+    assert [json.loads(line)["message"] for line in lines] == [
+        "record 30",
+        "record 40",
+        "record 50",
+    ]
+
+
+def _write_messages(filename: str, messages):
+    logger = SyncLogger("test", Filter(level=0))
+    handler = SyncFileHandler(filename=filename, formatter=JsonFormatter())
+    logger._add_handler(handler)
+    for msg in messages:
+        if isinstance(msg, BaseException):
+            logger.exception(msg)
+        else:
+            logger.error(msg)
+    handler.close()
+
+
+@mark.unit
+def test_range_reads_should_return_messages_with_escapes(tmp_path):
+    filename = str(tmp_path / "app.log")
+    try:
+        raise ValueError('a "quoted" error')
+    except ValueError as exc:
+        error = exc
+    _write_messages(filename, ["plain", 'say "hi"', "C:\\logs\\app", error])
+
+    records = list(read_range(filename, level="ERROR"))
+    assert [record["message"] for record in records[:3]] == [
+        "plain",
+        'say "hi"',
+        "C:\\logs\\app",
+    ]
+    assert len(records) == 4 and 'File "' in records[3]["traceback"]
+
+
+@mark.unit
+def test_range_reads_should_only_skip_a_partial_last_line(tmp_path):
+    filename = str(tmp_path / "app.log")
+    _write_messages(filename, ["first", "second"])
+    with open(filename, "ab") as file:
+        file.write(b'{"timestamp": "2024-')
+
+    assert [record["message"] for record in read_range(filename)] == [
+        "first",
+        "second",
+    ]
+
+    with open(filename, "ab") as file:
+        file.write(b"\n")
+    with raises(ValueError, match="Invalid record at offset"):
+        list(read_range(filename))
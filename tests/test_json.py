@@ -0,0 +1,166 @@
+import json
+import pickle
+
+from pytest import mark, raises
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.formatters.json import (
+    TRUNCATED_KEY,
+    TRUNCATED_MESSAGE,
+    _BoundedEncoder,
+)
+from aiologbuch.loggers import SyncLogger
+from aiologbuch.shared.filters import Filter
+
+
+def _record(msg):
+    logger = SyncLogger("test", Filter(level=0))
+    return logger._make_record(
+        name="test",
+        level=20,
+        msg=msg,
+        filename=__file__,
+        function_name="test",
+        line_number=7,
+        exc_info=None,
+    )
+
+
+def _message(formatter: JsonFormatter, msg):
+    data = json.loads(formatter.format(_record(msg)))
+    assert list(data)[-1] == "message"
+    return data["message"]
+
+
+@mark.unit
+def test_unbounded_formatters_should_keep_the_whole_message():
+    formatter = JsonFormatter()
+    msg = {"nested": {"list": list(range(1000))}, "text": "x" * 10_000}
+
+    assert _message(formatter, msg) == msg
+    assert formatter.truncations == {}
+
+
+@mark.unit
+def test_strings_items_and_depth_should_be_bounded():
+    formatter = JsonFormatter(max_string_length=5, max_items=3, max_depth=2)
+    msg = {
+        "text": "abcdefgh",
+        "items": list(range(10)),
+        "deep": {"deeper": {"deepest": 1}},
+        "extra": True,
+    }
+
+    assert _message(formatter, msg) == {
+        "text": "abcde...[3 more chars]",
+        "items": [0, 1, 2, "[7 more items]"],
+        "deep": {"deeper": "[dict of 1 items]"},
+        TRUNCATED_KEY: "[1 more items]",
+    }
+    assert formatter.truncations == {"string": 1, "items": 2, "depth": 1}
+
+
+@mark.unit
+@mark.parametrize(
+    "msg",
+    [
+        "x" * 1_000_000,
+        "é\n" * 100_000,
+        {f"key {index}": "value" * 10 for index in range(10_000)},
+        [[["deep" * 50] * 50] * 50] * 50,
+        {"list": [1, 2, {"text": "é" * 1000}], "after": 1},
+    ],
+)
+def test_messages_should_be_cut_to_their_maximum_size(msg):
+    formatter = JsonFormatter(max_message_size=300)
+    assert TRUNCATED_MESSAGE in json.dumps(_message(formatter, msg))
+    assert formatter.truncations == {"size": 1}
+
+    # NOTE: Only the marker and the closing brackets go past the maximum size
+    encoded = _BoundedEncoder(formatter).encode(msg)
+    assert 300 - 6 <= len(encoded) <= 300 + 32
+
+
+@mark.unit
+def test_huge_messages_should_not_be_encoded_in_full(monkeypatch):
+    encoded = []
+    dumps = json.dumps
+
+    def spy(value, *args, **kwargs):
+        text = dumps(value, *args, **kwargs)
+        encoded.append(len(text))
+        return text
+
+    formatter = JsonFormatter(max_message_size=1000)
+    record = _record({"payload": ["x" * 1000] * 10_000})
+    monkeypatch.setattr(json, "dumps", spy)
+    formatter.format(record)
+
+    assert max(encoded) < 5000
+    assert len(encoded) < 100
+
+
+@mark.unit
+def test_bounded_formatters_should_raise_on_unsupported_values():
+    formatter = JsonFormatter(max_items=10)
+
+    with raises(TypeError):
+        formatter.format(_record({"value": object()}))
+    with raises(TypeError):
+        formatter.format(_record({(1, 2): "value"}))
+
+
+@mark.unit
+def test_bounded_formatters_should_be_picklable():
+    formatter = JsonFormatter(max_message_size=100, max_depth=3)
+    formatter.format(_record({"a": {"b": {"c": {"d": 1}}}}))
+
+    copy = pickle.loads(pickle.dumps(formatter))
+    assert copy.max_message_size == 100 and copy.max_depth == 3
+    assert copy.truncations == {}
+    assert _message(copy, {"a": {"b": {"c": {"d": 1}}}}) == {
+        "a": {"b": {"c": "[dict of 1 items]"}}
+    }
+
+
+@mark.unit
+@mark.parametrize(
+    "formatter",
+    [JsonFormatter(), JsonFormatter(max_string_length=1000, max_items=100)],
+)
+@mark.parametrize(
+    "msg",
+    ['say "hi"', "C:\\logs\\app", {'"key"': ["\\", '"', '\\"', "\n\t\u2028"]}],
+)
+def test_messages_with_escapes_should_round_trip(formatter, msg):
+    assert _message(formatter, msg) == json.loads(json.dumps(msg))
+
+
+@mark.unit
+@mark.parametrize("msg", ['"\\' * 10_000, {"a": ['say "hi"' * 1000] * 10}])
+def test_truncated_messages_with_escapes_should_stay_valid_json(msg):
+    formatter = JsonFormatter(max_message_size=300, max_string_length=5000)
+    message = json.dumps(_message(formatter, msg))
+    assert TRUNCATED_MESSAGE in message
+    assert formatter.truncations["size"] == 1
+
+
+@mark.unit
+def test_exception_records_should_stay_valid_json():
+    formatter = JsonFormatter(max_message_size=300)
+    try:
+        raise ValueError('a "quoted" \\ error')
+    except ValueError as exc:
+        record = SyncLogger("test", Filter(level=0))._make_record(
+            name="test",
+            level=40,
+            msg=str(exc),
+            filename=__file__,
+            function_name="test",
+            line_number=7,
+            exc_info=exc,
+        )
+
+    data = json.loads(formatter.format(record))
+    assert 'File "' in data["traceback"]
+    assert data["traceback"].endswith('ValueError: a "quoted" \\ error\n')
@@ -0,0 +1,277 @@
+import asyncio
+import signal
+import subprocess
+import sys
+import textwrap
+from threading import Event
+from time import monotonic
+
+import uvloop
+from pytest import mark, raises
+
+from aiologbuch import lifecycle
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import AsyncFileHandler, FormattingPool
+from aiologbuch.lifecycle import ShutdownMiddleware, _shutdown
+from aiologbuch.loggers import AsyncLogger, SyncLogger
+from aiologbuch.loggers.listener import SyncListener
+from aiologbuch.managers import get_logger_manager
+
+
+class _SyncHandler:
+    def __init__(self, name="sync", gate=None, error=None):
+        self.filter_ = None
+        self.filename = name
+        self.gate = gate
+        self.error = error
+        self.messages = []
+        self.closed = False
+
+    def handle(self, record):
+        self.messages.append(record.msg)
+
+    def close(self):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        self.closed = True
+
+
+class _AsyncHandler:
+    def __init__(self, name="async", delay=0.0):
+        self.filter_ = None
+        self.filename = name
+        self.delay = delay
+        self.closed = False
+
+    async def handle(self, record): ...
+
+    async def close(self):
+        await asyncio.sleep(self.delay)
+        self.closed = True
+
+
+@mark.unit
+async def test_shutdown_should_flush_the_pipeline_and_close_every_handler():
+    handler = _SyncHandler()
+    sync_manager = get_logger_manager("sync", SyncLogger, listener=SyncListener())
+    sync_manager.add_handler(name="root", handler=handler)
+    # NOTE: Shared by two loggers, but closed once
+    sync_manager.add_handler(name="app", handler=handler)
+    async_handler = _AsyncHandler()
+    async_manager = get_logger_manager("async", AsyncLogger)
+    async_manager.add_handler(name="root", handler=async_handler)
+
+    for index in range(100):
+        sync_manager.root.info(f"record {index}")
+
+    report = await _shutdown([sync_manager, async_manager], monotonic() + 5)
+
+    assert report.ok
+    assert sorted(report.closed) == [
+        "_AsyncHandler('async')",
+        "_SyncHandler('sync')",
+        "sync pipeline",
+    ]
+    assert handler.messages == [f"record {index}" for index in range(100)]
+    assert handler.closed and async_handler.closed
+    assert not sync_manager.root.enabled and not async_manager.root.enabled
+
+
+@mark.unit
+async def test_shutdown_should_respect_the_deadline_and_report_failures():
+    gate = Event()
+    manager = get_logger_manager("sync", SyncLogger)
+    manager.add_handler(name="root", handler=_SyncHandler("hung", gate=gate))
+    manager.add_handler(name="app", handler=_SyncHandler("fast"))
+    manager.add_handler(
+        name="db", handler=_SyncHandler("broken", error=OSError("disk full"))
+    )
+    async_manager = get_logger_manager("async", AsyncLogger)
+    async_manager.add_handler(name="root", handler=_AsyncHandler("slow", delay=10))
+
+    started = monotonic()
+    try:
+        report = await _shutdown([manager, async_manager], started + 0.2)
+    finally:
+        gate.set()
+
+    assert not report.ok
+    assert monotonic() - started < 2
+    assert report.closed == ("_SyncHandler('fast')",)
+    assert report.failed == (("_SyncHandler('broken')", "OSError('disk full')"),)
+    assert sorted(report.timed_out) == ["_AsyncHandler('slow')", "_SyncHandler('hung')"]
+
+
+@mark.unit
+async def test_shutdown_should_drain_the_formatting_pool_first(tmp_path):
+    filename = str(tmp_path / "app.log")
+    pool = FormattingPool(kind="thread", max_workers=1)
+    handler = AsyncFileHandler(filename=filename, formatter=JsonFormatter(), pool=pool)
+    manager = get_logger_manager("async", AsyncLogger)
+    manager.add_handler(name="root", handler=handler)
+
+    tasks = [
+        asyncio.ensure_future(manager.root.info(f"record {index}"))
+        for index in range(50)
+    ]
+    await asyncio.sleep(0)
+    report = await _shutdown([manager], monotonic() + 5)
+    await asyncio.gather(*tasks)
+    pool.shutdown()
+
+    assert report.ok
+    with open(filename) as file:
+        assert len(file.readlines()) == 50
+
+
+@mark.unit
+async def test_the_middleware_should_shut_down_after_the_app(monkeypatch):
+    calls = []
+
+    async def ashutdown(timeout):
+        calls.append(("shutdown", timeout))
+
+    async def app(scope, receive, send):
+        assert (await receive())["type"] == "lifespan.shutdown"
+        calls.append(("app", None))
+        await send({"type": "lifespan.shutdown.complete"})
+
+    async def receive():
+        return {"type": "lifespan.shutdown"}
+
+    async def send(message):
+        calls.append(("server", message["type"]))
+
+    monkeypatch.setattr(lifecycle, "ashutdown", ashutdown)
+    await ShutdownMiddleware(app, timeout=3)({"type": "lifespan"}, receive, send)
+
+    assert calls == [
+        ("app", None),
+        ("shutdown", 3),
+        ("server", "lifespan.shutdown.complete"),
+    ]
+
+
+def _run(script: str, tmp_path):
+    return subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(script), str(tmp_path / "app.log")],
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+
+
+@mark.unit
+def test_the_public_shutdown_should_close_the_global_loggers(tmp_path):
+    result = _run(
+        """
+        import sys
+        import aiologbuch
+        from aiologbuch.shared.conf import settings
+
+        settings.configure(sync_pipeline=True)
+        logger = aiologbuch.get_logger("app", filename=sys.argv[1], kind="sync")
+        for index in range(1000):
+            logger.info(index)
+
+        report = aiologbuch.shutdown(timeout=5)
+        print(report.ok, sorted(report.closed))
+        print(aiologbuch.shutdown().closed)
+        """,
+        tmp_path,
+    )
+
+    assert result.returncode == 0, result.stderr
+    first, second = result.stdout.splitlines()
+    assert first.startswith("True") and "SyncFileHandler" in first
+    assert second == "()"
+    assert len((tmp_path / "app.log").read_text().splitlines()) == 1000
+
+
+@mark.unit
+def test_hung_closes_should_not_hold_the_process_up_at_exit(tmp_path):
+    started = monotonic()
+    result = _run(
+        """
+        import asyncio, sys, time
+        import aiologbuch
+        from aiologbuch.handlers.file.writer import FileWriter
+        from aiologbuch.lifecycle import ashutdown
+
+        close = FileWriter.close
+
+        def hung_close(self):
+            time.sleep(20)
+            close(self)
+
+        FileWriter.close = hung_close
+
+        async def main():
+            logger = aiologbuch.get_logger("app", filename=sys.argv[1])
+            await logger.info("before")
+            report = await ashutdown(timeout=0.5)
+            print(report.timed_out)
+
+        asyncio.run(main())
+        """,
+        tmp_path,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "AsyncFileHandler" in result.stdout
+    assert monotonic() - started < 10
+
+
+@mark.unit
+def test_signals_should_shut_down_before_the_default_action(tmp_path):
+    result = _run(
+        """
+        import asyncio, os, signal, sys
+        import aiologbuch
+        from aiologbuch.lifecycle import install_signal_handlers
+
+        async def main():
+            logger = aiologbuch.get_logger("app", filename=sys.argv[1])
+            install_signal_handlers()
+            for index in range(100):
+                await logger.info(index)
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(10)
+
+        asyncio.run(main())
+        """,
+        tmp_path,
+    )
+
+    assert result.returncode == -signal.SIGTERM, result.stderr
+    assert len((tmp_path / "app.log").read_text().splitlines()) == 100
+
+
+@mark.unit
+@mark.parametrize(
+    "loop_factory",
+    [asyncio.new_event_loop, uvloop.new_event_loop],
+    ids=["asyncio", "uvloop"],
+)
+def test_signals_that_the_loop_handles_should_not_be_replaced(loop_factory):
+    calls = []
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGUSR2, calls.append, "app")
+        try:
+            with raises(RuntimeError, match="already handles"):
+                lifecycle.install_signal_handlers([signal.SIGUSR2])
+            signal.raise_signal(signal.SIGUSR2)
+            await asyncio.sleep(0.1)
+        finally:
+            loop.remove_signal_handler(signal.SIGUSR2)
+
+    loop = loop_factory()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+    assert calls == ["app"]
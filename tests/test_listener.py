@@ -0,0 +1,95 @@
+import os
+from threading import Event, get_ident
+
+from pytest import mark
+
+from aiologbuch.loggers import SyncLogger
+from aiologbuch.loggers.listener import SyncListener
+from aiologbuch.managers import get_logger_manager
+
+
+class _BatchHandler:
+    def __init__(self, gate: Event | None = None):
+        self.gate = gate
+        self.batches = []
+        self.threads = set()
+        self.closed = False
+
+    def handle_batch(self, records):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.threads.add(get_ident())
+        self.batches.append([record.msg for record in records])
+
+    def handle(self, record):
+        self.handle_batch([record])
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def messages(self):
+        return [msg for batch in self.batches for msg in batch]
+
+
+@mark.unit
+def test_listener_should_write_the_records_in_batches_off_the_callers_thread():
+    gate, handler = Event(), _BatchHandler()
+    handler.gate = gate
+    manager = get_logger_manager("sync", SyncLogger, listener=SyncListener())
+    manager.add_handler(name="root", handler=handler)
+    logger, _ = manager.get_logger(name="app")
+
+    for index in range(10):
+        logger.info(f"message {index}")
+    gate.set()
+
+    assert manager.listener.flush(timeout=5)
+    assert handler.messages == [f"message {index}" for index in range(10)]
+    assert len(handler.batches) < 10
+    assert get_ident() not in handler.threads
+
+    manager.listener.stop()
+
+
+@mark.unit
+def test_disabling_the_manager_should_flush_before_closing_the_handlers():
+    gate, handler = Event(), _BatchHandler()
+    handler.gate = gate
+    manager = get_logger_manager("sync", SyncLogger, listener=SyncListener())
+    manager.add_handler(name="root", handler=handler)
+
+    manager.root.info("first")
+    manager.root.error("second")
+    gate.set()
+    manager.disable()
+
+    assert handler.messages == ["first", "second"]
+    assert handler.closed
+
+
+@mark.unit
+@mark.filterwarnings("ignore:This process .* is multi-threaded:DeprecationWarning")
+def test_listener_should_restart_in_forked_children():
+    handler = _BatchHandler()
+    manager = get_logger_manager("sync", SyncLogger, listener=SyncListener())
+    manager.add_handler(name="root", handler=handler)
+    manager.root.info("parent")
+    assert manager.listener.flush(timeout=5)
+
+    reader, writer = os.pipe()
+    if (pid := os.fork()) == 0:
+        try:
+            manager.root.info("child")
+            manager.listener.flush(timeout=5)
+            os.write(writer, ",".join(handler.messages).encode())
+        finally:
+            os._exit(0)
+
+    os.close(writer)
+    _, status = os.waitpid(pid, 0)
+    with os.fdopen(reader) as pipe:
+        assert pipe.read() == "parent,child"
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    manager.listener.stop()
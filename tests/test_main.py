@@ -0,0 +1,57 @@
+import json
+
+from pytest import mark, raises
+
+from aiologbuch import get_logger
+from aiologbuch.shared.levels import LogLevel
+
+
+@mark.unit
+def test_get_logger_should_infer_the_callers_module_name():
+    logger = get_logger(kind="sync")
+
+    assert logger.name == __name__
+    assert get_logger(kind="sync") is logger
+
+
+@mark.unit
+def test_get_logger_should_only_replace_the_filter_when_the_level_changes():
+    logger = get_logger(name="tests.main.levels", level="DEBUG", kind="sync")
+    filter_ = logger._spec.filter_
+
+    assert get_logger(name="tests.main.levels", level="debug", kind="sync") is logger
+    assert get_logger(name="tests.main.levels", kind="sync") is logger
+    assert logger._spec.filter_ is filter_
+
+    get_logger(name="tests.main.levels", level=LogLevel.ERROR, kind="sync")
+
+    assert logger.level == LogLevel.ERROR
+    assert logger._spec.filter_ is not filter_
+
+
+@mark.unit
+def test_exclusive_loggers_should_only_write_their_level_to_the_file(tmp_path):
+    filename = str(tmp_path / "errors.log")
+    logger = get_logger(
+        name="tests.main.exclusive",
+        level="INFO",
+        filename=filename,
+        exclusive=True,
+        kind="sync",
+    )
+
+    logger.info("info")
+    logger.error("error")
+    logger.handlers[0].close()
+
+    with open(filename) as file:
+        messages = [json.loads(line)["message"] for line in file]
+
+    assert messages == ["info"]
+    assert get_logger(name="tests.main.exclusive", filename=filename) is not None
+
+
+@mark.unit
+def test_exclusive_should_require_a_level_and_a_filename():
+    with raises(ValueError):
+        get_logger(name="tests.main.invalid", exclusive=True, kind="sync")
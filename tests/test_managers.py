@@ -0,0 +1,182 @@
+from pytest import mark
+
+from aiologbuch.loggers import AsyncLogger, SyncLogger
+from aiologbuch.loggers.base import DISABLED_LEVEL
+from aiologbuch.managers import get_logger_manager
+from aiologbuch.shared.conf import settings
+from aiologbuch.shared.filters import ExclusiveFilter, Filter
+from aiologbuch.shared.levels import LogLevel
+
+
+class _Handler:
+    def __init__(self, filter_=None):
+        self.filter_ = filter_
+        self.messages = []
+
+    def handle(self, record):
+        self.messages.append(record.msg)
+
+    def close(self): ...
+
+
+@mark.unit
+def test_loggers_should_inherit_the_closest_ancestors_configuration():
+    manager = get_logger_manager("sync", SyncLogger)
+    root_handler, app_handler = _Handler(), _Handler()
+    manager.add_handler(name="root", handler=root_handler)
+
+    pool, _ = manager.get_logger(name="app.db.pool")
+    assert pool.parent is manager.root
+    assert pool.effective_level == LogLevel.INFO
+
+    app, _ = manager.get_logger(name="app", filter_=Filter(level=LogLevel.ERROR))
+    manager.add_handler(name="app", handler=app_handler)
+
+    assert pool.parent is app
+    assert pool.effective_level == LogLevel.ERROR
+    assert pool.handlers == (app_handler, root_handler)
+
+    pool.warning("dropped")
+    pool.error("kept")
+    assert app_handler.messages == root_handler.messages == ["kept"]
+
+
+@mark.unit
+def test_loggers_should_route_records_to_the_handlers_of_their_level():
+    manager = get_logger_manager("sync", SyncLogger)
+    everything = _Handler()
+    errors = _Handler(filter_=ExclusiveFilter(level=LogLevel.ERROR))
+    warnings = _Handler(filter_=Filter(level=LogLevel.WARNING))
+    manager.add_handler(name="root", handler=everything)
+    manager.add_handler(name="app", handler=errors)
+    manager.add_handler(name="app", handler=warnings)
+
+    app, _ = manager.get_logger(name="app")
+    routes = app._config.routes
+    assert routes[LogLevel.INFO] == (everything,)
+    assert routes[LogLevel.WARNING] == (warnings, everything)
+    assert routes[LogLevel.ERROR] == (errors, warnings, everything)
+    assert routes[LogLevel.CRITICAL] is routes[LogLevel.WARNING]
+
+    app.info("info")
+    app.error("error")
+    app.critical("critical")
+    assert everything.messages == ["info", "error", "critical"]
+    assert warnings.messages == ["error", "critical"]
+    assert errors.messages == ["error"]
+
+
+class _AsyncHandler(_Handler):
+    def __init__(self, slow=False):
+        super().__init__()
+        self.slow = slow
+
+    async def handle(self, record):
+        self.messages.append(record.msg)
+
+    async def close(self): ...
+
+
+@mark.unit
+async def test_async_loggers_should_only_use_tasks_for_slow_handlers():
+    manager = get_logger_manager("async", AsyncLogger)
+    root_handler, fast, slow = _AsyncHandler(), _AsyncHandler(), _AsyncHandler(True)
+    manager.add_handler(name="root", handler=root_handler)
+
+    app, _ = manager.get_logger(name="app")
+    assert app._config.routes[LogLevel.INFO] == root_handler.handle
+
+    manager.add_handler(name="app", handler=fast)
+    assert app._config.routes[LogLevel.INFO].func.__name__ == "_handle_sequentially"
+    await app.info("sequential")
+
+    manager.add_handler(name="app", handler=slow)
+    assert app._config.routes[LogLevel.INFO].func.__name__ == "_handle_concurrently"
+    await app.info("concurrent")
+
+    assert root_handler.messages == ["sequential", "concurrent"]
+    assert fast.messages == ["sequential", "concurrent"]
+    assert slow.messages == ["concurrent"]
+
+
+@mark.unit
+def test_changing_an_ancestor_should_only_refresh_its_descendants():
+    manager = get_logger_manager("sync", SyncLogger)
+    db, _ = manager.get_logger(name="app.db")
+    other, _ = manager.get_logger(name="application", filter_=None)
+
+    manager.get_logger(name="app")
+    manager.set_level(name="app", filter_=Filter(level=LogLevel.DEBUG))
+
+    assert db.effective_level == LogLevel.DEBUG
+    assert other.effective_level == LogLevel.INFO
+
+    manager.set_level(name="app", filter_=None)
+    assert db.effective_level == LogLevel.INFO
+
+
+@mark.unit
+def test_disabled_loggers_should_not_affect_their_descendants():
+    manager = get_logger_manager("sync", SyncLogger)
+    handler = _Handler()
+    manager.add_handler(name="root", handler=handler)
+    app, _ = manager.get_logger(name="app", filter_=Filter(level=LogLevel.DEBUG))
+    db, _ = manager.get_logger(name="app.db")
+
+    manager.disable_logger(name="app")
+
+    assert app.effective_level == DISABLED_LEVEL
+    assert db.parent is manager.root
+    assert db.effective_level == LogLevel.INFO
+    assert db.handlers == (handler,)
+
+
+@mark.unit
+def test_reconfiguring_should_swap_the_snapshot_without_affecting_inflight_records():
+    manager = get_logger_manager("sync", SyncLogger)
+    old, new = _Handler(), _Handler()
+    logger, _ = manager.get_logger(name="app")
+    manager.configure_logger(name="app", handlers=[_Handler(), old])
+
+    class _Reconfigurer(_Handler):
+        def handle(self, record):
+            self.removed = manager.configure_logger(name="app", handlers=[new])
+
+    reconfigurer = _Reconfigurer()
+    manager.configure_logger(name="app", handlers=[reconfigurer, old])
+    snapshot = logger._config
+
+    logger.info("in flight")
+    logger.info("after")
+
+    assert snapshot is not logger._config
+    assert reconfigurer.removed == (reconfigurer, old)
+    assert old.messages == ["in flight"]
+    assert new.messages == ["after"]
+
+
+@mark.unit
+def test_settings_should_be_reconfigurable():
+    previous = settings.snapshot
+    try:
+        settings.configure(compression_level=1)
+        settings.configure(stream_backend="gzip")
+
+        assert settings.COMPRESSION_LEVEL == 1
+        assert settings.STREAM_BACKEND == "gzip"
+        assert previous.STREAM_BACKEND == "thread"
+    finally:
+        settings._snapshot = previous
+
+
+@mark.unit
+def test_settings_should_still_take_the_stream_backend_positionally():
+    previous = settings.snapshot
+    try:
+        settings.configure("aiofile", sync_pipeline=False)
+        assert settings.STREAM_BACKEND == "aiofile"
+
+        settings.configure(raise_exceptions=True)
+        assert settings.STREAM_BACKEND == "aiofile"
+    finally:
+        settings._snapshot = previous
@@ -0,0 +1,116 @@
+import os
+from asyncio import get_running_loop, sleep
+from signal import SIGUSR1, getsignal, signal
+from time import monotonic
+from time import sleep as sync_sleep
+
+from pytest import fixture, mark, raises
+
+from aiologbuch.handlers import AsyncMemoryHandler, SyncMemoryHandler
+from aiologbuch.handlers.memory.ring import RingBuffer
+from aiologbuch.loggers import SyncLogger
+from aiologbuch.shared.filters import Filter
+from aiologbuch.shared.levels import LogLevel
+
+
+class _Target:
+    def __init__(self):
+        self.messages = []
+
+    def handle(self, record):
+        self.messages.append(record.msg)
+
+    def close(self): ...
+
+
+class _AsyncTarget(_Target):
+    async def handle(self, record):
+        super().handle(record)
+
+    async def close(self): ...
+
+
+def _record(msg: str, level: int = LogLevel.DEBUG):
+    logger = SyncLogger("test", Filter(level=0))
+    return logger._make_record(
+        name="test",
+        level=level,
+        msg=msg,
+        filename=__file__,
+        function_name="test",
+        line_number=1,
+    )
+
+
+@mark.unit
+def test_ring_buffer_should_keep_only_the_newest_items():
+    ring = RingBuffer(3)
+
+    for idx in range(5):
+        ring.append(idx)
+
+    assert len(ring) == 3
+    assert ring.drain() == [2, 3, 4]
+    assert len(ring) == 0
+
+    with raises(ValueError):
+        RingBuffer(0)
+
+
+@mark.unit
+async def test_async_memory_handler_should_dump_the_history_on_errors():
+    target = _AsyncTarget()
+    handler = AsyncMemoryHandler(target=target, capacity=2)
+
+    for idx in range(3):
+        await handler.handle(_record(str(idx)))
+    assert target.messages == []
+
+    await handler.handle(_record("failure", level=LogLevel.ERROR))
+    assert target.messages == ["2", "failure"]
+    assert handler.buffered == 0
+
+
+@fixture
+def _sigusr1():
+    # NOTE: The triggers install process-wide handlers, which the other tests mustn't
+    # inherit
+    previous = getsignal(SIGUSR1)
+    try:
+        yield
+    finally:
+        signal(SIGUSR1, previous)
+
+
+@mark.unit
+async def test_async_memory_handler_should_dump_on_signals(_sigusr1):
+    target = _AsyncTarget()
+    handler = AsyncMemoryHandler(target=target)
+    handler.install_signal_trigger(SIGUSR1)
+
+    try:
+        await handler.handle(_record("debug"))
+        os.kill(os.getpid(), SIGUSR1)
+        await sleep(0.05)
+    finally:
+        get_running_loop().remove_signal_handler(SIGUSR1)
+
+    assert target.messages == ["debug"]
+
+
+@mark.unit
+def test_sync_memory_handler_should_dump_on_demand(_sigusr1):
+    target = _Target()
+    handler = SyncMemoryHandler(target=target, flush_level=LogLevel.CRITICAL)
+    handler.install_signal_trigger(SIGUSR1)
+
+    handler.handle(_record("debug"))
+    handler.handle(_record("error", level=LogLevel.ERROR))
+    assert target.messages == []
+
+    os.kill(os.getpid(), SIGUSR1)
+    deadline = monotonic() + 1
+    while not target.messages and monotonic() < deadline:
+        sync_sleep(0.01)
+
+    assert target.messages == ["debug", "error"]
@@ -0,0 +1,125 @@
+import json
+import os
+from threading import Barrier, Thread, get_native_id
+
+from pytest import mark, raises
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import AsyncFileHandler, SyncFileHandler
+from aiologbuch.handlers.file.manager import resource_manager
+from aiologbuch.loggers import SyncLogger
+from aiologbuch.readers.merge import find_shards, iter_merged, main
+from aiologbuch.shared.filters import Filter
+
+from .test_fork import _fork
+
+START = 1_700_000_000.0
+
+
+def _record(index: int):
+    logger = SyncLogger("test", Filter(level=0))
+    record = logger._make_record(
+        name="test",
+        level=20,
+        msg=index,
+        filename=__file__,
+        function_name="test",
+        line_number=7,
+        exc_info=None,
+    )
+    record.created = START + index
+    record.msecs = 0
+    return record
+
+
+def _write_thread_shards(filename: str, threads: int = 4, count: int = 50):
+    handler = SyncFileHandler(
+        filename=filename, formatter=JsonFormatter(), shard="thread"
+    )
+    barrier = Barrier(threads)
+
+    # NOTE: Every thread writes every n-th record, so the shards interleave in time
+    def write(offset: int):
+        barrier.wait()
+        for index in range(offset, count * threads, threads):
+            handler.handle(_record(index))
+
+    workers = [Thread(target=write, args=(offset,)) for offset in range(threads)]
+    [worker.start() for worker in workers]
+    [worker.join() for worker in workers]
+    handler.close()
+
+
+@mark.unit
+def test_thread_shards_should_be_merged_by_time(tmp_path):
+    filename = str(tmp_path / "app.log")
+    _write_thread_shards(filename)
+
+    shards = find_shards(filename)
+    assert len(shards) == 4
+    assert all(shard.startswith(f"{filename}.{os.getpid()}.") for shard in shards)
+    assert not os.path.exists(filename)
+    assert not any(shard.startswith(filename) for shard in resource_manager.resources)
+
+    merged = [json.loads(line)["message"] for line in iter_merged(shards, 64)]
+    assert merged == list(range(200))
+
+
+@mark.unit
+@mark.filterwarnings("ignore:This process .* is multi-threaded:DeprecationWarning")
+def test_every_process_should_write_its_own_shard(tmp_path):
+    filename = str(tmp_path / "app.log")
+    handler = SyncFileHandler(
+        filename=filename, formatter=JsonFormatter(), shard="process"
+    )
+    handler.handle(_record(0))
+
+    def child():
+        handler.handle(_record(1))
+        handler.close()
+
+    assert _fork(child) == 0
+    handler.handle(_record(2))
+    handler.close()
+
+    shards = find_shards(filename)
+    assert len(shards) == 2 and f"{filename}.{os.getpid()}" in shards
+    merged = [json.loads(line)["message"] for line in iter_merged(shards)]
+    assert merged == [0, 1, 2]
+
+
+@mark.unit
+async def test_async_handlers_should_shard_by_thread(tmp_path):
+    filename = str(tmp_path / "app.log")
+    handler = AsyncFileHandler(
+        filename=filename, formatter=JsonFormatter(), shard="thread"
+    )
+    await handler.handle(_record(0))
+    await handler.close()
+
+    assert find_shards(filename) == [f"{filename}.{os.getpid()}.{get_native_id()}"]
+
+
+@mark.unit
+def test_the_cli_should_merge_the_shards_of_a_file(tmp_path):
+    filename = str(tmp_path / "app.log")
+    _write_thread_shards(filename, threads=3, count=10)
+    with open(filename, "wb") as file:
+        file.write(JsonFormatter().format(_record(100)))
+    (tmp_path / "app.log.idx").write_bytes(b"ignored")
+
+    output = tmp_path / "merged.log"
+    main([filename, "-o", str(output)])
+
+    lines = output.read_bytes().splitlines()
+    assert [json.loads(line)["message"] for line in lines] == [*range(30), 100]
+
+
+@mark.unit
+def test_unknown_shards_should_be_rejected(tmp_path):
+    with raises(ValueError):
+        SyncFileHandler(
+            filename=str(tmp_path / "app.log"),
+            formatter=JsonFormatter(),
+            shard="host",
+        )
@@ -0,0 +1,86 @@
+from asyncio import gather
+
+from pytest import fixture, mark
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import FormattingPool
+from aiologbuch.handlers.base import BaseAsyncHandler
+from aiologbuch.loggers import AsyncLogger
+from aiologbuch.shared.filters import Filter
+
+
+class _CollectingHandler(BaseAsyncHandler):
+    def __init__(self, formatter, pool):
+        super().__init__(formatter=formatter, pool=pool)
+        self.writes: list[bytes] = []
+        self.errors: list[str] = []
+
+    async def write_and_flush(self, msg: bytes):
+        self.writes.append(msg)
+
+    async def handle_error(self, record):
+        self.errors.append(record.msg)
+
+
+class _FailingFormatter(JsonFormatter):
+    def format(self, record):
+        if record.msg == "bad":
+            raise ValueError("bad record")
+        return super().format(record)
+
+
+def _record(msg: str, exc_info=None):
+    logger = AsyncLogger("test", Filter(level=0))
+    return logger._make_record(
+        name="test",
+        level=20,
+        msg=msg,
+        filename=__file__,
+        function_name="test",
+        line_number=1,
+        exc_info=exc_info,
+    )
+
+
+@fixture(params=["thread", "process"])
+def pool(request):
+    pool = FormattingPool(kind=request.param, max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+@mark.unit
+async def test_pooled_handler_should_keep_order_and_batch_writes(pool):
+    handler = _CollectingHandler(formatter=JsonFormatter(), pool=pool)
+
+    await gather(*(handler.handle(_record(str(idx))) for idx in range(50)))
+
+    lines = b"".join(handler.writes).splitlines()
+    assert [line.split(b'"message": ')[1] for line in lines] == [
+        f'"{idx}"}}'.encode() for idx in range(50)
+    ]
+    assert len(handler.writes) < 50
+
+
+@mark.unit
+async def test_pooled_handler_should_render_tracebacks(pool):
+    handler = _CollectingHandler(formatter=JsonFormatter(), pool=pool)
+
+    try:
+        raise ValueError("boom")
+    except ValueError as exc:
+        await handler.handle(_record("failure", exc_info=exc))
+
+    assert b"ValueError: boom" in handler.writes[0]
+
+
+@mark.unit
+async def test_pooled_handler_should_report_records_that_failed_to_format():
+    pool = FormattingPool(max_batch_size=2)
+    handler = _CollectingHandler(formatter=_FailingFormatter(), pool=pool)
+
+    await gather(*(handler.handle(_record(msg)) for msg in ("a", "bad", "b")))
+    pool.shutdown()
+
+    assert handler.errors == ["bad"]
+    assert b"".join(handler.writes).count(b"\n") == 2
@@ -0,0 +1,264 @@
+import json
+import textwrap
+
+from pytest import fixture, mark
+
+from aiologbuch import profile
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import (
+    AsyncFileHandler,
+    AsyncMemoryHandler,
+    SyncFileHandler,
+    SyncMemoryHandler,
+)
+from aiologbuch.handlers.base import BaseAsyncHandler, BaseSyncHandler
+from aiologbuch.handlers.file.manager import resource_manager
+from aiologbuch.loggers import AsyncLogger, SyncLogger
+from aiologbuch.main import _get_manager
+from aiologbuch.profile import Histogram, _TimedLock
+from aiologbuch.shared.filters import Filter
+from aiologbuch.shared.levels import LogLevel
+
+
+class _RecordingHandler(BaseSyncHandler):
+    def __init__(self):
+        super().__init__(formatter=JsonFormatter())
+        self.records = []
+
+    def write_record(self, record, msg):
+        self.records.append(record)
+
+    def close(self): ...
+
+
+@fixture(autouse=True)
+def _profiling():
+    profile.reset()
+    yield
+    profile.disable()
+    profile.reset()
+
+
+@mark.unit
+def test_histograms_should_bound_their_percentiles():
+    histogram = Histogram()
+    for duration in range(1, 1001):
+        histogram.add(duration)
+
+    assert histogram.count == 1000 and histogram.min == 1 and histogram.max == 1000
+    assert histogram.mean == 500.5
+    for percent in (50, 90, 99):
+        exact = percent * 10
+        assert exact <= histogram.percentile(percent) <= exact * 1.25
+    assert histogram.percentile(100) == 1000
+    assert Histogram.from_dict(histogram.as_dict()).percentile(50) == (
+        histogram.percentile(50)
+    )
+
+
+@mark.unit
+def test_disabled_profiling_should_leave_the_original_code():
+    originals = (SyncLogger.info, SyncLogger._log, AsyncLogger._log)
+    handle, async_handle = BaseSyncHandler.handle, BaseAsyncHandler.handle
+    # NOTE: The routes of the async loggers bind the handlers' methods
+    root = _get_manager("async").root
+
+    profile.enable()
+    assert SyncLogger.info is not originals[0]
+    # NOTE: The bodies of the loggers are wrapped, never replaced
+    assert (SyncLogger._log, AsyncLogger._log) == originals[1:]
+    assert BaseSyncHandler.handle is not handle
+    assert root._config.routes[LogLevel.INFO].__func__ is BaseAsyncHandler.handle
+    profile.disable()
+
+    assert (SyncLogger.info, SyncLogger._log, AsyncLogger._log) == originals
+    assert BaseSyncHandler.handle is handle
+    assert root._config.routes[LogLevel.INFO].__func__ is async_handle
+
+    logger = SyncLogger("app")
+    logger._add_handler(_RecordingHandler())
+    logger.info("not profiled")
+    assert profile.histograms() == {"loggers": {}, "handlers": {}}
+
+
+@mark.unit
+def test_every_stage_of_the_sync_loggers_should_be_profiled(tmp_path):
+    filename = str(tmp_path / "app.log")
+    recording = _RecordingHandler()
+    logger = SyncLogger("app")
+    logger._add_handler(recording)
+    handler = SyncFileHandler(filename=filename, formatter=JsonFormatter())
+    logger._add_handler(handler)
+
+    profile.enable()
+    for index in range(10):
+        logger.info(index)
+    logger.debug("filtered")
+    try:
+        raise ValueError("boom")
+    except ValueError as exc:
+        logger.exception(exc)
+    profile.disable()
+    logger.info("not profiled")
+
+    # NOTE: The caller is still found through the instrumented methods
+    assert {record.funcName for record in recording.records} == {
+        "test_every_stage_of_the_sync_loggers_should_be_profiled"
+    }
+
+    data = profile.histograms()
+    stages = data["loggers"]["app"]
+    assert stages["filter"].count == 12
+    assert stages["find_caller"].count == stages["make_record"].count == 11
+
+    file_stages = data["handlers"][f"SyncFileHandler({filename!r})"]
+    assert set(file_stages) == {"format", "lock", "send"}
+    assert file_stages["format"].count == file_stages["send"].count == 11
+    assert file_stages["lock"].count >= 11
+    assert set(data["handlers"]["_RecordingHandler"]) == {"format", "send"}
+
+    # NOTE: The locks of the resource managers are restored along with the methods
+    assert not isinstance(resource_manager.resources[filename].writer._lock, _TimedLock)
+    handler.close()
+
+
+@mark.unit
+async def test_every_stage_of_the_async_loggers_should_be_profiled(tmp_path):
+    filename = str(tmp_path / "app.log")
+    handler = AsyncFileHandler(filename=filename, formatter=JsonFormatter())
+    logger = AsyncLogger("app")
+    logger._add_handler(handler)
+
+    profile.enable()
+    # NOTE: Only the loggers of 'get_logger' get their routes compiled again
+    logger._resolve(parent=None)
+    for index in range(5):
+        await logger.warning(index)
+    await handler.close()
+    profile.disable()
+
+    data = profile.histograms()
+    assert {stage: h.count for stage, h in data["loggers"]["app"].items()} == {
+        "filter": 5,
+        "find_caller": 5,
+        "make_record": 5,
+    }
+    stages = data["handlers"][f"AsyncFileHandler({filename!r})"]
+    assert stages["format"].count == stages["send"].count == 5
+    with open(filename) as file:
+        records = [json.loads(line) for line in file]
+    assert [record["message"] for record in records] == list(range(5))
+
+
+@mark.unit
+def test_the_cli_should_profile_a_script_and_dump_its_histograms(tmp_path, capsys):
+    script = tmp_path / "script.py"
+    script.write_text(
+        textwrap.dedent(
+            """
+            import sys
+            from aiologbuch.formatters import JsonFormatter
+            from aiologbuch.handlers import SyncFileHandler
+            from aiologbuch.loggers import SyncLogger
+
+            logger = SyncLogger("script")
+            handler = SyncFileHandler(filename=sys.argv[1], formatter=JsonFormatter())
+            logger._add_handler(handler)
+            for index in range(20):
+                logger.info(index)
+            handler.close()
+            """
+        )
+    )
+    output = tmp_path / "profile.json"
+    profile.main(["-o", str(output), str(script), str(tmp_path / "app.log")])
+
+    assert not profile.is_enabled()
+    data = json.loads(output.read_text())
+    assert data["loggers"]["script"]["find_caller"]["count"] == 20
+
+    profile.main(["--show", str(output)])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "logger script"
+    assert lines[1].split() == ["stage", "count", "mean", "p50", "p90", "p99", "max"]
+    assert lines[2].split()[:2] == ["filter", "20"]
+
+
+class _AsyncRecordingHandler(BaseAsyncHandler):
+    def __init__(self):
+        super().__init__(formatter=JsonFormatter())
+        self.records = []
+
+    async def write_and_flush(self, msg): ...
+
+    async def handle(self, record):
+        self.records.append(record)
+        await super().handle(record)
+
+    async def close(self): ...
+
+
+@mark.unit
+async def test_profiled_loggers_should_find_the_callers_of_every_method():
+    sync_handler, async_handler = _RecordingHandler(), _AsyncRecordingHandler()
+    sync_logger = SyncLogger("sync", Filter(level=0))
+    async_logger = AsyncLogger("async", Filter(level=0))
+    sync_logger._add_handler(sync_handler)
+    async_logger._add_handler(async_handler)
+
+    profile.enable()
+    async_logger._resolve(parent=None)
+    for name in ("debug", "info", "warning", "error", "exception", "critical"):
+        msg = ValueError(name) if name == "exception" else name
+        getattr(sync_logger, name)(msg)
+        await getattr(async_logger, name)(msg)
+    profile.disable()
+
+    for handler in (sync_handler, async_handler):
+        assert len(handler.records) == 6
+        assert {(record.funcName, record.pathname) for record in handler.records} == {
+            ("test_profiled_loggers_should_find_the_callers_of_every_method", __file__)
+        }
+
+
+@mark.unit
+async def test_memory_handlers_should_be_profiled():
+    sync_target, async_target = _RecordingHandler(), _AsyncRecordingHandler()
+    sync_handler = SyncMemoryHandler(target=sync_target)
+    async_handler = AsyncMemoryHandler(target=async_target)
+    sync_logger, async_logger = SyncLogger("sync"), AsyncLogger("async")
+    sync_logger._add_handler(sync_handler)
+    async_logger._add_handler(async_handler)
+
+    profile.enable()
+    async_logger._resolve(parent=None)
+    for index in range(3):
+        sync_logger.info(index)
+        await async_logger.info(index)
+    # NOTE: The buffered records are only handed to the targets on errors
+    sync_logger.error("flush")
+    await async_logger.error("flush")
+    profile.disable()
+
+    handlers = profile.histograms()["handlers"]
+    for handler, target in (
+        (sync_handler, "_RecordingHandler"),
+        (async_handler, "_AsyncRecordingHandler"),
+    ):
+        assert handlers[type(handler).__name__]["send"].count == 4
+        assert handlers[target]["format"].count == 4
+    assert len(sync_target.records) == len(async_target.records) == 4
+
+
+@mark.unit
+def test_disabling_should_recompile_the_routes_of_loggers_created_by_hand():
+    handle = AsyncMemoryHandler.handle
+    logger = AsyncLogger("app")
+    logger._add_handler(AsyncMemoryHandler(target=_AsyncRecordingHandler()))
+
+    profile.enable()
+    logger._resolve(parent=None)
+    assert logger._config.routes[LogLevel.INFO].__func__ is not handle
+    profile.disable()
+
+    assert logger._config.routes[LogLevel.INFO].__func__ is handle
@@ -0,0 +1,99 @@
+import asyncio
+import json
+from threading import Thread
+
+import uvloop
+from pytest import mark
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import AsyncFileHandler, FormattingPool, SyncFileHandler
+from aiologbuch.loggers import AsyncLogger, SyncLogger
+from aiologbuch.shared.conf import settings
+
+RECORDS = 200
+
+
+@mark.unit
+@mark.parametrize("backend", ["thread", "fd", "aiofile"])
+def test_loops_and_threads_should_share_file_handlers(tmp_path, backend):
+    filename = str(tmp_path / "shared.log")
+    previous = settings.STREAM_BACKEND
+    settings.configure(stream_backend=backend)
+
+    try:
+        async_handler = AsyncFileHandler(filename=filename, formatter=JsonFormatter())
+        sync_handler = SyncFileHandler(filename=filename, formatter=JsonFormatter())
+        async_logger = AsyncLogger(name="async")
+        async_logger._add_handler(async_handler)
+        sync_logger = SyncLogger(name="sync")
+        sync_logger._add_handler(sync_handler)
+
+        async def log_from_loop(index: int):
+            await asyncio.gather(
+                *(async_logger.info(f"loop {index} {idx}") for idx in range(RECORDS))
+            )
+
+        def log_from_thread(index: int):
+            for idx in range(RECORDS):
+                sync_logger.info(f"thread {index} {idx}")
+
+        threads = [
+            Thread(target=asyncio.run, args=(log_from_loop(0),)),
+            Thread(target=uvloop.run, args=(log_from_loop(1),)),
+            Thread(target=log_from_thread, args=(0,)),
+            Thread(target=log_from_thread, args=(1,)),
+        ]
+        [thread.start() for thread in threads]
+        [thread.join(10) for thread in threads]
+
+        asyncio.run(async_handler.close())
+        sync_handler.close()
+    finally:
+        settings.configure(stream_backend=previous)
+
+    with open(filename) as file:
+        messages = [json.loads(line)["message"] for line in file]
+
+    assert len(messages) == 4 * RECORDS
+    for source in ("loop 0", "loop 1", "thread 0", "thread 1"):
+        own = [msg for msg in messages if msg.startswith(f"{source} ")]
+        assert own == [f"{source} {idx}" for idx in range(RECORDS)]
+
+
+@mark.unit
+def test_loops_should_share_pooled_handlers(tmp_path):
+    filename = str(tmp_path / "pooled.log")
+    pool = FormattingPool(kind="thread", max_workers=2, max_batch_size=16)
+    handler = AsyncFileHandler(filename=filename, formatter=JsonFormatter(), pool=pool)
+    logger = AsyncLogger(name="async")
+    logger._add_handler(handler)
+    woken: list[str] = []
+
+    async def log_from_loop(index: int):
+        # NOTE: Every caller must be woken up by its own loop
+        await asyncio.wait_for(
+            asyncio.gather(
+                *(logger.info(f"loop {index} {idx}") for idx in range(RECORDS))
+            ),
+            timeout=5,
+        )
+        woken.append(f"loop {index}")
+
+    threads = [
+        Thread(target=asyncio.run, args=(log_from_loop(0),)),
+        Thread(target=uvloop.run, args=(log_from_loop(1),)),
+        Thread(target=asyncio.run, args=(log_from_loop(2),)),
+    ]
+    [thread.start() for thread in threads]
+    [thread.join(10) for thread in threads]
+
+    asyncio.run(handler.close())
+    pool.shutdown()
+
+    assert sorted(woken) == ["loop 0", "loop 1", "loop 2"]
+    with open(filename) as file:
+        messages = [json.loads(line)["message"] for line in file]
+    assert len(messages) == 3 * RECORDS
+    for source in ("loop 0", "loop 1", "loop 2"):
+        own = [msg for msg in messages if msg.startswith(f"{source} ")]
+        assert own == [f"{source} {idx}" for idx in range(RECORDS)]
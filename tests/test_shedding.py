@@ -0,0 +1,281 @@
+import asyncio
+import time
+
+from pytest import mark, raises
+
+from aiologbuch.loggers import AsyncLogger, SyncLogger
+from aiologbuch.managers import get_logger_manager
+from aiologbuch.shedding import (
+    MARKER_LOGGER_NAME,
+    LoadShedder,
+    Signal,
+    dropped_records,
+)
+from aiologbuch.shared.filters import Filter
+from aiologbuch.shared.levels import LogLevel
+
+
+class _Handler:
+    def __init__(self):
+        self.filter_ = None
+        self.messages = []
+
+    def handle(self, record):
+        self.messages.append(record.msg)
+
+    def close(self): ...
+
+
+class _AsyncHandler(_Handler):
+    async def handle(self, record):
+        self.messages.append(record.msg)
+
+    async def close(self): ...
+
+
+class _Pressure:
+    def __init__(self):
+        self.value = 0.0
+
+    def signal(self):
+        return Signal(name="test", pressure=lambda: self.value)
+
+
+def _sync_manager():
+    manager = get_logger_manager("sync", SyncLogger)
+    handler = _Handler()
+    manager.add_handler(name="root", handler=handler)
+    manager.configure_logger("app.debug", sheddable=True)
+    return manager, handler
+
+
+@mark.unit
+def test_shedding_should_raise_the_cached_level_of_sheddable_loggers():
+    manager, handler = _sync_manager()
+    noisy, _ = manager.get_logger(name="app.debug.cache")
+    important, _ = manager.get_logger(name="app.payments")
+    assert noisy.sheddable and not important.sheddable
+
+    manager.shed(LogLevel.ERROR)
+    assert noisy._config.level == LogLevel.ERROR
+    assert important._config.level == LogLevel.INFO
+    # NOTE: The descendants still inherit the configured level
+    assert noisy.effective_level == LogLevel.ERROR
+    assert noisy._resolved.level == LogLevel.INFO
+
+    # NOTE: Loggers created meanwhile are shed as well
+    late, _ = manager.get_logger(name="app.debug.late")
+    noisy.info("shed")
+    late.warning("shed")
+    important.info("kept")
+    noisy.error("kept")
+    assert handler.messages == ["kept", "kept"]
+
+    manager.shed(None)
+    noisy.info("restored")
+    late.info("restored")
+    assert handler.messages[2:] == ["restored", "restored"]
+
+
+@mark.unit
+def test_shedding_should_not_lower_the_levels():
+    manager, _ = _sync_manager()
+    manager.configure_logger("app.debug", filter_=Filter(level=LogLevel.CRITICAL))
+    logger, _ = manager.get_logger(name="app.debug")
+
+    manager.shed(LogLevel.WARNING)
+    assert logger._config.level == LogLevel.CRITICAL
+
+
+@mark.unit
+def test_the_shedder_should_have_hysteresis_and_log_the_transitions():
+    manager, handler = _sync_manager()
+    logger, _ = manager.get_logger(name="app.debug")
+    pressure = _Pressure()
+    shedder = LoadShedder(manager, [pressure.signal()], high=1.0, low=0.5)
+
+    pressure.value = 1.2
+    shedder.check()
+    assert shedder.shedding
+    assert logger._config.level == LogLevel.WARNING
+
+    # NOTE: Between the thresholds, the current state is kept
+    pressure.value = 0.7
+    shedder.check()
+    assert shedder.shedding
+
+    pressure.value = 0.3
+    shedder.check()
+    assert not shedder.shedding
+    assert logger._config.level == LogLevel.INFO
+
+    started, stopped = handler.messages
+    assert started["event"] == "load_shedding_started"
+    assert started["level"] == "WARNING"
+    assert started["signals"] == {"test": 1.2}
+    assert stopped["event"] == "load_shedding_stopped"
+    assert stopped["duration"] >= 0
+
+
+@mark.unit
+def test_the_markers_should_get_through_while_shedding():
+    manager, handler = _sync_manager()
+    manager.configure_logger("aiologbuch", sheddable=True)
+    pressure = _Pressure()
+    shedder = LoadShedder(manager, [pressure.signal()], level=LogLevel.CRITICAL)
+
+    assert not manager.loggers[MARKER_LOGGER_NAME].sheddable
+    pressure.value = 2
+    shedder.check()
+    assert [message["event"] for message in handler.messages] == [
+        "load_shedding_started"
+    ]
+
+
+@mark.unit
+def test_the_shedder_thread_should_restore_the_levels_when_stopped():
+    manager, handler = _sync_manager()
+    logger, _ = manager.get_logger(name="app.debug")
+    pressure = _Pressure()
+    pressure.value = 1
+    shedder = LoadShedder(manager, [pressure.signal()], interval=0.01)
+
+    shedder.start()
+    for _ in range(500):
+        if shedder.shedding:
+            break
+        time.sleep(0.01)
+    shedder.stop()
+
+    assert logger._config.level == LogLevel.INFO
+    assert [message["event"] for message in handler.messages] == [
+        "load_shedding_started",
+        "load_shedding_stopped",
+    ]
+
+
+@mark.unit
+async def test_the_shedder_should_run_as_a_task_for_async_loggers():
+    manager = get_logger_manager("async", AsyncLogger)
+    handler = _AsyncHandler()
+    manager.add_handler(name="root", handler=handler)
+    manager.configure_logger("app", sheddable=True)
+    logger, _ = manager.get_logger(name="app")
+    pressure = _Pressure()
+    pressure.value = 1
+    shedder = LoadShedder(manager, [pressure.signal()], interval=0.01)
+
+    task = asyncio.ensure_future(shedder.run())
+    await asyncio.sleep(0.05)
+    assert logger._config.level == LogLevel.WARNING
+    await logger.info("shed")
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert logger._config.level == LogLevel.INFO
+    assert [message["event"] for message in handler.messages] == [
+        "load_shedding_started",
+        "load_shedding_stopped",
+    ]
+
+
+def _async_manager():
+    manager = get_logger_manager("async", AsyncLogger)
+    handler = _AsyncHandler()
+    manager.add_handler(name="root", handler=handler)
+    manager.configure_logger("app", sheddable=True)
+    return manager, handler
+
+
+@mark.unit
+async def test_stopping_the_shedder_should_log_the_marker_of_async_loggers():
+    manager, handler = _async_manager()
+    pressure = _Pressure()
+    pressure.value = 1
+    shedder = LoadShedder(manager, [pressure.signal()])
+
+    await shedder.acheck()
+    shedder.stop()
+    await asyncio.sleep(0)
+
+    assert [message["event"] for message in handler.messages] == [
+        "load_shedding_started",
+        "load_shedding_stopped",
+    ]
+
+
+@mark.unit
+def test_stopping_the_shedder_should_defer_the_marker_without_a_running_loop():
+    manager, handler = _async_manager()
+    pressure = _Pressure()
+    pressure.value = 1
+    shedder = LoadShedder(manager, [pressure.signal()])
+
+    asyncio.run(shedder.acheck())
+    shedder.stop()
+    assert [message["event"] for message in handler.messages] == [
+        "load_shedding_started"
+    ]
+
+    pressure.value = 0
+    asyncio.run(shedder.acheck())
+    assert [message["event"] for message in handler.messages] == [
+        "load_shedding_started",
+        "load_shedding_stopped",
+    ]
+
+
+@mark.unit
+async def test_markers_of_other_threads_should_be_logged_on_the_shedders_loop():
+    manager, handler = _async_manager()
+    pressure = _Pressure()
+    pressure.value = 1
+    shedder = LoadShedder(manager, [pressure.signal()])
+
+    await shedder.acheck()
+    await asyncio.to_thread(shedder.stop)
+    await asyncio.sleep(0.01)
+
+    assert [message["event"] for message in handler.messages] == [
+        "load_shedding_started",
+        "load_shedding_stopped",
+    ]
+
+
+@mark.unit
+def test_the_markers_should_get_through_above_the_root_level():
+    manager, handler = _sync_manager()
+    manager.configure_logger("root", filter_=Filter(level=LogLevel.CRITICAL))
+    pressure = _Pressure()
+    shedder = LoadShedder(manager, [pressure.signal()])
+
+    pressure.value = 2
+    shedder.check()
+    pressure.value = 0
+    shedder.check()
+
+    assert [message["event"] for message in handler.messages] == [
+        "load_shedding_started",
+        "load_shedding_stopped",
+    ]
+
+
+@mark.unit
+def test_dropped_records_should_measure_the_drops_since_the_last_check():
+    class _Dropping:
+        dropped = 5
+
+    handler = _Dropping()
+    signal = dropped_records(handler, limit=10)
+    assert signal.pressure() == 0
+
+    handler.dropped = 25
+    assert signal.pressure() == 2
+    assert signal.pressure() == 0
+
+
+@mark.unit
+def test_the_thresholds_should_be_validated():
+    manager, _ = _sync_manager()
+    with raises(ValueError):
+        LoadShedder(manager, [], high=0.5, low=1.0)
@@ -0,0 +1,140 @@
+import socket
+from asyncio import Event, gather, sleep, start_unix_server, wait_for
+from struct import unpack
+from threading import Thread
+
+from pytest import mark
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.handlers import AsyncSocketHandler, FormattingPool, SyncSocketHandler
+from aiologbuch.loggers import AsyncLogger
+from aiologbuch.shared.filters import Filter
+
+
+class _Collector:
+    def __init__(self):
+        self.data = b""
+        self.received = Event()
+
+    async def __call__(self, reader, writer):
+        while chunk := await reader.read(65536):
+            self.data += chunk
+            self.received.set()
+        writer.close()
+
+
+def _record(msg: str):
+    logger = AsyncLogger("test", Filter(level=0))
+    return logger._make_record(
+        name="test",
+        level=20,
+        msg=msg,
+        filename=__file__,
+        function_name="test",
+        line_number=1,
+    )
+
+
+@mark.unit
+async def test_async_socket_handler_should_send_length_prefixed_records(tmp_path):
+    path, collector = str(tmp_path / "collector.sock"), _Collector()
+    server = await start_unix_server(collector, path=path)
+
+    handler = AsyncSocketHandler(path, formatter=JsonFormatter(), framing="length")
+    await handler.handle(_record("first"))
+    await handler.handle(_record("second"))
+    await handler.close()
+    await sleep(0.05)
+    server.close()
+
+    (size,) = unpack(">I", collector.data[:4])
+    assert b'"message": "first"' in collector.data[4 : 4 + size]
+    assert b'"message": "second"' in collector.data[4 + size + 4 :]
+
+
+def _frames(data: bytes):
+    frames = []
+    while data:
+        (size,) = unpack(">I", data[:4])
+        frames.append(data[4 : 4 + size])
+        data = data[4 + size :]
+    return frames
+
+
+@mark.unit
+async def test_pooled_batches_should_prefix_every_record_with_its_length(tmp_path):
+    path, collector = str(tmp_path / "collector.sock"), _Collector()
+    server = await start_unix_server(collector, path=path)
+    pool = FormattingPool(kind="thread", max_workers=1)
+
+    handler = AsyncSocketHandler(
+        path, formatter=JsonFormatter(), framing="length", pool=pool
+    )
+    await gather(*(handler.handle(_record(f"record {index}")) for index in range(20)))
+    await handler.close()
+    await sleep(0.05)
+    server.close()
+    pool.shutdown()
+
+    frames = _frames(collector.data)
+    assert len(frames) == 20
+    assert all(frame.count(b'"message"') == 1 for frame in frames)
+
+
+@mark.unit
+async def test_async_socket_handler_should_buffer_across_reconnects(tmp_path):
+    path, collector = str(tmp_path / "collector.sock"), _Collector()
+    handler = AsyncSocketHandler(path, formatter=JsonFormatter(), initial_backoff=0.01)
+    errors = []
+
+    async def handle_error(record):
+        errors.append(record.msg)
+
+    handler.handle_error = handle_error
+
+    await handler.handle(_record("while down"))
+    server = await start_unix_server(collector, path=path)
+    await sleep(0.02)
+    await handler.handle(_record("after restart"))
+    await wait_for(collector.received.wait(), timeout=1)
+    await handler.close()
+    server.close()
+
+    assert errors == ["while down"]
+    assert collector.data.count(b"\n") == 2
+    assert collector.data.index(b"while down") < collector.data.index(b"after")
+
+
+@mark.unit
+def test_socket_handler_should_drop_the_oldest_records_when_full():
+    handler = SyncSocketHandler(("127.0.0.1", 9), formatter=JsonFormatter())
+    handler.max_buffer_size = 10
+
+    handler._push(b"a" * 8)
+    handler._push(b"b" * 8)
+
+    assert handler.dropped == 1
+    assert handler.buffered == 9
+
+
+@mark.unit
+def test_sync_socket_handler_should_send_newline_framed_records():
+    server = socket.create_server(("127.0.0.1", 0))
+    received = []
+
+    def accept():
+        conn, _ = server.accept()
+        with conn:
+            while chunk := conn.recv(65536):
+                received.append(chunk)
+
+    thread = Thread(target=accept)
+    thread.start()
+
+    handler = SyncSocketHandler(server.getsockname(), formatter=JsonFormatter())
+    handler.handle(_record("hello"))
+    handler.close()
+    thread.join(timeout=1)
+    server.close()
+
+    assert b"".join(received).endswith(b'"message": "hello"}\n')
@@ -0,0 +1,133 @@
+import asyncio
+import re
+import socket
+from threading import Thread
+from time import sleep
+
+import uvloop
+from pytest import fixture, mark
+
+from aiologbuch.formatters import LineFormatter, SyslogFormatter
+from aiologbuch.handlers import AsyncSyslogHandler, SyncSyslogHandler
+from aiologbuch.loggers import SyncLogger
+from aiologbuch.shared.filters import Filter
+from aiologbuch.shared.levels import LogLevel
+
+HEADER = re.compile(
+    rb"^<(?P<pri>\d+)>1 \d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z "
+    rb"(?P<host>\S+) (?P<app>\S+) (?P<procid>\d+) - - (?P<msg>.*)$",
+    re.DOTALL,
+)
+
+LOOP_FACTORIES = [asyncio.new_event_loop, uvloop.new_event_loop]
+
+
+def _run(loop_factory, coro):
+    loop = loop_factory()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def _record(msg: str, level: int = LogLevel.INFO):
+    logger = SyncLogger("test", Filter(level=0))
+    return logger._make_record(
+        name="test",
+        level=level,
+        msg=msg,
+        filename=__file__,
+        function_name="test",
+        line_number=1,
+    )
+
+
+@fixture
+def receiver(tmp_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(str(tmp_path / "log.sock"))
+    sock.settimeout(1)
+    yield sock
+    sock.close()
+
+
+@mark.unit
+@mark.parametrize(
+    "level,priority",
+    [(LogLevel.DEBUG, 15), (LogLevel.WARNING, 12), (LogLevel.CRITICAL, 10)],
+)
+def test_syslog_formatter_should_render_rfc5424_headers(level, priority):
+    formatter = SyslogFormatter(app_name="my app", hostname="host-1")
+
+    match = HEADER.match(formatter.format(_record("hello", level=level)))
+
+    assert int(match["pri"]) == priority
+    assert match["host"] == b"host-1"
+    assert match["app"] == b"myapp"
+    assert match["msg"].startswith(b"{") and match["msg"].endswith(b"}")
+
+
+@mark.unit
+def test_syslog_formatter_should_truncate_without_splitting_characters():
+    formatter = SyslogFormatter(formatter=LineFormatter(), max_message_size=120)
+
+    output = formatter.format(_record("é" * 200))
+
+    assert len(output) <= 120
+    output.decode("utf-8")
+
+
+@mark.unit
+@mark.parametrize("loop_factory", LOOP_FACTORIES, ids=["asyncio", "uvloop"])
+def test_async_syslog_handler_should_send_one_datagram_per_record(
+    receiver, loop_factory
+):
+    handler = AsyncSyslogHandler(address=receiver.getsockname(), app_name="app")
+    errors = []
+
+    async def handle_error(record):
+        errors.append(record)
+
+    async def main():
+        handler.handle_error = handle_error
+        await handler.handle(_record("first"))
+        await handler.write_batch([b"second", b"third"])
+        await handler.close()
+
+    _run(loop_factory, main())
+
+    assert errors == []
+    datagrams = [receiver.recv(4096) for _ in range(3)]
+    assert b'"message": "first"' in HEADER.match(datagrams[0])["msg"]
+    assert datagrams[1:] == [b"second", b"third"]
+
+
+@mark.unit
+@mark.parametrize("loop_factory", LOOP_FACTORIES, ids=["asyncio", "uvloop"])
+def test_async_syslog_handler_should_wait_on_full_sockets(receiver, loop_factory):
+    # NOTE: More than the socket's buffer holds, until the receiver starts reading
+    msgs = [f"{index:04d}".encode() * 2000 for index in range(200)]
+    received = []
+
+    def receive():
+        sleep(0.1)
+        received.extend(receiver.recv(16384) for _ in msgs)
+
+    thread = Thread(target=receive)
+    thread.start()
+    handler = AsyncSyslogHandler(address=receiver.getsockname())
+    _run(loop_factory, handler.write_batch(msgs))
+    thread.join()
+    _run(loop_factory, handler.close())
+
+    assert received == msgs
+
+
+@mark.unit
+def test_sync_syslog_handler_should_send_datagrams(receiver):
+    handler = SyncSyslogHandler(address=receiver.getsockname())
+
+    handler.handle(_record("hello", level=LogLevel.ERROR))
+    handler.close()
+
+    assert HEADER.match(receiver.recv(4096))["pri"] == b"11"
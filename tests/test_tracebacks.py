@@ -0,0 +1,102 @@
+from traceback import format_exception
+
+from pytest import mark
+
+from aiologbuch.formatters import JsonFormatter
+from aiologbuch.loggers import SyncLogger
+from aiologbuch.shared.filters import Filter
+from aiologbuch.shared.tracebacks import TracebackRenderer
+
+
+def _raise(message: str):
+    raise ValueError(message)
+
+
+def _capture(message: str = "boom"):
+    try:
+        _raise(message)
+    except ValueError as exc:
+        return exc
+
+
+def _capture_chained():
+    try:
+        try:
+            _raise("inner")
+        except ValueError as exc:
+            raise RuntimeError("outer") from exc
+    except RuntimeError as exc:
+        return exc
+
+
+def _without_carets(text: str):
+    return "".join(
+        line
+        for line in text.splitlines(keepends=True)
+        if line.strip().strip("^~") != "" or not line.strip()
+    )
+
+
+@mark.unit
+@mark.parametrize("factory", [_capture, _capture_chained])
+def test_render_should_match_the_stdlib_output(factory):
+    exc = factory()
+    expected = _without_carets("".join(format_exception(exc, chain=True)))
+
+    assert TracebackRenderer().render(exc) == expected
+
+
+@mark.unit
+def test_render_should_reuse_the_cached_stack_but_keep_the_message():
+    renderer = TracebackRenderer()
+
+    first = renderer.render(_capture("first"))
+    second = renderer.render(_capture("second"))
+
+    assert len(renderer.cache) == 1
+    assert first.endswith("ValueError: first\n")
+    assert second.endswith("ValueError: second\n")
+
+
+@mark.unit
+def test_render_should_evict_the_least_recently_used_entry():
+    renderer = TracebackRenderer(cache_size=1)
+
+    renderer.render(_capture())
+    renderer.render(_capture_chained())
+
+    assert len(renderer.cache) == 1
+
+
+@mark.unit
+def test_render_should_respect_the_depth_and_length_caps():
+    exc = _capture()
+
+    shallow = TracebackRenderer(max_depth=1).render(exc)
+    short = TracebackRenderer(max_length=20).render(exc)
+
+    assert "in _capture" not in shallow
+    assert "in _raise" in shallow
+    assert "1 earlier frame(s) omitted" in shallow
+    assert short.startswith("Traceback (most rec")
+    assert short.endswith("(traceback truncated)\n")
+
+
+@mark.unit
+def test_exception_records_should_be_rendered_only_when_formatted():
+    logger = SyncLogger("test", Filter(level=0))
+    exc = _capture()
+
+    record = logger._make_record(
+        name="test",
+        level=40,
+        msg="boom",
+        filename=__file__,
+        function_name="test",
+        line_number=1,
+        exc_info=exc,
+    )
+
+    assert record.exc_text is None
+    JsonFormatter().format(record)
+    assert record.exc_text.endswith("ValueError: boom\n")